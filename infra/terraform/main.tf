@@ -67,7 +67,7 @@ resource "google_storage_bucket" "uploads" {
   cors {
     origin          = ["https://${var.service_name}-${data.google_project.project.number}.${var.region}.run.app"]
     method          = ["GET", "PUT", "HEAD", "OPTIONS"]
-    response_header = ["Content-Type"]
+    response_header = ["Content-Type", "x-goog-content-length-range", "x-goog-if-generation-match"]
     max_age_seconds = 3600
   }
 
@@ -1,7 +1,10 @@
 """Upload API routes."""
 
+import asyncio
+import hashlib
 import logging
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 from uuid import uuid4
 
 from fastapi import APIRouter, Body, File, Form, HTTPException, Request, UploadFile
@@ -25,12 +28,25 @@ templates = Jinja2Templates(directory="src/eduscale/ui/templates")
 logger = logging.getLogger(__name__)
 
 
+def _hash_upload(file_data) -> str:
+    """Return the SHA-256 hex digest of an uploaded file and rewind it."""
+    file_data.seek(0)
+    digest = hashlib.file_digest(file_data, "sha256").hexdigest()
+    file_data.seek(0)
+    return digest
+
 
 @router.post("/upload", response_model=UploadResponse, status_code=201)
 async def upload_file(
-    file: UploadFile = File(...), region_id: str = Form(...)
+    file: UploadFile = File(...),
+    region_id: str = Form(...),
+    content_sha256: Optional[str] = Form(None),
 ) -> UploadResponse:
-    """Upload a file with metadata."""
+    """Upload a file with metadata.
+
+    If the client sends content_sha256, the upload is rejected when the
+    received bytes hash to a different value.
+    """
     try:
         # Validate region_id
         if not region_id or not region_id.strip():
@@ -65,18 +81,41 @@ async def upload_file(
             logger.error(f"Storage backend configuration error: {e}")
             raise HTTPException(status_code=500, detail="Storage configuration error")
 
-        # Stream file to storage backend
-        try:
-            storage_path = await backend.store_file(
-                file_id=file_id,
-                file_name=file.filename or "unnamed",
-                content_type=file.content_type or "application/octet-stream",
-                file_data=file.file,
-                region_id=region_id.strip(),
+        # Hash the spooled upload (OpenSSL SHA-256, outside the GIL) for
+        # integrity checking and deduplication
+        digest = await asyncio.to_thread(_hash_upload, file.file)
+        if content_sha256 and content_sha256.strip().lower() != digest:
+            raise HTTPException(
+                status_code=400,
+                detail="Content hash mismatch: uploaded data does not match content_sha256",
             )
-        except Exception as e:
-            logger.error(f"Failed to store file: {e}", exc_info=True)
-            raise HTTPException(status_code=500, detail="Failed to store file")
+
+        # Skip the write when identical content was already uploaded to this region
+        duplicate = None
+        if settings.UPLOAD_DEDUP_ENABLED:
+            duplicate = upload_store.find_by_hash(digest, region_id.strip())
+
+        if duplicate:
+            storage_path = duplicate.storage_path
+            storage_backend = duplicate.storage_backend
+            logger.info(
+                f"Duplicate upload: file_id={file_id} reuses file_id={duplicate.file_id}, "
+                f"region_id={region_id}"
+            )
+        else:
+            # Stream file to storage backend
+            try:
+                storage_path = await backend.store_file(
+                    file_id=file_id,
+                    file_name=file.filename or "unnamed",
+                    content_type=file.content_type or "application/octet-stream",
+                    file_data=file.file,
+                    region_id=region_id.strip(),
+                )
+            except Exception as e:
+                logger.error(f"Failed to store file: {e}", exc_info=True)
+                raise HTTPException(status_code=500, detail="Failed to store file")
+            storage_backend = backend.get_backend_name()
 
         # Create upload record
         created_at = datetime.now(timezone.utc)
@@ -86,30 +125,33 @@ async def upload_file(
             file_name=file.filename or "unnamed",
             content_type=file.content_type or "application/octet-stream",
             size_bytes=size_bytes,
-            storage_backend=backend.get_backend_name(),
+            storage_backend=storage_backend,
             storage_path=storage_path,
             status=UploadStatus.COMPLETED,
             created_at=created_at,
             completed_at=created_at,
+            content_sha256=digest,
         )
         upload_store.create(record)
 
         # Log upload completion
         logger.info(
             f"Upload completed: file_id={file_id}, region_id={region_id}, "
-            f"backend={backend.get_backend_name()}, size={size_bytes}"
+            f"backend={storage_backend}, size={size_bytes}"
         )
 
         # Return response
         return UploadResponse(
             file_id=file_id,
             file_name=file.filename or "unnamed",
-            storage_backend=backend.get_backend_name(),
+            storage_backend=storage_backend,
             storage_path=storage_path,
             region_id=region_id.strip(),
             content_type=file.content_type or "application/octet-stream",
             size_bytes=size_bytes,
             created_at=created_at,
+            content_sha256=digest,
+            duplicate_of=duplicate.file_id if duplicate else None,
         )
 
     except HTTPException:
@@ -168,7 +210,9 @@ async def create_upload_session(
 
         try:
             logger.info(f"Attempting to generate signed URL for file_id={file_id}, bucket={settings.GCS_BUCKET_NAME}")
-            signed_url, blob_path = gcs_backend.generate_signed_upload_url(
+            # Signing is blocking (credential refresh + signBlob RPC); keep it off the event loop
+            signed_url, blob_path = await asyncio.to_thread(
+                gcs_backend.generate_signed_upload_url,
                 file_id=file_id,
                 file_name=request.file_name,
                 content_type=request.content_type,
@@ -206,6 +250,9 @@ async def create_upload_session(
             file_id=file_id,
             upload_method="signed_url",
             signed_url=signed_url,
+            upload_headers=gcs_backend.signed_upload_headers(
+                request.content_type, request.file_size_bytes
+            ),
             target_path=f"gs://{settings.GCS_BUCKET_NAME}/{blob_path}",
             expires_at=expires_at,
         )
@@ -266,6 +313,7 @@ async def complete_upload(
             content_type=record.content_type,
             size_bytes=record.size_bytes,
             created_at=record.created_at,
+            content_sha256=record.content_sha256,
         )
 
     except HTTPException:
@@ -23,11 +23,17 @@ class Settings(BaseSettings):
     # Storage Configuration
     STORAGE_BACKEND: str = "local"  # "gcs" or "local"
     GCS_BUCKET_NAME: str = ""
+    GCS_SA_KEY_PATH: str = ""  # Optional SA key file; enables local URL signing instead of IAM signBlob
+
+    # Upload Record Store Configuration
+    UPLOAD_STORE_BACKEND: str = "memory"  # "memory" or "sqlite"
+    UPLOAD_STORE_SQLITE_PATH: str = "./data/uploads.db"
 
     # Upload Constraints
     MAX_UPLOAD_MB: int = 50
     ALLOWED_UPLOAD_MIME_TYPES: str = ""  # Comma-separated, empty = allow all
     DIRECT_UPLOAD_SIZE_THRESHOLD_MB: int = 31  # Files larger than this use signed URLs
+    UPLOAD_DEDUP_ENABLED: bool = False  # Reuse stored file when identical content is re-uploaded to a region
 
     # MIME Decoder Service Configuration
     TRANSFORMER_SERVICE_URL: str = ""
@@ -59,15 +65,33 @@ class Settings(BaseSettings):
     FEATHERLESS_API_KEY: str = ""  # API key from featherless.ai
     FEATHERLESS_BASE_URL: str = "https://api.featherless.ai/v1"
     FEATHERLESS_LLM_MODEL: str = "meta-llama/Meta-Llama-3.1-8B-Instruct"  # Llama 3.1 8B for entity extraction
+    FEATHERLESS_RPM: int = 0  # Client-side requests/minute limit per model (0 = unlimited)
+    FEATHERLESS_TPM: int = 0  # Client-side tokens/minute limit per model (0 = unlimited)
     LLM_ENABLED: bool = True
+    LLM_MAX_CONCURRENCY: int = 16  # Parallel requests for batch entity extraction
+    LLM_ROWS_PER_CALL: int = 1  # Texts packed into one extraction prompt (4-16 amortizes calls)
+    LLM_RESPONSE_CACHE_SIZE: int = 10_000  # In-memory prompt -> response LRU entries (0 disables)
+    LLM_DIRECT_HTTP: bool = False  # Async calls POST directly instead of via the OpenAI SDK
+    LLM_GZIP_REQUESTS: bool = False  # Gzip large request bodies (endpoint must accept it)
+    LLM_STRUCTURED_OUTPUT: bool = False  # Enforce entity JSON schema (endpoint must support it)
+    LLM_LOCAL_SENTIMENT: bool = False  # Try the local embedding model before the LLM for sentiment
+    LLM_LOCAL_SENTIMENT_CONFIDENCE: float = 0.9  # Minimum local confidence to skip the LLM
     
     # Embeddings via sentence-transformers (local)
     EMBEDDING_MODEL_NAME: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"  # 470MB, 50+ languages
     EMBEDDING_DIMENSION: int = 768
+    EMBEDDING_DEVICE: str = ""  # e.g. "cpu", "cuda"; empty selects CUDA when available (fp16)
+    EMBEDDING_BATCH_SIZE: int = 256  # Texts per model forward pass
+    EMBEDDING_CACHE_SIZE: int = 8_000  # In-memory text -> embedding LRU entries, ~25MB at 768 dims (0 disables)
+    EMBEDDING_CHECK_NORMS: bool = False  # Debug: assert embed_texts rows are unit-norm
 
     # Ingestion Configuration
     INGEST_MAX_ROWS: int = 200_000
+    INGEST_MAX_WORKERS: int = 0  # Processes for multi-file ingestion (0 = CPU count)
+    INGEST_PARALLEL_MIN_CHARS: int = 10_000_000  # Below this batch size, ingest serially
+    INGEST_ARROW_CSV_MIN_CHARS: int = 1_000_000  # CSV at least this size uses pyarrow (0 = off)
     PSEUDONYMIZE_IDS: bool = False
+    PSEUDONYMIZE_HASH_ALGO: str = "sha256"  # "sha256" or "blake2b" (faster; changes all hashes)
 
     # AI Analysis Settings
     FEEDBACK_ANALYSIS_ENABLED: bool = True
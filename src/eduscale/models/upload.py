@@ -20,6 +20,7 @@ class CreateSessionResponse(BaseModel):
     file_id: str
     upload_method: Literal["direct", "signed_url"]
     signed_url: Optional[str] = None
+    upload_headers: Optional[dict[str, str]] = None  # Headers the client must send with the signed PUT
     target_path: str
     expires_at: Optional[datetime] = None
 
@@ -41,3 +42,5 @@ class UploadResponse(BaseModel):
     content_type: str
     size_bytes: int
     created_at: datetime
+    content_sha256: Optional[str] = None  # SHA-256 of the stored content, when computed
+    duplicate_of: Optional[str] = None  # file_id whose stored object this upload reuses
@@ -0,0 +1,16 @@
+"""Shared path helpers for storage backends."""
+
+import re
+from functools import lru_cache
+
+# Anything outside this set (including both path separators) becomes "_"
+_UNSAFE_CHARS = re.compile(r"[^a-zA-Z0-9._-]")
+
+MAX_FILENAME_LENGTH = 255
+
+
+@lru_cache(maxsize=2048)
+def sanitize_filename(filename: str) -> str:
+    """Remove path traversal and dangerous characters."""
+    safe = filename.replace("../", "").replace("..\\", "")
+    return _UNSAFE_CHARS.sub("_", safe)[:MAX_FILENAME_LENGTH]
@@ -1,6 +1,11 @@
 """Google Cloud Storage backend."""
 
-import re
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from typing import BinaryIO, Optional
 from datetime import timedelta
 
@@ -8,15 +13,31 @@ from google.cloud import storage
 from google.oauth2 import service_account
 
 from eduscale.core.config import settings
+from eduscale.storage._paths import sanitize_filename
 from eduscale.storage.base import StorageBackend
 
 
+@dataclass
+class SignedUrlRequest:
+    """Parameters for one signed upload URL."""
+
+    file_id: str
+    file_name: str
+    content_type: str
+    size_bytes: int
+    region_id: str
+    expiration_minutes: int = 15
+
+
 class GCSStorageBackend(StorageBackend):
     """Google Cloud Storage backend."""
 
     def __init__(self):
         self._client: Optional[storage.Client] = None
         self._bucket: Optional[storage.Bucket] = None
+        self._signing_executor: Optional[ThreadPoolExecutor] = None
+        self._signing_credentials: Optional[service_account.Credentials] = None
+        self._signing_lock = threading.Lock()
 
     def _get_bucket(self) -> storage.Bucket:
         """Lazy-load and cache GCS bucket."""
@@ -31,11 +52,14 @@ class GCSStorageBackend(StorageBackend):
 
     def get_target_path(self, file_id: str, file_name: str, region_id: str) -> str:
         """Generate GCS target path with region_id in path structure."""
-        safe_name = self._sanitize_filename(file_name)
+        blob_path = self._blob_path(file_id, file_name, region_id)
+        return f"gs://{settings.GCS_BUCKET_NAME}/{blob_path}"
+
+    def _blob_path(self, file_id: str, file_name: str, region_id: str) -> str:
+        """Build the object path for an upload."""
         # Use uploads/{region_id}/{file_id}_{filename} pattern
         # This preserves original filename while allowing MIME Decoder to extract region_id from path
-        blob_path = f"uploads/{region_id}/{file_id}_{safe_name}"
-        return f"gs://{settings.GCS_BUCKET_NAME}/{blob_path}"
+        return f"uploads/{region_id}/{file_id}_{self._sanitize_filename(file_name)}"
 
     def generate_signed_upload_url(
         self,
@@ -46,23 +70,82 @@ class GCSStorageBackend(StorageBackend):
         region_id: str,
         expiration_minutes: int = 15,
     ) -> tuple[str, str]:
-        """Generate V4 signed URL for direct upload using IAM signBlob API.
+        """Generate V4 signed URL for direct upload.
+
+        Signs locally with the service account key when GCS_SA_KEY_PATH is set,
+        otherwise via the IAM signBlob API.
 
         Returns:
             Tuple of (signed_url, blob_path)
         """
-        from google.auth import iam
-        from google.auth.transport import requests as auth_requests
-        from google.auth import compute_engine
-
         bucket = self._get_bucket()
 
-        safe_name = self._sanitize_filename(file_name)
-        # Use uploads/{region_id}/{file_id}_{filename} pattern
-        # This preserves original filename while allowing MIME Decoder to extract region_id from path
-        blob_path = f"uploads/{region_id}/{file_id}_{safe_name}"
+        blob_path = self._blob_path(file_id, file_name, region_id)
         blob = bucket.blob(blob_path)
 
+        signing_creds = self._get_signing_credentials()
+        service_account_email = signing_creds.service_account_email
+
+        # Generate V4 signed URL for PUT
+        signed_url = blob.generate_signed_url(
+            version="v4",
+            expiration=timedelta(minutes=expiration_minutes),
+            method="PUT",
+            content_type=content_type,
+            headers=self.signed_upload_headers(content_type, size_bytes),
+            credentials=signing_creds,
+            service_account_email=service_account_email,
+        )
+
+        return signed_url, blob_path
+
+    @staticmethod
+    def signed_upload_headers(content_type: str, size_bytes: int) -> dict[str, str]:
+        """Headers bound into the signed upload URL.
+
+        The client must send exactly these headers with its PUT. GCS then
+        rejects bodies larger than the declared size and refuses to overwrite
+        an existing object, so neither needs checking by the backend.
+        """
+        return {
+            "Content-Type": content_type,
+            "x-goog-content-length-range": f"0,{size_bytes}",
+            "x-goog-if-generation-match": "0",
+        }
+
+    def _get_signing_credentials(self) -> service_account.Credentials:
+        """Lazy-load and cache credentials capable of signing URLs.
+
+        With GCS_SA_KEY_PATH set, the key file is loaded once and URLs are
+        signed locally with its private key (no network round-trip, and no
+        extra IAM role beyond object access is required). Otherwise the
+        compute engine identity is wrapped in an IAM signBlob signer; the
+        service account then needs roles/iam.serviceAccountTokenCreator on
+        itself.
+        """
+        if self._signing_credentials is not None:
+            return self._signing_credentials
+
+        with self._signing_lock:
+            if self._signing_credentials is None:
+                if settings.GCS_SA_KEY_PATH:
+                    self._signing_credentials = (
+                        service_account.Credentials.from_service_account_file(
+                            settings.GCS_SA_KEY_PATH
+                        )
+                    )
+                else:
+                    self._signing_credentials = self._create_iam_signing_credentials()
+
+        return self._signing_credentials
+
+    @staticmethod
+    def _create_iam_signing_credentials() -> service_account.Credentials:
+        """Create credentials that sign via the IAM signBlob API."""
+        from google.auth import iam
+        from google.auth.transport import requests as auth_requests
+        from google.auth import compute_engine
+
         # Use compute engine credentials (works in Cloud Run / GCE / GKE)
         # This assumes your prod service is running as a service account.
         credentials = compute_engine.Credentials()
@@ -70,12 +153,12 @@ class GCSStorageBackend(StorageBackend):
         # Create auth request for IAM operations
         auth_request = auth_requests.Request()
 
-        # Refresh to get service account email
+        # Refresh to get service account email; the signer refreshes the
+        # access token itself once it expires
         credentials.refresh(auth_request)
         service_account_email = credentials.service_account_email
 
         # Create IAM signer that uses the signBlob API (no private key file needed)
-        # The service account must have roles/iam.serviceAccountTokenCreator on itself.
         signer = iam.Signer(
             request=auth_request,
             credentials=credentials,
@@ -84,7 +167,7 @@ class GCSStorageBackend(StorageBackend):
 
         # Wrap the IAM signer into a Credentials object that the storage library
         # recognizes as having signing capability.
-        signing_creds = service_account.Credentials(
+        return service_account.Credentials(
             signer=signer,
             service_account_email=service_account_email,
             # Use the default Google OAuth2 token endpoint; we only need this
@@ -93,25 +176,44 @@ class GCSStorageBackend(StorageBackend):
             token_uri="https://oauth2.googleapis.com/token",
         )
 
-        # Generate V4 signed URL for PUT using IAM signing
-        signed_url = blob.generate_signed_url(
-            version="v4",
-            expiration=timedelta(minutes=expiration_minutes),
-            method="PUT",
-            content_type=content_type,
-            headers={"Content-Type": content_type},
-            credentials=signing_creds,
-            service_account_email=service_account_email,
-        )
+    async def generate_signed_upload_urls(
+        self, batch: list[SignedUrlRequest]
+    ) -> list[tuple[str, str]]:
+        """Generate signed upload URLs for a batch of files concurrently.
 
-        return signed_url, blob_path
+        Signing runs on a dedicated thread pool so the event loop is not
+        blocked; results are returned in the same order as batch.
+
+        Returns:
+            List of (signed_url, blob_path) tuples
+        """
+        if self._signing_executor is None:
+            self._signing_executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1, thread_name_prefix="gcs-signer"
+            )
+
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(
+                self._signing_executor,
+                partial(
+                    self.generate_signed_upload_url,
+                    file_id=request.file_id,
+                    file_name=request.file_name,
+                    content_type=request.content_type,
+                    size_bytes=request.size_bytes,
+                    region_id=request.region_id,
+                    expiration_minutes=request.expiration_minutes,
+                ),
+            )
+            for request in batch
+        ]
+        return list(await asyncio.gather(*futures))
 
     def check_file_exists(self, file_id: str, file_name: str, region_id: str) -> bool:
         """Check if file exists in GCS."""
         bucket = self._get_bucket()
-        safe_name = self._sanitize_filename(file_name)
-        # Use uploads/{region_id}/{file_id}_{filename} pattern
-        blob_path = f"uploads/{region_id}/{file_id}_{safe_name}"
+        blob_path = self._blob_path(file_id, file_name, region_id)
         blob = bucket.blob(blob_path)
         return blob.exists()
 
@@ -121,10 +223,7 @@ class GCSStorageBackend(StorageBackend):
         """Upload file to GCS with region_id in path structure."""
         bucket = self._get_bucket()
 
-        safe_name = self._sanitize_filename(file_name)
-        # Use uploads/{region_id}/{file_id}_{filename} pattern
-        # This preserves original filename while allowing MIME Decoder to extract region_id from path
-        blob_path = f"uploads/{region_id}/{file_id}_{safe_name}"
+        blob_path = self._blob_path(file_id, file_name, region_id)
         blob = bucket.blob(blob_path)
 
         # Stream upload in chunks
@@ -136,13 +235,7 @@ class GCSStorageBackend(StorageBackend):
     def get_backend_name(self) -> str:
         return "gcs"
 
-    @staticmethod
-    def _sanitize_filename(filename: str) -> str:
-        """Remove path traversal and dangerous characters."""
-        safe = filename.replace("../", "").replace("..\\", "")
-        safe = safe.replace("/", "_").replace("\\", "_")
-        safe = re.sub(r"[^a-zA-Z0-9._-]", "_", safe)
-        return safe[:255]
+    _sanitize_filename = staticmethod(sanitize_filename)
 
 
 # Singleton instance
@@ -1,25 +1,75 @@
 """Local filesystem storage backend."""
 
-import re
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
 from pathlib import Path
 from typing import BinaryIO
 
+from eduscale.storage._paths import sanitize_filename
 from eduscale.storage.base import StorageBackend
 
+# Buffer size for the user-space copy fallback
+COPY_BUFFER_SIZE = 1 << 20  # 1MB
+
+
+def _copy_to_fd(file_data: BinaryIO, dst_fd: int) -> None:
+    """Copy the remainder of file_data into dst_fd.
+
+    Uses os.sendfile (kernel-space copy) when file_data is backed by a real
+    file descriptor, otherwise falls back to a buffered user-space copy.
+    """
+    # SpooledTemporaryFile.fileno() forces a rollover to disk, so only use the
+    # fd path once the upload has already been spooled to a real file
+    spooled_in_memory = isinstance(file_data, tempfile.SpooledTemporaryFile) and not getattr(
+        file_data, "_rolled", False
+    )
+
+    if hasattr(os, "sendfile") and not spooled_in_memory:
+        try:
+            src_fd = file_data.fileno()
+            offset = file_data.tell()
+            size = os.fstat(src_fd).st_size
+        except (AttributeError, OSError):
+            src_fd = None
+
+        if src_fd is not None:
+            start = offset
+            try:
+                while offset < size:
+                    sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                file_data.seek(offset)
+                return
+            except OSError:
+                # sendfile unsupported for this fd pair; fall back only if
+                # nothing has been written yet
+                if offset != start:
+                    raise
+
+    with open(dst_fd, "wb", buffering=0, closefd=False) as dst:
+        shutil.copyfileobj(file_data, dst, COPY_BUFFER_SIZE)
+
 
 class LocalStorageBackend(StorageBackend):
     """Local filesystem storage backend."""
 
     def __init__(self):
         self.base_path = Path("data/uploads")
+        # Region directories already created by this process
+        self._ensured_dirs: set[str] = set()
+        self._dirs_lock = threading.Lock()
 
     def get_target_path(self, file_id: str, file_name: str, region_id: str) -> str:
         """Generate local target path with region_id structure."""
         safe_name = self._sanitize_filename(file_name)
         # Use uploads/{region_id}/{file_id}_{filename} pattern
         # This preserves original filename while allowing MIME Decoder to extract region_id from path
-        target_path = self.base_path / region_id / f"{file_id}_{safe_name}"
-        return str(target_path)
+        return os.path.join(self.base_path, region_id, f"{file_id}_{safe_name}")
 
     async def store_file(
         self, file_id: str, file_name: str, content_type: str, file_data: BinaryIO, region_id: str
@@ -28,28 +78,45 @@ class LocalStorageBackend(StorageBackend):
         safe_name = self._sanitize_filename(file_name)
         # Use uploads/{region_id}/{file_id}_{filename} pattern
         # This preserves original filename while allowing MIME Decoder to extract region_id from path
-        target_path = self.base_path / region_id / f"{file_id}_{safe_name}"
+        region_dir = os.path.join(self.base_path, region_id)
+        target_path = os.path.join(region_dir, f"{file_id}_{safe_name}")
+
+        # Run blocking filesystem I/O off the event loop
+        await asyncio.to_thread(self._write_file, region_dir, target_path, file_data)
+
+        return target_path
 
-        # Create directory if needed
-        target_path.parent.mkdir(parents=True, exist_ok=True)
+    def _ensure_dir(self, region_dir: str) -> None:
+        """Create region_dir once per process, skipping the mkdir syscall afterwards."""
+        if region_dir in self._ensured_dirs:
+            return
+        with self._dirs_lock:
+            if region_dir not in self._ensured_dirs:
+                os.makedirs(region_dir, exist_ok=True)
+                self._ensured_dirs.add(region_dir)
 
-        # Stream write in chunks
-        with open(target_path, "wb") as f:
-            while chunk := file_data.read(65536):  # 64KB chunks
-                f.write(chunk)
+    def _write_file(self, region_dir: str, target_path: str, file_data: BinaryIO) -> None:
+        """Write file_data to target_path (blocking)."""
+        self._ensure_dir(region_dir)
 
-        return str(target_path)
+        # Copy through a raw fd to avoid double buffering
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        try:
+            dst_fd = os.open(target_path, flags, 0o644)
+        except FileNotFoundError:
+            # Directory was removed after it was cached; recreate it
+            self._ensured_dirs.discard(region_dir)
+            self._ensure_dir(region_dir)
+            dst_fd = os.open(target_path, flags, 0o644)
+        try:
+            _copy_to_fd(file_data, dst_fd)
+        finally:
+            os.close(dst_fd)
 
     def get_backend_name(self) -> str:
         return "local"
 
-    @staticmethod
-    def _sanitize_filename(filename: str) -> str:
-        """Remove path traversal and dangerous characters."""
-        safe = filename.replace("../", "").replace("..\\", "")
-        safe = safe.replace("/", "_").replace("\\", "_")
-        safe = re.sub(r"[^a-zA-Z0-9._-]", "_", safe)
-        return safe[:255]
+    _sanitize_filename = staticmethod(sanitize_filename)
 
 
 # Singleton instance
@@ -1,21 +1,44 @@
 """Upload record tracking store."""
 
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Optional
-from enum import Enum
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from enum import IntEnum
 
+from eduscale.core.config import settings
 
-class UploadStatus(str, Enum):
-    """Upload status enumeration."""
 
-    PENDING = "pending"  # Session created, awaiting file upload
-    COMPLETED = "completed"  # File uploaded and verified
+class UploadStatus(IntEnum):
+    """Upload status enumeration.
 
+    Values are small ints so comparisons and index lookups stay cheap; use
+    to_json/from_json for the external string form.
+    """
 
-@dataclass
+    PENDING = 0  # Session created, awaiting file upload
+    COMPLETED = 1  # File uploaded and verified
+
+    def to_json(self) -> str:
+        """Return the external string form ("pending", "completed")."""
+        return self.name.lower()
+
+    @classmethod
+    def from_json(cls, value: str) -> "UploadStatus":
+        """Parse the external string form."""
+        return cls[value.upper()]
+
+
+@dataclass(slots=True)
 class UploadRecord:
-    """Upload record metadata."""
+    """Upload record metadata.
+
+    Uses __slots__ to keep per-record memory and attribute access cheap when
+    the in-memory store holds many records.
+    """
 
     file_id: str
     region_id: str
@@ -27,17 +50,76 @@ class UploadRecord:
     status: UploadStatus
     created_at: datetime
     completed_at: Optional[datetime] = None
+    content_sha256: Optional[str] = None  # Hex digest of file content, when known
+
+
+class UploadStoreBackend(ABC):
+    """Abstract base class for upload record stores."""
+
+    @abstractmethod
+    def create(self, record: UploadRecord) -> None:
+        """Store a new upload record, replacing any record with the same file_id."""
+        pass
+
+    @abstractmethod
+    def get(self, file_id: str) -> Optional[UploadRecord]:
+        """Retrieve an upload record by file_id."""
+        pass
+
+    @abstractmethod
+    def update_status(
+        self, file_id: str, status: UploadStatus, completed_at: Optional[datetime] = None
+    ) -> None:
+        """Update upload record status."""
+        pass
+
+    @abstractmethod
+    def list_all(self) -> list[UploadRecord]:
+        """List all upload records."""
+        pass
+
+    @abstractmethod
+    def list_by_status(self, status: UploadStatus) -> Iterator[UploadRecord]:
+        """Iterate over upload records with the given status."""
+        pass
 
+    @abstractmethod
+    def list_by_region(self, region_id: str) -> Iterator[UploadRecord]:
+        """Iterate over upload records for the given region."""
+        pass
 
-class UploadStore:
-    """In-memory store for upload records."""
+    @abstractmethod
+    def find_by_hash(self, content_sha256: str, region_id: str) -> Optional[UploadRecord]:
+        """Find a completed upload in the region with the given content hash."""
+        pass
+
+
+class UploadStore(UploadStoreBackend):
+    """In-memory store for upload records (single process only)."""
 
     def __init__(self):
         self._uploads: Dict[str, UploadRecord] = {}
+        # Secondary indexes: key -> set of file_ids (status index is positional)
+        self._by_status: list[set[str]] = [set() for _ in UploadStatus]
+        self._by_region: Dict[str, set[str]] = {}
+        self._by_hash: Dict[str, set[str]] = {}
+        self._lock = threading.Lock()
 
     def create(self, record: UploadRecord) -> None:
         """Store a new upload record."""
-        self._uploads[record.file_id] = record
+        with self._lock:
+            previous = self._uploads.get(record.file_id)
+            if previous is not None:
+                self._by_status[previous.status].discard(previous.file_id)
+                self._by_region[previous.region_id].discard(previous.file_id)
+                if previous.content_sha256:
+                    self._by_hash[previous.content_sha256].discard(previous.file_id)
+
+            self._uploads[record.file_id] = record
+            self._by_status[record.status].add(record.file_id)
+            self._by_region.setdefault(record.region_id, set()).add(record.file_id)
+            if record.content_sha256:
+                self._by_hash.setdefault(record.content_sha256, set()).add(record.file_id)
 
     def get(self, file_id: str) -> Optional[UploadRecord]:
         """Retrieve an upload record by file_id."""
@@ -47,15 +129,217 @@ class UploadStore:
         self, file_id: str, status: UploadStatus, completed_at: Optional[datetime] = None
     ) -> None:
         """Update upload record status."""
-        if file_id in self._uploads:
-            self._uploads[file_id].status = status
+        with self._lock:
+            record = self._uploads.get(file_id)
+            if record is not None:
+                self._by_status[record.status].discard(file_id)
+                self._by_status[status].add(file_id)
+                record.status = status
+                if completed_at:
+                    record.completed_at = completed_at
+
+    def list_all(self) -> list[UploadRecord]:
+        """List all upload records."""
+        with self._lock:
+            return list(self._uploads.values())
+
+    def list_by_status(self, status: UploadStatus) -> Iterator[UploadRecord]:
+        """Iterate over upload records with the given status."""
+        with self._lock:
+            file_ids = tuple(self._by_status[status])
+        yield from self._iter_records(file_ids)
+
+    def list_by_region(self, region_id: str) -> Iterator[UploadRecord]:
+        """Iterate over upload records for the given region."""
+        with self._lock:
+            file_ids = tuple(self._by_region.get(region_id, ()))
+        yield from self._iter_records(file_ids)
+
+    def find_by_hash(self, content_sha256: str, region_id: str) -> Optional[UploadRecord]:
+        """Find a completed upload in the region with the given content hash."""
+        with self._lock:
+            file_ids = tuple(self._by_hash.get(content_sha256, ()))
+        for record in self._iter_records(file_ids):
+            if record.region_id == region_id and record.status == UploadStatus.COMPLETED:
+                return record
+        return None
+
+    def _iter_records(self, file_ids: tuple[str, ...]) -> Iterator[UploadRecord]:
+        """Yield records for a snapshot of file_ids taken from an index."""
+        for file_id in file_ids:
+            record = self._uploads.get(file_id)
+            if record is not None:
+                yield record
+
+
+class SqliteUploadStore(UploadStoreBackend):
+    """SQLite-backed store for upload records.
+
+    The database runs in WAL mode so several worker processes on the same
+    instance can share one file safely.
+    """
+
+    _COLUMNS = (
+        "file_id, region_id, file_name, content_type, size_bytes, "
+        "storage_backend, storage_path, status, created_at, completed_at, content_sha256"
+    )
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Lazy-open the database connection and ensure the schema exists."""
+        if self._conn is None:
+            if self.db_path != ":memory:":
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS uploads (
+                    file_id TEXT PRIMARY KEY,
+                    region_id TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    content_type TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    storage_backend TEXT NOT NULL,
+                    storage_path TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    completed_at TEXT,
+                    content_sha256 TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_status ON uploads (status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_region ON uploads (region_id)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_uploads_hash ON uploads (content_sha256, region_id)"
+            )
+            self._conn = conn
+
+        return self._conn
+
+    def create(self, record: UploadRecord) -> None:
+        """Store a new upload record."""
+        with self._lock:
+            self._get_conn().execute(
+                f"INSERT OR REPLACE INTO uploads ({self._COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.file_id,
+                    record.region_id,
+                    record.file_name,
+                    record.content_type,
+                    record.size_bytes,
+                    record.storage_backend,
+                    record.storage_path,
+                    record.status.to_json(),
+                    record.created_at.isoformat(),
+                    record.completed_at.isoformat() if record.completed_at else None,
+                    record.content_sha256,
+                ),
+            )
+
+    def get(self, file_id: str) -> Optional[UploadRecord]:
+        """Retrieve an upload record by file_id."""
+        with self._lock:
+            row = (
+                self._get_conn()
+                .execute(f"SELECT {self._COLUMNS} FROM uploads WHERE file_id = ?", (file_id,))
+                .fetchone()
+            )
+        return self._row_to_record(row) if row else None
+
+    def update_status(
+        self, file_id: str, status: UploadStatus, completed_at: Optional[datetime] = None
+    ) -> None:
+        """Update upload record status."""
+        with self._lock:
             if completed_at:
-                self._uploads[file_id].completed_at = completed_at
+                self._get_conn().execute(
+                    "UPDATE uploads SET status = ?, completed_at = ? WHERE file_id = ?",
+                    (status.to_json(), completed_at.isoformat(), file_id),
+                )
+            else:
+                self._get_conn().execute(
+                    "UPDATE uploads SET status = ? WHERE file_id = ?",
+                    (status.to_json(), file_id),
+                )
 
     def list_all(self) -> list[UploadRecord]:
         """List all upload records."""
-        return list(self._uploads.values())
+        with self._lock:
+            rows = self._get_conn().execute(f"SELECT {self._COLUMNS} FROM uploads").fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def list_by_status(self, status: UploadStatus) -> Iterator[UploadRecord]:
+        """Iterate over upload records with the given status."""
+        with self._lock:
+            rows = (
+                self._get_conn()
+                .execute(f"SELECT {self._COLUMNS} FROM uploads WHERE status = ?", (status.to_json(),))
+                .fetchall()
+            )
+        for row in rows:
+            yield self._row_to_record(row)
+
+    def list_by_region(self, region_id: str) -> Iterator[UploadRecord]:
+        """Iterate over upload records for the given region."""
+        with self._lock:
+            rows = (
+                self._get_conn()
+                .execute(f"SELECT {self._COLUMNS} FROM uploads WHERE region_id = ?", (region_id,))
+                .fetchall()
+            )
+        for row in rows:
+            yield self._row_to_record(row)
+
+    def find_by_hash(self, content_sha256: str, region_id: str) -> Optional[UploadRecord]:
+        """Find a completed upload in the region with the given content hash."""
+        with self._lock:
+            row = (
+                self._get_conn()
+                .execute(
+                    f"SELECT {self._COLUMNS} FROM uploads "
+                    "WHERE content_sha256 = ? AND region_id = ? AND status = ? LIMIT 1",
+                    (content_sha256, region_id, UploadStatus.COMPLETED.to_json()),
+                )
+                .fetchone()
+            )
+        return self._row_to_record(row) if row else None
+
+    @staticmethod
+    def _row_to_record(row: tuple) -> UploadRecord:
+        """Convert a database row into an UploadRecord."""
+        return UploadRecord(
+            file_id=row[0],
+            region_id=row[1],
+            file_name=row[2],
+            content_type=row[3],
+            size_bytes=row[4],
+            storage_backend=row[5],
+            storage_path=row[6],
+            status=UploadStatus.from_json(row[7]),
+            created_at=datetime.fromisoformat(row[8]),
+            completed_at=datetime.fromisoformat(row[9]) if row[9] else None,
+            content_sha256=row[10],
+        )
+
+
+def create_upload_store() -> UploadStoreBackend:
+    """Return an upload store for the configured backend."""
+    if settings.UPLOAD_STORE_BACKEND == "memory":
+        return UploadStore()
+    elif settings.UPLOAD_STORE_BACKEND == "sqlite":
+        return SqliteUploadStore(settings.UPLOAD_STORE_SQLITE_PATH)
+    else:
+        raise ValueError(f"Unknown upload store backend: {settings.UPLOAD_STORE_BACKEND}")
 
 
 # Singleton instance
-upload_store = UploadStore()
+upload_store = create_upload_store()
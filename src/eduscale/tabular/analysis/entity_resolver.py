@@ -6,18 +6,62 @@ canonical entity IDs from BigQuery dimension tables using fuzzy matching and emb
 
 import hashlib
 import logging
+import math
 import re
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Literal
 
 import numpy as np
-from Levenshtein import distance as levenshtein_distance
-from sklearn.metrics.pairwise import cosine_similarity
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
 
 from eduscale.tabular.concepts import embed_texts
 
 logger = logging.getLogger(__name__)
 
+# Single letter, optionally followed by a period (an initial)
+_INITIAL_RE = re.compile(r"^[а-яa-z]\.?$", re.IGNORECASE)
+
+# Common Russian first names by initial
+_RUSSIAN_FIRST_NAMES = {
+    "а": ["александр", "алексей", "андрей", "анна", "анастасия"],
+    "б": ["борис"],
+    "в": ["владимир", "виктор", "валентина", "вера"],
+    "г": ["григорий", "георгий"],
+    "д": ["дмитрий", "даниил", "дарья"],
+    "е": ["евгений", "елена", "екатерина"],
+    "ж": ["жанна"],
+    "з": ["захар"],
+    "и": ["иван", "игорь", "илья", "ирина"],
+    "к": ["константин"],
+    "л": ["леонид", "людмила"],
+    "м": ["михаил", "максим", "мария", "марина"],
+    "н": ["николай", "наталья"],
+    "о": ["олег", "ольга"],
+    "п": ["павел", "петр", "полина"],
+    "р": ["роман"],
+    "с": ["сергей", "светлана"],
+    "т": ["татьяна", "тимофей"],
+    "у": ["ульяна"],
+    "ф": ["федор"],
+    "ю": ["юрий", "юлия"],
+    "я": ["яков"],
+}
+
+# Storage dtype for entity embedding matrices: half the memory of float64 and
+# BLAS-accelerated (numpy has no BLAS kernels for float16)
+EMBEDDING_DTYPE = np.float32
+
+# Values per RapidFuzz cdist call in resolve_entities_batch (bounds matrix size)
+_BATCH_FUZZY_CHUNK = 256
+
+# Marker for "fuzzy step not precomputed" (None means computed, no match)
+_NOT_COMPUTED = object()
+
+# Entity types held in EntityCache
+ENTITY_TYPES = ("teacher", "student", "parent", "subject", "region", "school")
+
 
 @dataclass
 class EntityMatch:
@@ -34,7 +78,17 @@ class EntityMatch:
 
 @dataclass
 class EntityCache:
-    """In-memory cache of entities for fast lookups during ingestion run."""
+    """In-memory cache of entities for fast lookups during ingestion run.
+
+    Derived lookup structures (length-bucketed names, stacked embedding
+    matrices) are built by build_indexes() or on first use, and rebuilt when a
+    source dict is replaced or changes size. Call invalidate() after editing a
+    dict in place without changing its size.
+
+    Embedding invariant: once a type's matrix has been built, its
+    *_embeddings values are unit vectors and views into that matrix, so cosine
+    similarity is a plain dot product.
+    """
 
     # Name-based lookups (normalized_name -> entity_id)
     teachers: dict[str, str] = field(default_factory=dict)
@@ -63,10 +117,112 @@ class EntityCache:
     # Reverse lookup (entity_id -> entity_name)
     entity_names: dict[str, str] = field(default_factory=dict)
 
-
+    # Stacked embedding matrices (entity_type -> (source dict, size, ids, matrix))
+    _embedding_matrices: dict[str, tuple[dict, int, list[str], np.ndarray]] = field(
+        default_factory=dict, repr=False
+    )
+    # Names bucketed by length (entity_type -> (source dict, size, buckets))
+    _name_buckets: dict[str, tuple[dict, int, dict[int, list[str]]]] = field(
+        default_factory=dict, repr=False
+    )
+    # Memoized resolve_entity results (see resolve_entity for the key)
+    _resolve_memo: dict[tuple, "EntityMatch"] = field(default_factory=dict, repr=False)
+    # Matrix stacked across all types (per-type matrices, types, ids, matrix)
+    _all_embeddings: tuple | None = field(default=None, repr=False)
+
+    def embedding_matrix(self, entity_type: str) -> tuple[list[str], np.ndarray]:
+        """Get entity IDs and their stacked, L2-normalized embeddings.
+
+        The (N, D) matrix is built on first use and rebuilt only when the
+        embedding dict for the type is replaced or changes size.
+
+        Args:
+            entity_type: Type of entity
+
+        Returns:
+            Tuple of (entity_ids, matrix) where row i belongs to entity_ids[i]
+        """
+        _, _, embeddings = _get_cache_dicts(self, entity_type)
+        cached = self._embedding_matrices.get(entity_type)
+        if cached is None or cached[0] is not embeddings or cached[1] != len(embeddings):
+            entity_ids = list(embeddings)
+            if entity_ids:
+                stacked = np.vstack(list(embeddings.values())).astype(EMBEDDING_DTYPE, copy=False)
+                matrix = normalize_rows(stacked)
+                # Share rows with the matrix so dict values are normalized too
+                embeddings.update(zip(entity_ids, matrix))
+            else:
+                matrix = np.empty((0, 0), dtype=EMBEDDING_DTYPE)
+            cached = (embeddings, len(embeddings), entity_ids, matrix)
+            self._embedding_matrices[entity_type] = cached
+        return cached[2], cached[3]
+
+    def name_buckets(self, entity_type: str) -> dict[int, list[str]]:
+        """Get normalized names for entity_type bucketed by length.
+
+        Built on first use and rebuilt only when the name dict is replaced or
+        changes size.
+
+        Args:
+            entity_type: Type of entity
+
+        Returns:
+            Dict of name length -> names of that length
+        """
+        name_cache, _, _ = _get_cache_dicts(self, entity_type)
+        cached = self._name_buckets.get(entity_type)
+        if cached is None or cached[0] is not name_cache or cached[1] != len(name_cache):
+            buckets: dict[int, list[str]] = {}
+            for name in name_cache:
+                buckets.setdefault(len(name), []).append(name)
+            cached = (name_cache, len(name_cache), buckets)
+            self._name_buckets[entity_type] = cached
+        return cached[2]
+
+    def all_embeddings(self) -> tuple[list[str], list[str], np.ndarray]:
+        """Get embeddings for every entity type stacked into one matrix.
+
+        Returns:
+            Tuple of (entity_types, entity_ids, matrix) where row i belongs to
+            entity_ids[i] of type entity_types[i]
+        """
+        parts = [(entity_type, *self.embedding_matrix(entity_type)) for entity_type in ENTITY_TYPES]
+        matrices = tuple(matrix for _, _, matrix in parts)
+
+        cached = self._all_embeddings
+        if cached is None or any(a is not b for a, b in zip(cached[0], matrices)):
+            entity_types = []
+            entity_ids = []
+            for entity_type, ids, _ in parts:
+                entity_types.extend([entity_type] * len(ids))
+                entity_ids.extend(ids)
+            non_empty = [matrix for _, ids, matrix in parts if ids]
+            matrix = np.vstack(non_empty) if non_empty else np.empty((0, 0), EMBEDDING_DTYPE)
+            cached = (matrices, entity_types, entity_ids, matrix)
+            self._all_embeddings = cached
+        return cached[1], cached[2], cached[3]
+
+    def build_indexes(self) -> None:
+        """Build name buckets and normalized embedding matrices for all types."""
+        for entity_type in ENTITY_TYPES:
+            self.name_buckets(entity_type)
+            self.embedding_matrix(entity_type)
+        self.all_embeddings()
+
+    def invalidate(self) -> None:
+        """Drop derived lookup structures so they are rebuilt on next use."""
+        self._embedding_matrices.clear()
+        self._name_buckets.clear()
+        self._all_embeddings = None
+        self._resolve_memo.clear()
+
+
+@lru_cache(maxsize=100_000)
 def normalize_name(name: str) -> str:
     """Normalize name for matching.
 
+    Results are memoized since the same names recur across many rows.
+
     Args:
         name: Input name
 
@@ -83,19 +239,9 @@ def normalize_name(name: str) -> str:
     if not name:
         return ""
 
-    # Convert to lowercase
-    normalized = name.lower()
-
-    # Remove periods (common in initials)
-    normalized = normalized.replace(".", "")
-
-    # Replace multiple spaces with single space
-    normalized = re.sub(r"\s+", " ", normalized)
-
-    # Strip leading/trailing whitespace
-    normalized = normalized.strip()
-
-    return normalized
+    # Lowercase and remove periods (common in initials), then collapse and
+    # strip whitespace in one split/join pass
+    return " ".join(name.lower().replace(".", "").split())
 
 
 def expand_initials(name: str, region_id: str) -> list[str]:
@@ -111,56 +257,23 @@ def expand_initials(name: str, region_id: str) -> list[str]:
     Example:
         "И. Петров" -> ["иван петров", "игорь петров", "илья петров"]
     """
-    # Check if name contains single-letter initials
+    return list(_expand_initials(name, region_id))
+
+
+@lru_cache(maxsize=100_000)
+def _expand_initials(name: str, region_id: str) -> tuple[str, ...]:
+    """Memoized implementation of expand_initials returning an immutable tuple."""
+    # Check if first part is a single-letter initial
     parts = name.split()
-    if not parts:
-        return []
-
-    # Look for single letter or single letter with period
-    initial_pattern = re.compile(r"^[а-яa-z]\.?$", re.IGNORECASE)
-
-    candidates = []
-
-    # Common Russian first names by initial
-    russian_names = {
-        "а": ["александр", "алексей", "андрей", "анна", "анастасия"],
-        "б": ["борис"],
-        "в": ["владимир", "виктор", "валентина", "вера"],
-        "г": ["григорий", "георгий"],
-        "д": ["дмитрий", "даниил", "дарья"],
-        "е": ["евгений", "елена", "екатерина"],
-        "ж": ["жанна"],
-        "з": ["захар"],
-        "и": ["иван", "игорь", "илья", "ирина"],
-        "к": ["константин"],
-        "л": ["леонид", "людмила"],
-        "м": ["михаил", "максим", "мария", "марина"],
-        "н": ["николай", "наталья"],
-        "о": ["олег", "ольга"],
-        "п": ["павел", "петр", "полина"],
-        "р": ["роман"],
-        "с": ["сергей", "светлана"],
-        "т": ["татьяна", "тимофей"],
-        "у": ["ульяна"],
-        "ф": ["федор"],
-        "ю": ["юрий", "юлия"],
-        "я": ["яков"],
-    }
-
-    # Check if first part is an initial
-    if len(parts) >= 2 and initial_pattern.match(parts[0]):
-        initial = normalize_name(parts[0])[0]  # Get first letter
-        last_name = " ".join(parts[1:])
-
-        # Get common names for this initial
-        first_names = russian_names.get(initial, [])
-
-        # Generate candidates
-        for first_name in first_names[:5]:  # Max 5 candidates
-            candidate = f"{first_name} {normalize_name(last_name)}"
-            candidates.append(candidate)
-
-    return candidates
+    if len(parts) < 2 or not _INITIAL_RE.match(parts[0]):
+        return ()
+
+    initial = normalize_name(parts[0])[0]  # Get first letter
+    last_name = normalize_name(" ".join(parts[1:]))
+
+    # Generate candidates from common names for this initial (max 5)
+    first_names = _RUSSIAN_FIRST_NAMES.get(initial, [])
+    return tuple(f"{first_name} {last_name}" for first_name in first_names[:5])
 
 
 def resolve_entity(
@@ -184,7 +297,8 @@ def resolve_entity(
         threshold_embedding: Threshold for embedding matching (default: 0.75)
 
     Returns:
-        EntityMatch with match_method="NEW" if no match found
+        EntityMatch with match_method="NEW" if no match found. Matches are
+        memoized on the cache and shared between calls; treat as read-only.
 
     Algorithm:
         1. If value_type == "id": Check cache for exact ID match
@@ -207,7 +321,247 @@ def resolve_entity(
             source_value=source_value,
         )
 
-    # Get appropriate cache dictionaries
+    return _resolve_memoized(
+        source_value,
+        entity_type,
+        region_id,
+        cache,
+        value_type,
+        threshold_fuzzy,
+        threshold_embedding,
+    )
+
+
+def resolve_entities_batch(
+    source_values: list[str],
+    entity_type: str,
+    region_id: str,
+    cache: EntityCache,
+    value_type: Literal["id", "name"] = "name",
+    threshold_fuzzy: float = 0.85,
+    threshold_embedding: float = 0.75,
+) -> list[EntityMatch]:
+    """Resolve many values of one entity type.
+
+    Equivalent to calling resolve_entity for each value, but the fuzzy step
+    for all values that need it runs as one multi-threaded RapidFuzz cdist
+    call. Results are memoized on the cache like resolve_entity.
+
+    Args:
+        source_values: Source IDs or names
+        entity_type: Type of entity (teacher, student, parent, region, subject, school)
+        region_id: Region ID for context
+        cache: Entity cache with loaded entities
+        value_type: Whether source_values are "id" or "name"
+        threshold_fuzzy: Threshold for fuzzy matching (default: 0.85)
+        threshold_embedding: Threshold for embedding matching (default: 0.75)
+
+    Returns:
+        EntityMatch per source value, in input order
+    """
+    name_cache, id_cache, embedding_cache = _get_cache_dicts(cache, entity_type)
+
+    # Values that will reach the fuzzy step: not memoized, no exact match
+    pending: dict[str, str] = {}
+    for value in source_values:
+        if not value or value in pending:
+            continue
+        memo_key = _memo_key(
+            entity_type,
+            value,
+            region_id,
+            value_type,
+            threshold_fuzzy,
+            threshold_embedding,
+            name_cache,
+            id_cache,
+            embedding_cache,
+        )
+        if memo_key in cache._resolve_memo:
+            continue
+        if value_type == "id" and value in id_cache:
+            continue
+        normalized = normalize_name(value)
+        if normalized not in name_cache:
+            pending[value] = normalized
+
+    fuzzy_matches: dict[str, tuple[str, float] | None] = {}
+    if pending:
+        names = list(name_cache)
+        values = list(pending)
+        for start in range(0, len(values), _BATCH_FUZZY_CHUNK):
+            chunk = values[start : start + _BATCH_FUZZY_CHUNK]
+            if not names:
+                fuzzy_matches.update(dict.fromkeys(chunk))
+                continue
+            scores = process.cdist(
+                [pending[value] for value in chunk],
+                names,
+                scorer=Levenshtein.normalized_similarity,
+                score_cutoff=threshold_fuzzy,
+                dtype=np.float64,
+                workers=-1,
+            )
+            best = scores.argmax(axis=1)
+            for value, row, idx in zip(chunk, scores, best):
+                score = float(row[idx])
+                if score >= threshold_fuzzy:
+                    fuzzy_matches[value] = (name_cache[names[idx]], score)
+                else:
+                    fuzzy_matches[value] = None
+
+    matches = []
+    for value in source_values:
+        if not value:
+            matches.append(resolve_entity(value, entity_type, region_id, cache, value_type))
+            continue
+        matches.append(
+            _resolve_memoized(
+                value,
+                entity_type,
+                region_id,
+                cache,
+                value_type,
+                threshold_fuzzy,
+                threshold_embedding,
+                fuzzy_matches.get(value, _NOT_COMPUTED),
+            )
+        )
+    return matches
+
+
+def resolve_entities_multi(
+    source_values: list[str],
+    entity_types: list[str],
+    region_id: str,
+    cache: EntityCache,
+    value_type: Literal["id", "name"] = "name",
+    threshold_fuzzy: float = 0.85,
+    threshold_embedding: float = 0.75,
+) -> list[EntityMatch | None]:
+    """Resolve many values against several entity types, keeping the best match.
+
+    Runs one resolve_entities_batch call per type. Values that already have
+    an exact match (score 1.0) are not sent to the remaining types, since
+    no later match can beat it.
+
+    Args:
+        source_values: Source IDs or names
+        entity_types: Entity types to try, in order of preference on ties
+        region_id: Region ID for context
+        cache: Entity cache with loaded entities
+        value_type: Whether source_values are "id" or "name"
+        threshold_fuzzy: Threshold for fuzzy matching (default: 0.85)
+        threshold_embedding: Threshold for embedding matching (default: 0.75)
+
+    Returns:
+        Per source value, in input order, the match with the highest
+        similarity score across entity_types, or None if no type matched
+        with a positive score
+    """
+    best: list[EntityMatch | None] = [None] * len(source_values)
+    pending = list(range(len(source_values)))
+
+    for entity_type in entity_types:
+        if not pending:
+            break
+        matches = resolve_entities_batch(
+            [source_values[i] for i in pending],
+            entity_type,
+            region_id,
+            cache,
+            value_type,
+            threshold_fuzzy,
+            threshold_embedding,
+        )
+        for i, match in zip(pending, matches):
+            current = best[i]
+            if match.similarity_score > (current.similarity_score if current else 0.0):
+                best[i] = match
+        pending = [i for i in pending if best[i] is None or best[i].similarity_score < 1.0]
+
+    return best
+
+
+def _memo_key(
+    entity_type: str,
+    source_value: str,
+    region_id: str,
+    value_type: str,
+    threshold_fuzzy: float,
+    threshold_embedding: float,
+    name_cache: dict,
+    id_cache: dict,
+    embedding_cache: dict,
+) -> tuple:
+    """Build the resolution memo key; cache sizes catch entities added since."""
+    return (
+        entity_type,
+        source_value,
+        region_id,
+        value_type,
+        threshold_fuzzy,
+        threshold_embedding,
+        len(name_cache),
+        len(id_cache),
+        len(embedding_cache),
+    )
+
+
+def _resolve_memoized(
+    source_value: str,
+    entity_type: str,
+    region_id: str,
+    cache: EntityCache,
+    value_type: Literal["id", "name"],
+    threshold_fuzzy: float,
+    threshold_embedding: float,
+    precomputed_fuzzy: tuple[str, float] | None | object = _NOT_COMPUTED,
+) -> EntityMatch:
+    """Resolve a non-empty value, reusing a memoized match when the cache is unchanged."""
+    name_cache, id_cache, embedding_cache = _get_cache_dicts(cache, entity_type)
+    memo_key = _memo_key(
+        entity_type,
+        source_value,
+        region_id,
+        value_type,
+        threshold_fuzzy,
+        threshold_embedding,
+        name_cache,
+        id_cache,
+        embedding_cache,
+    )
+    match = cache._resolve_memo.get(memo_key)
+    if match is None:
+        match = _resolve_uncached(
+            source_value,
+            entity_type,
+            region_id,
+            cache,
+            value_type,
+            threshold_fuzzy,
+            threshold_embedding,
+            precomputed_fuzzy,
+        )
+        cache._resolve_memo[memo_key] = match
+    return match
+
+
+def _resolve_uncached(
+    source_value: str,
+    entity_type: str,
+    region_id: str,
+    cache: EntityCache,
+    value_type: Literal["id", "name"],
+    threshold_fuzzy: float,
+    threshold_embedding: float,
+    precomputed_fuzzy: tuple[str, float] | None | object = _NOT_COMPUTED,
+) -> EntityMatch:
+    """Run the resolve_entity matching steps without memoization.
+
+    precomputed_fuzzy, if not _NOT_COMPUTED, is the step 4 result from a
+    batched fuzzy match.
+    """
     name_cache, id_cache, embedding_cache = _get_cache_dicts(cache, entity_type)
 
     # Step 1: ID exact match
@@ -244,7 +598,12 @@ def resolve_entity(
         )
 
     # Step 4: Fuzzy matching
-    best_fuzzy_match = _fuzzy_match(normalized, name_cache, threshold_fuzzy)
+    if precomputed_fuzzy is not _NOT_COMPUTED:
+        best_fuzzy_match = precomputed_fuzzy
+    else:
+        best_fuzzy_match = _fuzzy_match(
+            normalized, name_cache, threshold_fuzzy, cache.name_buckets(entity_type)
+        )
     if best_fuzzy_match:
         canonical_id, score = best_fuzzy_match
         entity_name = cache.entity_names.get(canonical_id, "")
@@ -279,8 +638,9 @@ def resolve_entity(
 
     # Step 6: Embedding-based matching
     if embedding_cache:
+        entity_ids, embedding_matrix = cache.embedding_matrix(entity_type)
         best_embedding_match = _embedding_match(
-            source_value, embedding_cache, cache.entity_names, threshold_embedding
+            source_value, entity_ids, embedding_matrix, threshold_embedding
         )
         if best_embedding_match:
             canonical_id, score = best_embedding_match
@@ -374,7 +734,10 @@ def _get_cache_dicts(
 
 
 def _fuzzy_match(
-    normalized_name: str, name_cache: dict[str, str], threshold: float
+    normalized_name: str,
+    name_cache: dict[str, str],
+    threshold: float,
+    name_buckets: dict[int, list[str]] | None = None,
 ) -> tuple[str, float] | None:
     """Find best fuzzy match using Levenshtein distance.
 
@@ -382,70 +745,109 @@ def _fuzzy_match(
         normalized_name: Normalized input name
         name_cache: Cache of normalized_name -> entity_id
         threshold: Minimum similarity threshold (0-1)
+        name_buckets: Names of name_cache bucketed by length; when given, only
+            lengths that can reach the threshold are scored
 
     Returns:
         Tuple of (entity_id, similarity_score) or None if no match
     """
-    best_match = None
-    best_score = 0.0
+    choices = name_cache.keys()
+    if name_buckets is not None and threshold > 0:
+        # Distance is at least the length difference, so a name of length L
+        # can only reach the threshold if threshold * |q| <= L <= |q| / threshold
+        query_len = len(normalized_name)
+        min_len = math.ceil(threshold * query_len - 1e-9)
+        max_len = math.floor(query_len / threshold + 1e-9)
+        choices = [
+            name
+            for length, names in name_buckets.items()
+            if min_len <= length <= max_len
+            for name in names
+        ]
+
+    # Normalized Levenshtein similarity (1 - distance / max_len), scanned in
+    # C++ with early exit below the cutoff; ties resolve to the first name
+    best = process.extractOne(
+        normalized_name,
+        choices,
+        scorer=Levenshtein.normalized_similarity,
+        score_cutoff=threshold,
+    )
+    if best is None:
+        return None
 
-    for cached_name, entity_id in name_cache.items():
-        # Compute Levenshtein distance
-        distance = levenshtein_distance(normalized_name, cached_name)
+    cached_name, similarity, _ = best
+    if cached_name not in name_cache:
+        # Buckets are stale (name dict mutated in place); rescan without them
+        return _fuzzy_match(normalized_name, name_cache, threshold)
+    return name_cache[cached_name], similarity
 
-        # Convert to similarity score (0-1)
-        max_len = max(len(normalized_name), len(cached_name))
-        if max_len == 0:
-            continue
 
-        similarity = 1.0 - (distance / max_len)
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row of a 2D matrix (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
 
-        if similarity >= threshold and similarity > best_score:
-            best_score = similarity
-            best_match = (entity_id, similarity)
 
-    return best_match
+def _is_unit_or_zero(vector: np.ndarray) -> bool:
+    """Check that a vector has L2 norm ~1 (or is all zeros)."""
+    norm = float(np.linalg.norm(vector))
+    return norm < 1e-6 or abs(norm - 1.0) < 1e-3
+
+
+def cosine_scores(embedding_matrix: np.ndarray, query_embedding: np.ndarray) -> np.ndarray:
+    """Cosine similarity of a query against every row of a normalized matrix.
+
+    The query is normalized and cast to the matrix dtype so the product runs
+    as a single BLAS matrix-vector call without upcasting the matrix.
+
+    Args:
+        embedding_matrix: L2-normalized (N, D) matrix
+        query_embedding: (D,) query vector (any norm)
+
+    Returns:
+        (N,) array of similarity scores
+    """
+    # Cheap spot-check of the unit-norm invariant (stripped under python -O)
+    assert len(embedding_matrix) == 0 or _is_unit_or_zero(embedding_matrix[0]), (
+        "embedding_matrix rows must be L2-normalized"
+    )
+    norm = max(float(np.linalg.norm(query_embedding)), 1e-12)
+    query = np.asarray(query_embedding / norm, dtype=embedding_matrix.dtype)
+    return embedding_matrix @ query
 
 
 def _embedding_match(
     source_value: str,
-    embedding_cache: dict[str, np.ndarray],
-    entity_names: dict[str, str],
+    entity_ids: list[str],
+    embedding_matrix: np.ndarray,
     threshold: float,
 ) -> tuple[str, float] | None:
     """Find best match using embedding similarity.
 
     Args:
         source_value: Source name/value
-        embedding_cache: Cache of entity_id -> embedding
-        entity_names: Cache of entity_id -> entity_name
+        entity_ids: Entity IDs, one per row of embedding_matrix
+        embedding_matrix: L2-normalized (N, D) entity embeddings
         threshold: Minimum similarity threshold (0-1)
 
     Returns:
         Tuple of (entity_id, similarity_score) or None if no match
     """
-    if not embedding_cache:
+    if not entity_ids:
         return None
 
     # Generate embedding for source value
     source_embedding = embed_texts([source_value])[0]
 
-    best_match = None
-    best_score = 0.0
-
-    for entity_id, cached_embedding in embedding_cache.items():
-        # Compute cosine similarity
-        similarity = float(
-            cosine_similarity(
-                source_embedding.reshape(1, -1), cached_embedding.reshape(1, -1)
-            )[0][0]
-        )
-
-        if similarity >= threshold and similarity > best_score:
-            best_score = similarity
-            best_match = (entity_id, similarity)
+    # Cosine similarity against every cached entity in one matrix-vector product
+    scores = cosine_scores(embedding_matrix, source_embedding)
+    best_idx = int(scores.argmax())
+    best_score = float(scores[best_idx])
 
-    return best_match
+    if best_score >= threshold:
+        return entity_ids[best_idx], best_score
+    return None
 
 
 def load_entity_cache(region_id: str) -> EntityCache:
@@ -606,6 +1008,8 @@ def load_entity_cache(region_id: str) -> EntityCache:
         
     except Exception as e:
         logger.warning(f"Failed to load entity cache from BigQuery: {e}")
+
+    cache.build_indexes()
     
     logger.info(
         f"Loaded entity cache: "
@@ -4,17 +4,20 @@ This module analyzes feedback text to identify mentioned entities (teachers, stu
 subjects, etc.) and creates FeedbackTarget records linking feedback to entities.
 """
 
+import heapq
 import logging
 from dataclasses import dataclass
 from typing import Literal
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
 
 from eduscale.core.config import settings
 from eduscale.tabular.analysis.entity_resolver import (
     EntityCache,
+    cosine_scores,
+    normalize_rows,
+    resolve_entities_batch,
     resolve_entity,
 )
 from eduscale.tabular.analysis.llm_client import LLMClient
@@ -23,6 +26,15 @@ from eduscale.tabular.pipeline import FrontmatterData
 
 logger = logging.getLogger(__name__)
 
+# Entity types _resolve_entity_mention resolves for each LLM type hint.
+# Locations stop at region: resolve_entity always yields an ID, so the
+# school fallback is never reached.
+_HINT_ENTITY_TYPES = {
+    "person": ("teacher", "student", "parent"),
+    "subject": ("subject",),
+    "location": ("region",),
+}
+
 
 @dataclass
 class FeedbackTarget:
@@ -81,52 +93,90 @@ def analyze_feedback_batch(
     all_targets = []
     llm_client = LLMClient()
 
-    for idx, row in df_feedback.iterrows():
-        feedback_id = row["feedback_id"]
-        feedback_text = row.get("feedback_text", "")
-
-        if not feedback_text or not isinstance(feedback_text, str):
+    rows = []
+    for feedback_id, feedback_text in zip(
+        df_feedback["feedback_id"].tolist(), df_feedback["feedback_text"].tolist()
+    ):
+        if not _is_valid_text(feedback_text):
             logger.debug(f"Skipping feedback {feedback_id}: empty or invalid text")
             continue
+        rows.append((feedback_id, feedback_text))
+
+    # Embed all valid feedback texts in one batch and score them against every
+    # cached entity in one matrix product instead of per row
+    similarity_matrix = None
+    if settings.FEEDBACK_ANALYSIS_ENABLED and rows:
+        try:
+            similarity_matrix = _batch_similarity_scores(
+                [feedback_text for _, feedback_text in rows], entity_cache
+            )
+        except Exception as e:
+            logger.warning(f"Batch embedding of feedback texts failed: {e}")
+
+    # Extract entity mentions for all rows first so they can be resolved in
+    # batches per entity type
+    mentions_by_row: list[list[dict]] = [[] for _ in rows]
+    if settings.LLM_ENABLED:
+        try:
+            # Fan the per-row requests out concurrently instead of one round-trip at a time
+            mentions_by_row = llm_client.extract_entities_many(
+                [feedback_text for _, feedback_text in rows]
+            )
+            logger.debug(
+                f"Extracted {sum(len(m) for m in mentions_by_row)} entity mentions "
+                f"from {len(rows)} feedback records"
+            )
+        except Exception as e:
+            logger.warning(f"LLM entity extraction failed: {e}")
+            mentions_by_row = [[] for _ in rows]
+
+        try:
+            _prefetch_entity_mentions(mentions_by_row, region_id, entity_cache)
+        except Exception as e:
+            logger.warning(f"Batch entity resolution failed: {e}")
 
+    for row_idx, (feedback_id, feedback_text) in enumerate(rows):
         logger.debug(f"Processing feedback {feedback_id}: {len(feedback_text)} chars")
 
-        # Step 1: Extract entity mentions using LLM
+        # Step 1-2: Resolve entity mentions extracted by the LLM
         targets_from_llm = []
-        if settings.LLM_ENABLED:
-            try:
-                entities = llm_client.extract_entities(feedback_text)
-                logger.debug(f"Extracted {len(entities)} entity mentions from feedback {feedback_id}")
-
-                # Step 2: Apply entity resolution to each mention
-                for entity in entities:
-                    entity_text = entity.get("text", "")
-                    entity_type_hint = entity.get("type", "")
-
-                    if not entity_text:
-                        continue
-
-                    # Resolve entity based on type hint
-                    resolved_targets = _resolve_entity_mention(
-                        entity_text=entity_text,
-                        entity_type_hint=entity_type_hint,
-                        feedback_id=feedback_id,
-                        region_id=region_id,
-                        entity_cache=entity_cache,
-                    )
-                    targets_from_llm.extend(resolved_targets)
+        try:
+            for entity in mentions_by_row[row_idx]:
+                entity_text = entity.get("text", "")
+                entity_type_hint = entity.get("type", "")
+
+                if not entity_text:
+                    continue
+
+                # Resolve entity based on type hint
+                resolved_targets = _resolve_entity_mention(
+                    entity_text=entity_text,
+                    entity_type_hint=entity_type_hint,
+                    feedback_id=feedback_id,
+                    region_id=region_id,
+                    entity_cache=entity_cache,
+                )
+                targets_from_llm.extend(resolved_targets)
 
-            except Exception as e:
-                logger.warning(f"LLM entity extraction failed for feedback {feedback_id}: {e}")
+        except Exception as e:
+            logger.warning(f"Entity resolution failed for feedback {feedback_id}: {e}")
 
-        # Step 3: Generate embedding for full feedback text
+        # Step 3: Match full feedback text by embedding, unless the LLM already
+        # filled the target quota with high-confidence matches
         targets_from_embedding = []
-        if settings.FEEDBACK_ANALYSIS_ENABLED:
+        if settings.FEEDBACK_ANALYSIS_ENABLED and not _has_enough_high_targets(
+            targets_from_llm, settings.MAX_TARGETS_PER_FEEDBACK
+        ):
             try:
                 targets_from_embedding = _embedding_based_matching(
                     feedback_text=feedback_text,
                     feedback_id=feedback_id,
                     entity_cache=entity_cache,
+                    precomputed_scores=(
+                        similarity_matrix[row_idx]
+                        if similarity_matrix is not None
+                        else None
+                    ),
                 )
             except Exception as e:
                 logger.warning(f"Embedding-based matching failed for feedback {feedback_id}: {e}")
@@ -154,6 +204,51 @@ def analyze_feedback_batch(
     return all_targets
 
 
+def _is_valid_text(feedback_text: object) -> bool:
+    """Check that feedback text is a non-empty string."""
+    return bool(feedback_text) and isinstance(feedback_text, str)
+
+
+def _has_enough_high_targets(targets: list[FeedbackTarget], max_targets: int) -> bool:
+    """Check whether targets already hold max_targets distinct HIGH-confidence entities."""
+    high = {(t.target_type, t.target_id) for t in targets if t.confidence == "HIGH"}
+    return len(high) >= max_targets
+
+
+def _prefetch_entity_mentions(
+    mentions_by_row: list[list[dict]],
+    region_id: str,
+    entity_cache: EntityCache,
+) -> None:
+    """Resolve all LLM mentions in batches, one call per entity type.
+
+    Results are memoized on the entity cache, so the per-mention
+    resolve_entity calls in _resolve_entity_mention become lookups.
+
+    Args:
+        mentions_by_row: LLM entity mentions per feedback row
+        region_id: Region ID
+        entity_cache: Entity cache
+    """
+    texts_by_type: dict[str, list[str]] = {}
+    for entities in mentions_by_row:
+        for entity in entities:
+            entity_text = entity.get("text", "")
+            if not entity_text:
+                continue
+            for entity_type in _HINT_ENTITY_TYPES.get(entity.get("type", ""), ()):
+                texts_by_type.setdefault(entity_type, []).append(entity_text)
+
+    for entity_type, texts in texts_by_type.items():
+        resolve_entities_batch(
+            source_values=texts,
+            entity_type=entity_type,
+            region_id=region_id,
+            cache=entity_cache,
+            value_type="name",
+        )
+
+
 def _resolve_entity_mention(
     entity_text: str,
     entity_type_hint: str,
@@ -250,60 +345,88 @@ def _resolve_entity_mention(
     return targets
 
 
+def _batch_similarity_scores(texts: list[str], entity_cache: EntityCache) -> np.ndarray:
+    """Embed texts in one call and score them against all cached entities.
+
+    Args:
+        texts: Feedback texts
+        entity_cache: Entity cache with embeddings
+
+    Returns:
+        (len(texts), N) cosine similarity matrix, columns ordered as
+        entity_cache.all_embeddings()
+    """
+    # Nothing to score against: skip the embedding model entirely
+    _, entity_ids, embedding_matrix = entity_cache.all_embeddings()
+    if not entity_ids:
+        return np.empty((len(texts), 0))
+
+    # Embed each distinct text once; canned responses repeat often
+    unique_rows: dict[str, int] = {}
+    inverse = [unique_rows.setdefault(text, len(unique_rows)) for text in texts]
+
+    feedback_embeddings = np.asarray(embed_texts(list(unique_rows)))
+
+    feedback_matrix = normalize_rows(feedback_embeddings).astype(
+        embedding_matrix.dtype, copy=False
+    )
+    return (feedback_matrix @ embedding_matrix.T)[inverse]
+
+
 def _embedding_based_matching(
     feedback_text: str,
     feedback_id: str,
     entity_cache: EntityCache,
+    precomputed_scores: np.ndarray | None = None,
 ) -> list[FeedbackTarget]:
     """Find entity matches using embedding similarity.
 
+    Only the top MAX_TARGETS_PER_FEEDBACK matches above the threshold are
+    returned, since _select_top_targets would drop the rest anyway.
+
     Args:
         feedback_text: Feedback text
         feedback_id: Feedback ID
         entity_cache: Entity cache with embeddings
+        precomputed_scores: Row of _batch_similarity_scores for feedback_text;
+            computed here if not provided
 
     Returns:
         List of FeedbackTarget records
     """
     targets = []
 
-    # Generate embedding for feedback text
-    feedback_embedding = embed_texts([feedback_text])[0]
-
-    # Check similarity with all entity types
-    entity_types = [
-        ("teacher", entity_cache.teacher_embeddings),
-        ("student", entity_cache.student_embeddings),
-        ("parent", entity_cache.parent_embeddings),
-        ("subject", entity_cache.subject_embeddings),
-        ("region", entity_cache.region_embeddings),
-        ("school", entity_cache.school_embeddings),
-    ]
-
-    for entity_type, embedding_cache in entity_types:
-        if not embedding_cache:
-            continue
+    entity_types, entity_ids, embedding_matrix = entity_cache.all_embeddings()
 
-        for entity_id, entity_embedding in embedding_cache.items():
-            # Compute cosine similarity
-            similarity = float(
-                cosine_similarity(
-                    feedback_embedding.reshape(1, -1),
-                    entity_embedding.reshape(1, -1),
-                )[0][0]
-            )
+    # Without entity embeddings there is nothing to match; skip the model call
+    if not entity_ids:
+        return targets
 
-            # Only include if above threshold
-            if similarity >= settings.FEEDBACK_TARGET_THRESHOLD:
-                confidence = _score_to_confidence(similarity)
-                target = FeedbackTarget(
-                    feedback_id=feedback_id,
-                    target_type=entity_type,
-                    target_id=entity_id,
-                    relevance_score=similarity,
-                    confidence=confidence,
-                )
-                targets.append(target)
+    if precomputed_scores is not None:
+        scores = precomputed_scores
+    else:
+        # Generate embedding for feedback text
+        feedback_embedding = embed_texts([feedback_text])[0]
+        scores = cosine_scores(embedding_matrix, feedback_embedding)
+
+    # Only include if above threshold, keeping the top-N without a full sort
+    candidates = np.flatnonzero(scores >= settings.FEEDBACK_TARGET_THRESHOLD)
+    max_targets = settings.MAX_TARGETS_PER_FEEDBACK
+    if 0 < max_targets < len(candidates):
+        top = np.argpartition(-scores[candidates], max_targets - 1)[:max_targets]
+        candidates = np.sort(candidates[top])
+
+    for idx in candidates:
+        similarity = float(scores[idx])
+        confidence = _score_to_confidence(similarity)
+        target = FeedbackTarget(
+            feedback_id=feedback_id,
+            target_type=entity_types[idx],
+            target_id=entity_ids[idx],
+            relevance_score=similarity,
+            confidence=confidence,
+        )
+        targets.append(target)
 
     return targets
 
@@ -350,11 +473,9 @@ def _select_top_targets(
     Returns:
         Top N targets sorted by relevance score
     """
-    # Sort by relevance score descending
-    sorted_targets = sorted(targets, key=lambda t: t.relevance_score, reverse=True)
-
-    # Return top N
-    return sorted_targets[:max_targets]
+    # Top N by relevance score descending, O(N log k) instead of a full sort;
+    # ties keep input order like sorted()
+    return heapq.nlargest(max_targets, targets, key=lambda t: t.relevance_score)
 
 
 def _score_to_confidence(score: float) -> Literal["HIGH", "MEDIUM", "LOW"]:
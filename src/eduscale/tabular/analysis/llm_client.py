@@ -4,16 +4,522 @@ This module provides an interface to Featherless.ai for LLM-based tasks like
 entity extraction from text and sentiment analysis using Llama 3.3 70B.
 """
 
+import asyncio
+import gzip
+import hashlib
+import io
 import json
 import logging
-from typing import Any
+import math
+import re
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Iterator, Literal, TypeVar
 
-from openai import OpenAI
+import certifi
+import httpx
+import numpy as np
+import pandas as pd
+import openai
+from openai import AsyncOpenAI, OpenAI
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
 from eduscale.core.config import settings
+from eduscale.tabular.concepts import embed_texts
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+BatchTask = Literal["entities", "sentiment"]
+
+# Server-enforced output grammar for entity extraction (LLM_STRUCTURED_OUTPUT).
+# Strict JSON schema requires an object root, so the list is wrapped.
+ENTITIES_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "entities",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "entities": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "text": {"type": "string"},
+                            "type": {"type": "string", "enum": ["person", "subject", "location"]},
+                        },
+                        "required": ["text", "type"],
+                        "additionalProperties": False,
+                    },
+                }
+            },
+            "required": ["entities"],
+            "additionalProperties": False,
+        },
+    },
+}
+# Schema-bounded output has no prose, so it needs fewer tokens
+ENTITIES_MAX_TOKENS = 200
+STRUCTURED_ENTITIES_MAX_TOKENS = 120
+
+# Combined entities + sentiment request (analyze)
+ANALYZE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "entities": ENTITIES_RESPONSE_FORMAT["json_schema"]["schema"]["properties"][
+                    "entities"
+                ],
+                "sentiment": {"type": "number"},
+            },
+            "required": ["entities", "sentiment"],
+            "additionalProperties": False,
+        },
+    },
+}
+ANALYZE_MAX_TOKENS = 220
+
+# Sentiment field in a combined response that is not valid JSON as a whole
+_SENTIMENT_FIELD_RE = re.compile(r'"sentiment"\s*:\s*(-?\d+(?:\.\d+)?)')
+
+# Prompt templates, split around the input text. The static instructions
+# come first and are byte-identical across calls, so the server can reuse
+# the KV cache for the shared prefix; only the text and suffix vary.
+_ENTITIES_PREFIX = """Extract person names, subjects, and locations from this Czech/English educational text.
+Return ONLY a JSON array with this exact format: [{"text": "name", "type": "person|subject|location"}]
+Do not include any explanation, only the JSON array.
+
+Text: """
+_STRUCTURED_ENTITIES_PREFIX = """Extract person names, subjects, and locations from this Czech/English educational text.
+Return a JSON object with this exact format: {"entities": [{"text": "name", "type": "person|subject|location"}]}
+
+Text: """
+_MARSHALED_ENTITIES_PREFIX = """Extract person names, subjects, and locations from each numbered Czech/English educational text.
+Return ONLY a JSON array with one object per text in this exact format: [{"index": 1, "entities": [{"text": "name", "type": "person|subject|location"}]}]
+Do not include any explanation, only the JSON array.
+
+Texts:
+"""
+_SENTIMENT_PREFIX = """Analyze the sentiment of this educational feedback (Czech/English).
+Return ONLY a single number from -1.0 (very negative) to +1.0 (very positive).
+Do not include any explanation, only the number.
+
+Text: """
+_ANALYZE_PREFIX = """Extract person names, subjects, and locations from this Czech/English educational text and rate its sentiment.
+Return ONLY a JSON object with this exact format: {"entities": [{"text": "name", "type": "person|subject|location"}], "sentiment": 0.0}
+sentiment is a single number from -1.0 (very negative) to +1.0 (very positive).
+Do not include any explanation, only the JSON object.
+
+Text: """
+_JSON_SUFFIX = "\n\nJSON:"
+_SCORE_SUFFIX = "\n\nScore:"
+
+# Longest text sent in one prompt. Longer texts are split into windows for
+# entity extraction and truncated for sentiment, keeping prompts short
+# (prefill cost grows superlinearly with prompt length).
+MAX_INPUT_CHARS = 4000
+
+# Anchor phrases for the local embedding sentiment fast path
+# (LLM_LOCAL_SENTIMENT). A text is scored by how much closer it is to the
+# nearest positive anchor than to the nearest negative one.
+_POSITIVE_SENTIMENT_ANCHORS = (
+    "This is excellent, I am very satisfied.",
+    "The teacher is great and the lessons are wonderful.",
+    "Výborné, jsem velmi spokojený.",
+    "Paní učitelka je skvělá a hodiny jsou úžasné.",
+)
+_NEGATIVE_SENTIMENT_ANCHORS = (
+    "This is terrible, I am very disappointed.",
+    "The teacher is awful and the lessons are useless.",
+    "Hrozné, jsem velmi zklamaný.",
+    "Učitel je příšerný a hodiny jsou k ničemu.",
+)
+# Maps the anchor similarity margin to a score in (-1, 1) via tanh
+_LOCAL_SENTIMENT_SCALE = 10.0
+
+# Transient failures worth retrying (connection errors include timeouts).
+# The SDK's own retries are disabled so these are the only ones.
+_RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    httpx.TransportError,
+)
+# Typed SDK errors raised for 4xx responses on the direct HTTP path, so they
+# are retried (or not) exactly as the SDK's own errors would be
+_STATUS_ERRORS: dict[int, type[openai.APIStatusError]] = {
+    400: openai.BadRequestError,
+    401: openai.AuthenticationError,
+    403: openai.PermissionDeniedError,
+    404: openai.NotFoundError,
+    409: openai.ConflictError,
+    422: openai.UnprocessableEntityError,
+    429: openai.RateLimitError,
+}
+_llm_retry = retry(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential_jitter(initial=1, max=10),
+    retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+    reraise=True,
+)
+
+# Batch job states after which polling stops without output
+_BATCH_FAILED_STATES = ("failed", "expired", "cancelled")
+
+_JSON_DECODER = json.JSONDecoder()
+# Closing positions tried before falling back to per-object salvage
+_MAX_ARRAY_CLOSE_ATTEMPTS = 3
+
+# Connection pool for the shared HTTP client; sized so concurrent fan-out
+# reuses warm keep-alive connections instead of waiting on the pool
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+# Per-event-loop pool for async fan-out; all idle connections are kept alive
+ASYNC_HTTP_MAX_CONNECTIONS = 100
+# Request bodies below this size are sent uncompressed even with LLM_GZIP_REQUESTS
+GZIP_MIN_BYTES = 1024
+
+
+class _ResponseCache:
+    """Thread-safe LRU map of prompt hash -> LLM response text.
+
+    Feedback datasets repeat texts often and temperature is low, so an
+    identical (model, prompt, max_tokens) request can reuse the response.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[bytes, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        model: str, prompt: str, max_tokens: int, response_format: dict | None = None
+    ) -> bytes:
+        """Hash a request into a compact cache key."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{model}\0{max_tokens}\0".encode())
+        if response_format is not None:
+            digest.update(json.dumps(response_format, sort_keys=True).encode())
+        digest.update(prompt.encode())
+        return digest.digest()
+
+    def get(self, key: bytes) -> str | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value: str | None) -> None:
+        if value is None or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_RESPONSE_CACHE = _ResponseCache(settings.LLM_RESPONSE_CACHE_SIZE)
+
+# Async API calls in flight, keyed by (event loop, request cache key)
+_INFLIGHT: dict[tuple[asyncio.AbstractEventLoop, bytes], asyncio.Future] = {}
+
+
+class _TokenBucket:
+    """Client-side rate limiter pacing requests below the provider's limits.
+
+    Callers reserve tokens up front; the balance may go negative, and each
+    caller sleeps until its reservation is covered by refill. Reservations
+    are made under a lock, so sync threads and async tasks share one budget.
+    """
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens from the bucket and return the seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.refill_per_sec
+            )
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_sec
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Block the calling thread until tokens are available."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: float = 1) -> None:
+        """Wait without blocking the event loop until tokens are available."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_RATE_LIMITERS: dict[tuple, tuple[_TokenBucket | None, _TokenBucket | None]] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def _rate_limiters(model: str) -> tuple[_TokenBucket | None, _TokenBucket | None]:
+    """Shared (requests/min, tokens/min) buckets for a model; None when unlimited."""
+    key = (model, settings.FEATHERLESS_RPM, settings.FEATHERLESS_TPM)
+    limiters = _RATE_LIMITERS.get(key)
+    if limiters is None:
+        with _RATE_LIMITERS_LOCK:
+            limiters = _RATE_LIMITERS.get(key)
+            if limiters is None:
+                rpm, tpm = settings.FEATHERLESS_RPM, settings.FEATHERLESS_TPM
+                limiters = (
+                    _TokenBucket(rpm, rpm / 60) if rpm > 0 else None,
+                    _TokenBucket(tpm, tpm / 60) if tpm > 0 else None,
+                )
+                _RATE_LIMITERS[key] = limiters
+    return limiters
+
+
+def _estimate_tokens(body: dict[str, Any]) -> int:
+    """Rough request size for TPM pacing (~4 characters per prompt token)."""
+    prompt_chars = sum(len(message["content"]) for message in body["messages"])
+    return prompt_chars // 4 + body["max_tokens"]
+
+
+@lru_cache(maxsize=1)
+def _shared_ssl_context() -> ssl.SSLContext:
+    """SSL context shared by all LLM HTTP clients (loading CA certs is slow)."""
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+def _gzip_request(request: httpx.Request) -> httpx.Request:
+    """Return a gzip-compressed copy of a request with a large enough body."""
+    if "Content-Encoding" in request.headers or len(request.content) < GZIP_MIN_BYTES:
+        return request
+    headers = request.headers.copy()
+    headers["Content-Encoding"] = "gzip"
+    del headers["Content-Length"]
+    return httpx.Request(
+        request.method,
+        request.url,
+        headers=headers,
+        content=gzip.compress(request.content, compresslevel=1),
+        extensions=request.extensions,
+    )
+
+
+class _GzipTransport(httpx.BaseTransport):
+    """Transport wrapper that gzip-compresses request bodies (LLM_GZIP_REQUESTS)."""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        return self._transport.handle_request(_gzip_request(request))
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _AsyncGzipTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of _GzipTransport."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return await self._transport.handle_async_request(_gzip_request(request))
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+@lru_cache(maxsize=1)
+def _shared_http_client() -> httpx.Client:
+    """Process-wide HTTP client so TLS sessions are reused across LLMClient instances."""
+    pool = {
+        "verify": _shared_ssl_context(),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    }
+    if settings.LLM_GZIP_REQUESTS:
+        # An explicit transport disables httpx's proxy-from-environment
+        # handling, so only wrap one when compression is wanted
+        transport = _GzipTransport(httpx.HTTPTransport(**pool))
+        return httpx.Client(transport=transport, timeout=HTTP_TIMEOUT)
+    return httpx.Client(**pool, timeout=HTTP_TIMEOUT)
+
+
+@lru_cache(maxsize=8)
+def _get_openai_client(base_url: str, api_key: str) -> OpenAI:
+    """Return the OpenAI client for an endpoint, built once per (base_url, api_key)."""
+    return OpenAI(
+        base_url=base_url, api_key=api_key, http_client=_shared_http_client(), max_retries=0
+    )
+
+
+def _split_windows(text: str, size: int = MAX_INPUT_CHARS) -> list[str]:
+    """Split text into windows of at most `size` chars, preferring whitespace breaks."""
+    windows = []
+    start = 0
+    while len(text) - start > size:
+        end = text.rfind(" ", start + size // 2, start + size)
+        if end == -1:
+            end = start + size
+        windows.append(text[start:end].strip())
+        start = end
+    windows.append(text[start:].strip())
+    return [window for window in windows if window]
+
+
+def _expand_windows(texts: list[str]) -> tuple[list[str], list[int]]:
+    """Split over-length texts into windows.
+
+    Returns:
+        (units, owners): texts to send and the input index each belongs to
+    """
+    units: list[str] = []
+    owners: list[int] = []
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            continue
+        text = text.strip()
+        windows = _split_windows(text) if len(text) > MAX_INPUT_CHARS else [text]
+        units.extend(windows)
+        owners.extend([i] * len(windows))
+    return units, owners
+
+
+def _merge_entities(entity_lists: list[list[dict[str, str]]]) -> list[dict[str, str]]:
+    """Concatenate entity lists, dropping repeated (text, type) pairs."""
+    seen = set()
+    merged = []
+    for entities in entity_lists:
+        for entity in entities:
+            key = (entity["text"], entity["type"])
+            if key not in seen:
+                seen.add(key)
+                merged.append(entity)
+    return merged
+
+
+@lru_cache(maxsize=1)
+def _sentiment_anchor_embeddings() -> tuple[np.ndarray, np.ndarray]:
+    """Normalized embeddings of the positive and negative sentiment anchors."""
+    embeddings = embed_texts(
+        list(_POSITIVE_SENTIMENT_ANCHORS) + list(_NEGATIVE_SENTIMENT_ANCHORS)
+    ).astype(np.float32)
+    split = len(_POSITIVE_SENTIMENT_ANCHORS)
+    return embeddings[:split], embeddings[split:]
+
+
+def _local_sentiment(text: str) -> tuple[float, float]:
+    """Score sentiment with the local embedding model instead of the LLM.
+
+    Returns:
+        (score, confidence): score in (-1, 1) and its magnitude as confidence
+    """
+    positive, negative = _sentiment_anchor_embeddings()
+    embedding = embed_texts([text])[0].astype(np.float32)
+    margin = float((positive @ embedding).max() - (negative @ embedding).max())
+    score = math.tanh(_LOCAL_SENTIMENT_SCALE * margin)
+    return score, abs(score)
+
+
+def _drain_complete_objects(
+    buffer: str, cursor: int, final: bool = False
+) -> tuple[list[dict[str, Any]], int]:
+    """Decode the entity objects completed in a growing response buffer.
+
+    Args:
+        buffer: Response text received so far
+        cursor: Offset where the previous drain stopped
+        final: True once the stream has ended; undecodable objects are then
+            skipped instead of waited on
+
+    Returns:
+        (entities, cursor): newly completed {"text", "type"} objects and the
+        offset to resume from when more text arrives
+    """
+    entities = []
+    start = buffer.find("{", cursor)
+    while start != -1:
+        try:
+            obj, end = _JSON_DECODER.raw_decode(buffer, start)
+        except json.JSONDecodeError:
+            if not final:
+                # Object not closed yet; retry from here with more text
+                return entities, start
+            start = buffer.find("{", start + 1)
+            continue
+
+        if isinstance(obj, dict) and "text" in obj and "type" in obj:
+            entities.append(obj)
+        cursor = end
+        start = buffer.find("{", end)
+    return entities, len(buffer) if final else cursor
+
+
+def _run_sync(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion from synchronous code.
+
+    Uses asyncio.run directly when no event loop is running in this thread.
+    Inside a running loop (e.g. a sync helper called from an async route),
+    the coroutine runs on a fresh loop in a worker thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result: dict[str, Any] = {}
+
+    def runner() -> None:
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:  # re-raised in the calling thread
+            result["error"] = e
+
+    thread = threading.Thread(target=runner, name="llm-client-sync")
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
 
 class LLMClient:
     """Client for interacting with Featherless.ai LLM API (Llama via OpenAI-compatible endpoint)."""
@@ -27,6 +533,12 @@ class LLMClient:
         self.model_name = model or settings.FEATHERLESS_LLM_MODEL
         self.enabled = settings.LLM_ENABLED
         self._client = None
+        # Async connection pools are bound to the event loop that first used
+        # them, so keep one async HTTP client (and SDK client on top of it)
+        # per running loop
+        self._ahttp: httpx.AsyncClient | None = None
+        self._aclient = None
+        self._aclient_loop = None
 
         if not self.enabled:
             logger.warning("LLM is disabled in settings")
@@ -37,15 +549,97 @@ class LLMClient:
         """Initialize Featherless.ai client."""
         try:
             logger.info(f"Initializing Featherless.ai LLM client: {self.model_name}")
-            self._client = OpenAI(
-                base_url=settings.FEATHERLESS_BASE_URL,
-                api_key=settings.FEATHERLESS_API_KEY,
+            self._client = _get_openai_client(
+                settings.FEATHERLESS_BASE_URL, settings.FEATHERLESS_API_KEY
             )
             logger.info(f"Featherless.ai LLM client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Featherless.ai LLM: {e}")
             raise
 
+    def _get_aclient(self) -> AsyncOpenAI:
+        """Return the async client for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            pool = {
+                "verify": _shared_ssl_context(),
+                "limits": httpx.Limits(
+                    max_connections=ASYNC_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=ASYNC_HTTP_MAX_CONNECTIONS,
+                ),
+            }
+            if settings.LLM_GZIP_REQUESTS:
+                transport = _AsyncGzipTransport(httpx.AsyncHTTPTransport(**pool))
+                self._ahttp = httpx.AsyncClient(transport=transport, timeout=HTTP_TIMEOUT)
+            else:
+                self._ahttp = httpx.AsyncClient(**pool, timeout=HTTP_TIMEOUT)
+            self._aclient = AsyncOpenAI(
+                base_url=settings.FEATHERLESS_BASE_URL,
+                api_key=settings.FEATHERLESS_API_KEY,
+                http_client=self._ahttp,
+                max_retries=0,
+            )
+            self._aclient_loop = loop
+        return self._aclient
+
+    async def _aclose(self) -> None:
+        """Close the async HTTP client bound to the running loop, if any."""
+        if self._ahttp is not None and self._aclient_loop is asyncio.get_running_loop():
+            await self._ahttp.aclose()
+            self._ahttp = None
+            self._aclient = None
+            self._aclient_loop = None
+
+    def _run_sync(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine on a fresh event loop, closing that loop's async client after.
+
+        Each sync call gets its own loop, so the connection pool opened on it
+        cannot be reused afterwards and must not outlive the call.
+        """
+
+        async def closing() -> T:
+            try:
+                return await coro
+            finally:
+                await self._aclose()
+
+        return _run_sync(closing())
+
+    async def _apost_chat_completion(self, body: dict[str, Any]) -> str | None:
+        """POST a chat completion directly, skipping SDK request/response models.
+
+        Returns:
+            Generated text, or None on a 5xx status so the caller can retry
+            through the SDK (which maps errors to typed exceptions)
+
+        Raises:
+            openai.APIStatusError: On a 4xx status; a 429 is a RateLimitError,
+                which the retry policy backs off on instead of re-sending at once
+        """
+        self._get_aclient()
+        response = await self._ahttp.post(
+            f"{settings.FEATHERLESS_BASE_URL.rstrip('/')}/chat/completions",
+            json=body,
+            headers={"Authorization": f"Bearer {settings.FEATHERLESS_API_KEY}"},
+        )
+        if response.is_client_error:
+            error_cls = _STATUS_ERRORS.get(response.status_code, openai.APIStatusError)
+            try:
+                error_body = response.json()
+            except ValueError:
+                error_body = response.text
+            raise error_cls(
+                f"Direct LLM request failed with HTTP {response.status_code}",
+                response=response,
+                body=error_body,
+            )
+        if not response.is_success:
+            logger.warning(
+                f"Direct LLM request failed with HTTP {response.status_code}, retrying via SDK"
+            )
+            return None
+        return response.json()["choices"][0]["message"]["content"]
+
     def _parse_json_response(self, response: str) -> list[dict[str, Any]]:
         """Parse JSON response, handling incomplete/truncated responses.
         
@@ -64,78 +658,49 @@ class LLMClient:
         except json.JSONDecodeError:
             pass
         
-        # If that fails, try to extract valid objects from partial JSON
         response = response.strip()
-        
-        # Remove leading bracket if present
-        if response.startswith('['):
-            response = response[1:].strip()
-        
-        # Split by complete objects (objects that end with })
-        # We'll look for patterns like: {"text": "...", "type": "..."}
         entities = []
-        
-        # Try to find complete objects by looking for closing braces
-        # that are not inside strings
-        i = 0
-        while i < len(response):
-            # Skip whitespace and commas
-            while i < len(response) and response[i] in ' \n\r\t,':
-                i += 1
-            if i >= len(response):
-                break
-            
-            # Look for opening brace
-            if response[i] != '{':
-                i += 1
-                continue
-            
-            # Find the matching closing brace
-            start = i
-            brace_count = 0
-            in_string = False
-            escape_next = False
-            obj_end = -1
-            
-            for j in range(start, len(response)):
-                char = response[j]
-                
-                if escape_next:
-                    escape_next = False
-                    continue
-                
-                if char == '\\':
-                    escape_next = True
-                    continue
-                
-                if char == '"' and not escape_next:
-                    in_string = not in_string
-                    continue
-                
-                if not in_string:
-                    if char == '{':
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            obj_end = j + 1
-                            break
-            
-            # If we found a complete object, try to parse it
-            if obj_end > start:
-                obj_str = response[start:obj_end]
+
+        # A truncated array is usually a valid prefix: close it after the
+        # last complete object and decode everything in a single call
+        if response.startswith("["):
+            end = response.rfind("}")
+            for _ in range(_MAX_ARRAY_CLOSE_ATTEMPTS):
+                if end == -1:
+                    break
                 try:
-                    obj = json.loads(obj_str)
-                    if isinstance(obj, dict) and "text" in obj and "type" in obj:
-                        entities.append(obj)
+                    parsed = json.loads(response[: end + 1] + "]")
                 except json.JSONDecodeError:
-                    # Object structure looks complete but JSON is invalid, skip it
-                    pass
-                i = obj_end
-            else:
-                # Incomplete object, stop here
+                    # Brace inside a string or nested object; try the previous one
+                    end = response.rfind("}", 0, end)
+                    continue
+                entities = [
+                    obj
+                    for obj in parsed
+                    if isinstance(obj, dict) and "text" in obj and "type" in obj
+                ]
                 break
-        
+            if entities:
+                logger.info(f"Extracted {len(entities)} entities from partial JSON response")
+                return entities
+
+        # Otherwise salvage complete objects one by one. Each candidate is
+        # decoded by the C scanner via raw_decode, which also reports where
+        # the object ends, so no Python-level character loop is needed to
+        # track strings and braces.
+        start = response.find("{")
+        while start != -1:
+            try:
+                obj, end = _JSON_DECODER.raw_decode(response, start)
+            except json.JSONDecodeError:
+                # Invalid or truncated object; resume at the next opening brace
+                start = response.find("{", start + 1)
+                continue
+
+            if isinstance(obj, dict) and "text" in obj and "type" in obj:
+                entities.append(obj)
+            start = response.find("{", end)
+
         # If we have any valid entities, return them
         if entities:
             logger.info(f"Extracted {len(entities)} entities from partial JSON response")
@@ -162,33 +727,14 @@ class LLMClient:
         if not text or not text.strip():
             return []
 
-        prompt = f"""Extract person names, subjects, and locations from this Czech/English educational text.
-Return ONLY a JSON array with this exact format: [{{"text": "name", "type": "person|subject|location"}}]
-Do not include any explanation, only the JSON array.
-
-Text: {text}
-
-JSON:"""
+        text = text.strip()
+        if len(text) > MAX_INPUT_CHARS:
+            # Windows are extracted in parallel and merged
+            return self._run_sync(self.batch_extract_entities([text]))[0]
 
         try:
-            response = self._call_llm(prompt, max_tokens=200)
-            # Try to parse JSON response (handles incomplete responses)
-            entities = self._parse_json_response(response.strip())
-
-            if not isinstance(entities, list):
-                logger.warning(f"LLM returned non-list response: {response[:200]}...")
-                return []
-
-            # Validate entity format
-            valid_entities = []
-            for entity in entities:
-                if isinstance(entity, dict) and "text" in entity and "type" in entity:
-                    valid_entities.append(entity)
-                else:
-                    logger.warning(f"Invalid entity format: {entity}")
-
-            logger.info(f"Extracted {len(valid_entities)} entities from text")
-            return valid_entities
+            response = self._call_llm(*self._entities_request(text))
+            return self._entities_from_response(response)
 
         except Exception as e:
             # _parse_json_response should handle JSON errors internally,
@@ -196,6 +742,298 @@ JSON:"""
             logger.warning(f"Entity extraction failed: {e}")
             return []
 
+    async def aextract_entities(self, text: str) -> list[dict[str, str]]:
+        """Async variant of extract_entities."""
+        if not self.enabled or self._client is None:
+            logger.debug("LLM disabled, skipping entity extraction")
+            return []
+
+        if not text or not text.strip():
+            return []
+
+        text = text.strip()
+        if len(text) > MAX_INPUT_CHARS:
+            return (await self.batch_extract_entities([text]))[0]
+
+        try:
+            response = await self._acall_llm(*self._entities_request(text))
+            return self._entities_from_response(response)
+
+        except Exception as e:
+            logger.warning(f"Entity extraction failed: {e}")
+            return []
+
+    def stream_entities(self, text: str) -> Iterator[dict[str, str]]:
+        """Stream entities as soon as each JSON object in the response is complete.
+
+        Parsing overlaps with generation instead of waiting for the last
+        token. Uses the unstructured prompt, since a wrapping object would
+        only close at the end of the response.
+
+        Args:
+            text: Input text (Czech or English), at most MAX_INPUT_CHARS are sent
+
+        Yields:
+            Entities in the format of extract_entities
+        """
+        if not self.enabled or self._client is None:
+            logger.debug("LLM disabled, skipping entity extraction")
+            return
+
+        if not text or not text.strip():
+            return
+
+        prompt = self._entities_prompt(text.strip()[:MAX_INPUT_CHARS])
+        cache_key = _ResponseCache.key(self.model_name, prompt, ENTITIES_MAX_TOKENS)
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            yield from _drain_complete_objects(cached, 0, final=True)[0]
+            return
+
+        body = self._chat_body(prompt, ENTITIES_MAX_TOKENS)
+        request_bucket, token_bucket = _rate_limiters(self.model_name)
+        if request_bucket is not None:
+            request_bucket.acquire()
+        if token_bucket is not None:
+            token_bucket.acquire(_estimate_tokens(body))
+
+        buffer = ""
+        cursor = 0
+        try:
+            for chunk in self._client.chat.completions.create(**body, stream=True):
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                buffer += chunk.choices[0].delta.content
+                entities, cursor = _drain_complete_objects(buffer, cursor)
+                yield from entities
+        except Exception as e:
+            logger.warning(f"Streaming entity extraction failed: {e}")
+            return
+
+        yield from _drain_complete_objects(buffer, cursor, final=True)[0]
+        _RESPONSE_CACHE.put(cache_key, buffer)
+
+    async def astream_entities(self, text: str) -> AsyncIterator[dict[str, str]]:
+        """Async variant of stream_entities."""
+        if not self.enabled or self._client is None:
+            logger.debug("LLM disabled, skipping entity extraction")
+            return
+
+        if not text or not text.strip():
+            return
+
+        prompt = self._entities_prompt(text.strip()[:MAX_INPUT_CHARS])
+        cache_key = _ResponseCache.key(self.model_name, prompt, ENTITIES_MAX_TOKENS)
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            for entity in _drain_complete_objects(cached, 0, final=True)[0]:
+                yield entity
+            return
+
+        body = self._chat_body(prompt, ENTITIES_MAX_TOKENS)
+        request_bucket, token_bucket = _rate_limiters(self.model_name)
+        if request_bucket is not None:
+            await request_bucket.aacquire()
+        if token_bucket is not None:
+            await token_bucket.aacquire(_estimate_tokens(body))
+
+        buffer = ""
+        cursor = 0
+        try:
+            stream = await self._get_aclient().chat.completions.create(**body, stream=True)
+            async for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                buffer += chunk.choices[0].delta.content
+                entities, cursor = _drain_complete_objects(buffer, cursor)
+                for entity in entities:
+                    yield entity
+        except Exception as e:
+            logger.warning(f"Streaming entity extraction failed: {e}")
+            return
+
+        for entity in _drain_complete_objects(buffer, cursor, final=True)[0]:
+            yield entity
+        _RESPONSE_CACHE.put(cache_key, buffer)
+
+    async def batch_extract_entities(
+        self,
+        texts: list[str],
+        concurrency: int | None = None,
+        rows_per_call: int | None = None,
+    ) -> list[list[dict[str, str]]]:
+        """Extract entities from many texts with up to `concurrency` requests in flight.
+
+        With rows_per_call > 1, texts are packed into numbered prompts of that
+        many rows (and at most MAX_INPUT_CHARS) so each request amortizes
+        network and prefill cost. Texts longer than MAX_INPUT_CHARS are split
+        into windows whose entities are merged.
+
+        Args:
+            texts: Input texts
+            concurrency: Maximum parallel requests (default: settings.LLM_MAX_CONCURRENCY)
+            rows_per_call: Texts per request (default: settings.LLM_ROWS_PER_CALL)
+
+        Returns:
+            One entity list per input text, in input order. Texts whose
+            extraction failed map to an empty list.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or settings.LLM_MAX_CONCURRENCY))
+        rows_per_call = max(1, rows_per_call or settings.LLM_ROWS_PER_CALL)
+
+        units, owners = _expand_windows(texts)
+        if len(units) > len(set(owners)):
+            entities_per_unit = await self.batch_extract_entities(
+                units, concurrency, rows_per_call
+            )
+            windows_by_text: list[list[list[dict[str, str]]]] = [[] for _ in texts]
+            for owner, entities in zip(owners, entities_per_unit):
+                windows_by_text[owner].append(entities)
+            return [_merge_entities(windows) for windows in windows_by_text]
+
+        entities_per_text: list[list[dict[str, str]]] = [[] for _ in texts]
+        chunks: list[list[int]] = []
+        chunk_chars = 0
+        for i in owners:
+            if chunks and len(chunks[-1]) < rows_per_call and (
+                chunk_chars + len(texts[i]) <= MAX_INPUT_CHARS
+            ):
+                chunks[-1].append(i)
+                chunk_chars += len(texts[i])
+            else:
+                chunks.append([i])
+                chunk_chars = len(texts[i])
+
+        async def extract(chunk: list[int]) -> list[list[dict[str, str]] | None]:
+            if len(chunk) == 1:
+                async with semaphore:
+                    return [await self.aextract_entities(texts[chunk[0]])]
+
+            chunk_texts = [texts[i] for i in chunk]
+            async with semaphore:
+                response = await self._acall_llm(
+                    self._marshaled_entities_prompt(chunk_texts),
+                    max_tokens=200 * len(chunk_texts),
+                )
+            return self._marshaled_entities_from_response(response, len(chunk_texts))
+
+        results = await asyncio.gather(*(extract(chunk) for chunk in chunks), return_exceptions=True)
+
+        fallback = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Entity extraction failed: {result}")
+                result = [None] * len(chunk) if len(chunk) > 1 else [[]]
+            for i, entities in zip(chunk, result):
+                if entities is None:
+                    fallback.append(i)
+                else:
+                    entities_per_text[i] = entities
+
+        if fallback:
+            # Rows missing from a packed response are retried one per request
+            logger.info(f"Retrying entity extraction for {len(fallback)} texts individually")
+            retried = await self.batch_extract_entities(
+                [texts[i] for i in fallback], concurrency, rows_per_call=1
+            )
+            for i, entities in zip(fallback, retried):
+                entities_per_text[i] = entities
+
+        return entities_per_text
+
+    def extract_entities_many(
+        self,
+        texts: list[str],
+        concurrency: int | None = None,
+        rows_per_call: int | None = None,
+    ) -> list[list[dict[str, str]]]:
+        """Synchronous wrapper around batch_extract_entities for DataFrame callers."""
+        if not texts:
+            return []
+        if not self.enabled or self._client is None:
+            logger.debug("LLM disabled, skipping entity extraction")
+            return [[] for _ in texts]
+        return self._run_sync(self.batch_extract_entities(texts, concurrency, rows_per_call))
+
+    @staticmethod
+    def _marshaled_entities_prompt(texts: list[str]) -> str:
+        """Build one entity extraction prompt covering several numbered texts."""
+        # Collapse whitespace so every text stays on its own numbered line
+        numbered = "\n".join(f"{i}. {' '.join(text.split())}" for i, text in enumerate(texts, 1))
+        return _MARSHALED_ENTITIES_PREFIX + numbered + _JSON_SUFFIX
+
+    def _marshaled_entities_from_response(
+        self, response: str, n_texts: int
+    ) -> list[list[dict[str, str]] | None]:
+        """Re-align a packed response with its input texts.
+
+        Returns:
+            One entity list per text; None for texts the response did not
+            cover (or every text, if the response is not valid JSON)
+        """
+        try:
+            items = json.loads(response.strip())
+        except (AttributeError, json.JSONDecodeError):
+            logger.warning(f"Could not parse packed entity response: {str(response)[:200]}...")
+            return [None] * n_texts
+
+        if not isinstance(items, list):
+            return [None] * n_texts
+
+        entities_per_text: list[list[dict[str, str]] | None] = [None] * n_texts
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index = item.get("index")
+            entities = item.get("entities")
+            if isinstance(index, int) and 1 <= index <= n_texts and isinstance(entities, list):
+                entities_per_text[index - 1] = self._valid_entities(entities)
+        return entities_per_text
+
+    def _entities_request(self, text: str) -> tuple[str, int, dict | None]:
+        """Prompt, max_tokens and response_format for extracting entities from a text."""
+        if settings.LLM_STRUCTURED_OUTPUT:
+            return (
+                self._entities_prompt(text, structured=True),
+                STRUCTURED_ENTITIES_MAX_TOKENS,
+                ENTITIES_RESPONSE_FORMAT,
+            )
+        return self._entities_prompt(text), ENTITIES_MAX_TOKENS, None
+
+    @staticmethod
+    def _entities_prompt(text: str, structured: bool = False) -> str:
+        """Build the entity extraction prompt for a text."""
+        if structured:
+            return _STRUCTURED_ENTITIES_PREFIX + text + _JSON_SUFFIX
+        return _ENTITIES_PREFIX + text + _JSON_SUFFIX
+
+    def _entities_from_response(self, response: str) -> list[dict[str, str]]:
+        """Parse and validate the entity list in an LLM response."""
+        # Try to parse JSON response (handles incomplete responses)
+        entities = self._parse_json_response(response.strip())
+        if isinstance(entities, dict) and "entities" in entities:
+            # Structured output wraps the list in an object
+            entities = entities["entities"]
+
+        if not isinstance(entities, list):
+            logger.warning(f"LLM returned non-list response: {response[:200]}...")
+            return []
+
+        valid_entities = self._valid_entities(entities)
+        logger.info(f"Extracted {len(valid_entities)} entities from text")
+        return valid_entities
+
+    @staticmethod
+    def _valid_entities(entities: list) -> list[dict[str, str]]:
+        """Keep only well-formed {"text", "type"} entity dicts."""
+        valid_entities = []
+        for entity in entities:
+            if isinstance(entity, dict) and "text" in entity and "type" in entity:
+                valid_entities.append(entity)
+            else:
+                logger.warning(f"Invalid entity format: {entity}")
+        return valid_entities
+
     def analyze_sentiment(self, text: str) -> float:
         """Analyze sentiment using LLM.
 
@@ -213,37 +1051,382 @@ JSON:"""
         if not text or not text.strip():
             return 0.0
 
-        prompt = f"""Analyze the sentiment of this educational feedback (Czech/English).
-Return ONLY a single number from -1.0 (very negative) to +1.0 (very positive).
-Do not include any explanation, only the number.
+        text = text.strip()[:MAX_INPUT_CHARS]
+        if settings.LLM_LOCAL_SENTIMENT:
+            local_score = self._confident_local_sentiment(text)
+            if local_score is not None:
+                return local_score
+
+        try:
+            response = self._call_llm(*self._sentiment_request(text))
+        except Exception as e:
+            logger.error(f"Sentiment analysis failed: {e}")
+            return 0.0
+        return self._sentiment_from_response(response)
+
+    async def aanalyze_sentiment(self, text: str) -> float:
+        """Async variant of analyze_sentiment."""
+        if not self.enabled or self._client is None:
+            logger.debug("LLM disabled, skipping sentiment analysis")
+            return 0.0
 
-Text: {text}
+        if not text or not text.strip():
+            return 0.0
 
-Score:"""
+        text = text.strip()[:MAX_INPUT_CHARS]
+        if settings.LLM_LOCAL_SENTIMENT:
+            local_score = await asyncio.to_thread(self._confident_local_sentiment, text)
+            if local_score is not None:
+                return local_score
 
         try:
-            response = self._call_llm(prompt, max_tokens=10)
-            score = float(response.strip())
+            response = await self._acall_llm(*self._sentiment_request(text))
+        except Exception as e:
+            logger.error(f"Sentiment analysis failed: {e}")
+            return 0.0
+        return self._sentiment_from_response(response)
+
+    @staticmethod
+    def _confident_local_sentiment(text: str) -> float | None:
+        """Local embedding sentiment if confident enough to skip the LLM, else None."""
+        try:
+            score, confidence = _local_sentiment(text)
+        except Exception as e:
+            logger.warning(f"Local sentiment scoring failed: {e}")
+            return None
 
-            # Clamp to valid range
-            score = max(-1.0, min(1.0, score))
+        if confidence < settings.LLM_LOCAL_SENTIMENT_CONFIDENCE:
+            return None
+        logger.info(f"Sentiment score (local): {score:.3f}")
+        return score
 
-            logger.info(f"Sentiment score: {score:.3f}")
-            return score
+    @staticmethod
+    def _sentiment_prompt(text: str) -> str:
+        """Build the sentiment analysis prompt for a text."""
+        return _SENTIMENT_PREFIX + text + _SCORE_SUFFIX
 
-        except ValueError as e:
+    @staticmethod
+    def _sentiment_from_response(response: str) -> float:
+        """Parse and clamp the sentiment score in an LLM response."""
+        try:
+            score = float(response.strip())
+        except (AttributeError, ValueError) as e:
             logger.warning(f"Failed to parse sentiment score: {e}, response: {response}")
             return 0.0
+
+        # Clamp to valid range
+        score = max(-1.0, min(1.0, score))
+
+        logger.info(f"Sentiment score: {score:.3f}")
+        return score
+
+    def analyze(self, text: str) -> dict[str, Any]:
+        """Extract entities and score sentiment in a single LLM call.
+
+        Halves round-trips compared with extract_entities followed by
+        analyze_sentiment on the same text.
+
+        Args:
+            text: Input text (Czech or English)
+
+        Returns:
+            {"entities": [...], "sentiment": float} in the formats of
+            extract_entities and analyze_sentiment. Returns empty entities
+            and 0.0 if LLM is disabled or analysis fails
+        """
+        if not self.enabled or self._client is None:
+            logger.debug("LLM disabled, skipping text analysis")
+            return {"entities": [], "sentiment": 0.0}
+
+        if not text or not text.strip():
+            return {"entities": [], "sentiment": 0.0}
+
+        text = text.strip()
+        if len(text) > MAX_INPUT_CHARS:
+            return self._run_sync(self.batch_analyze([text]))[0]
+
+        try:
+            response = self._call_llm(*self._analyze_request(text))
         except Exception as e:
-            logger.error(f"Sentiment analysis failed: {e}")
-            return 0.0
+            logger.warning(f"Text analysis failed: {e}")
+            return {"entities": [], "sentiment": 0.0}
+        return self._analysis_from_response(response)
+
+    async def aanalyze(self, text: str) -> dict[str, Any]:
+        """Async variant of analyze."""
+        if not self.enabled or self._client is None:
+            logger.debug("LLM disabled, skipping text analysis")
+            return {"entities": [], "sentiment": 0.0}
 
-    def _call_llm(self, prompt: str, max_tokens: int = 500) -> str:
+        if not text or not text.strip():
+            return {"entities": [], "sentiment": 0.0}
+
+        text = text.strip()
+        if len(text) > MAX_INPUT_CHARS:
+            return (await self.batch_analyze([text]))[0]
+
+        try:
+            response = await self._acall_llm(*self._analyze_request(text))
+        except Exception as e:
+            logger.warning(f"Text analysis failed: {e}")
+            return {"entities": [], "sentiment": 0.0}
+        return self._analysis_from_response(response)
+
+    async def batch_analyze(
+        self, texts: list[str], concurrency: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Run analyze over many texts with up to `concurrency` requests in flight.
+
+        Texts longer than MAX_INPUT_CHARS are analyzed in windows: entities
+        are merged and sentiment is averaged weighted by window length.
+
+        Returns:
+            One analyze result per input text, in input order
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or settings.LLM_MAX_CONCURRENCY))
+        units, owners = _expand_windows(texts)
+
+        async def run(text: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self.aanalyze(text)
+
+        results = await asyncio.gather(*(run(unit) for unit in units), return_exceptions=True)
+
+        windows_by_text: list[list[tuple[int, dict[str, Any]]]] = [[] for _ in texts]
+        for unit, owner, result in zip(units, owners, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Text analysis failed: {result}")
+                result = {"entities": [], "sentiment": 0.0}
+            windows_by_text[owner].append((len(unit), result))
+
+        analyses = []
+        for windows in windows_by_text:
+            if len(windows) <= 1:
+                analyses.append(windows[0][1] if windows else {"entities": [], "sentiment": 0.0})
+                continue
+            total_chars = sum(size for size, _ in windows)
+            analyses.append(
+                {
+                    "entities": _merge_entities([result["entities"] for _, result in windows]),
+                    "sentiment": sum(size * result["sentiment"] for size, result in windows)
+                    / total_chars,
+                }
+            )
+        return analyses
+
+    def enrich_dataframe(
+        self,
+        df: pd.DataFrame,
+        text_col: str,
+        out_cols: tuple[str, str] = ("entities", "sentiment"),
+        concurrency: int | None = None,
+    ) -> pd.DataFrame:
+        """Add entity and sentiment columns for a text column.
+
+        Each distinct text is analyzed once (concurrently, one combined call
+        per text) and the results are mapped back onto every row.
+
+        Args:
+            df: Input DataFrame
+            text_col: Column holding the texts
+            out_cols: Names of the (entities, sentiment) output columns
+            concurrency: Maximum parallel requests (default: settings.LLM_MAX_CONCURRENCY)
+
+        Returns:
+            Copy of df with the output columns added. Rows with missing or
+            non-string text get [] and 0.0.
+        """
+        entities_col, sentiment_col = out_cols
+        unique_texts = [t for t in df[text_col].dropna().unique() if isinstance(t, str)]
+        logger.info(f"Enriching {len(df)} rows ({len(unique_texts)} distinct texts)")
+
+        analyses: list[dict[str, Any]] = []
+        if unique_texts and self.enabled and self._client is not None:
+            analyses = self._run_sync(self.batch_analyze(unique_texts, concurrency))
+        by_text = dict(zip(unique_texts, analyses))
+
+        empty = {"entities": [], "sentiment": 0.0}
+        rows = [by_text.get(t, empty) if isinstance(t, str) else empty for t in df[text_col]]
+        return df.assign(
+            **{
+                entities_col: [row["entities"] for row in rows],
+                sentiment_col: [row["sentiment"] for row in rows],
+            }
+        )
+
+    def _analyze_request(self, text: str) -> tuple[str, int, dict | None]:
+        """Prompt, max_tokens and response_format for the combined analysis of a text."""
+        response_format = ANALYZE_RESPONSE_FORMAT if settings.LLM_STRUCTURED_OUTPUT else None
+        return _ANALYZE_PREFIX + text + _JSON_SUFFIX, ANALYZE_MAX_TOKENS, response_format
+
+    def _analysis_from_response(self, response: str) -> dict[str, Any]:
+        """Parse a combined {"entities", "sentiment"} response."""
+        response = (response or "").strip()
+        try:
+            result = json.loads(response)
+        except json.JSONDecodeError:
+            result = None
+
+        if isinstance(result, dict):
+            entities = result.get("entities")
+            sentiment = result.get("sentiment")
+        else:
+            # Salvage what we can from truncated or malformed output
+            entities = self._parse_json_response(response)
+            match = _SENTIMENT_FIELD_RE.search(response)
+            sentiment = match.group(1) if match else None
+
+        if isinstance(entities, list):
+            entities = self._valid_entities(entities)
+        else:
+            logger.warning(f"LLM analysis returned no entity list: {response[:200]}...")
+            entities = []
+
+        try:
+            score = max(-1.0, min(1.0, float(sentiment)))
+        except (TypeError, ValueError):
+            logger.warning(f"Failed to parse sentiment score from analysis: {response[:200]}...")
+            score = 0.0
+
+        logger.info(f"Analyzed text: {len(entities)} entities, sentiment {score:.3f}")
+        return {"entities": entities, "sentiment": score}
+
+    def submit_batch(self, texts: list[str], task: BatchTask = "entities") -> str:
+        """Submit texts as an offline Batch API job.
+
+        Batch jobs trade latency (up to 24h) for lower cost and a rate-limit
+        pool separate from interactive calls, which suits bulk enrichment.
+
+        Args:
+            texts: Input texts; empty texts are not submitted
+            task: "entities" (extract_entities) or "sentiment" (analyze_sentiment)
+
+        Returns:
+            Batch ID to pass to poll_batch
+
+        Raises:
+            RuntimeError: If the LLM is disabled
+            ValueError: If task is unknown
+        """
+        if not self.enabled or self._client is None:
+            raise RuntimeError("LLM is disabled, cannot submit batch")
+
+        if task not in ("entities", "sentiment"):
+            raise ValueError(f"Unknown batch task: {task}")
+        build_request = self._entities_request if task == "entities" else self._sentiment_request
+
+        lines = []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            body = self._chat_body(*build_request(text))
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": f"row-{i}",
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": body,
+                    },
+                    ensure_ascii=False,
+                )
+            )
+
+        batch_file = self._client.files.create(
+            file=("batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+            purpose="batch",
+        )
+        batch = self._client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={"task": task, "rows": str(len(texts))},
+        )
+        logger.info(f"Submitted LLM batch {batch.id} with {len(lines)} {task} requests")
+        return batch.id
+
+    def poll_batch(
+        self,
+        batch_id: str,
+        task: BatchTask = "entities",
+        poll_interval: float = 30.0,
+        timeout: float | None = None,
+    ) -> list:
+        """Wait for a batch job and return its results in input order.
+
+        Args:
+            batch_id: ID returned by submit_batch
+            task: Task the batch was submitted with
+            poll_interval: Seconds between status checks
+            timeout: Maximum seconds to wait (default: no limit)
+
+        Returns:
+            One result per text submitted (entity list or sentiment score).
+            Rows without a successful response get [] or 0.0.
+
+        Raises:
+            RuntimeError: If the batch fails, expires or is cancelled
+            TimeoutError: If the batch does not finish within timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            batch = self._client.batches.retrieve(batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in _BATCH_FAILED_STATES:
+                raise RuntimeError(f"LLM batch {batch_id} ended with status {batch.status}")
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"LLM batch {batch_id} still {batch.status} after {timeout}s")
+            time.sleep(poll_interval)
+
+        n_rows = int((batch.metadata or {}).get("rows", batch.request_counts.total))
+        parse = self._entities_from_response if task == "entities" else self._sentiment_from_response
+        results: list = [[] if task == "entities" else 0.0 for _ in range(n_rows)]
+        if not batch.output_file_id:
+            logger.warning(f"LLM batch {batch_id} completed without output")
+            return results
+
+        output = self._client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            row = int(record["custom_id"].removeprefix("row-"))
+            response = record.get("response") or {}
+            if row >= n_rows or response.get("status_code") != 200:
+                logger.warning(f"LLM batch {batch_id}: no result for {record['custom_id']}")
+                continue
+            results[row] = parse(response["body"]["choices"][0]["message"]["content"])
+
+        return results
+
+    def _sentiment_request(self, text: str) -> tuple[str, int, None]:
+        """Prompt, max_tokens and response_format for scoring a text's sentiment."""
+        return self._sentiment_prompt(text), 10, None
+
+    def _chat_body(
+        self, prompt: str, max_tokens: int, response_format: dict | None = None
+    ) -> dict[str, Any]:
+        """Chat completion request body shared by the SDK, direct HTTP and Batch API paths."""
+        body: dict[str, Any] = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": 0.1,  # Low temperature for deterministic outputs
+        }
+        if response_format is not None:
+            body["response_format"] = response_format
+        return body
+
+    def _call_llm(
+        self, prompt: str, max_tokens: int = 500, response_format: dict | None = None
+    ) -> str:
         """Internal method to call Featherless.ai LLM API.
 
         Args:
             prompt: Prompt text
             max_tokens: Maximum tokens to generate
+            response_format: Optional OpenAI response_format (e.g. a JSON schema)
 
         Returns:
             Generated text response
@@ -251,18 +1434,88 @@ Score:"""
         Raises:
             Exception: If API call fails
         """
+        cache_key = _ResponseCache.key(self.model_name, prompt, max_tokens, response_format)
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            response = self._client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.1,  # Low temperature for deterministic outputs
-            )
+            content = self._complete(self._chat_body(prompt, max_tokens, response_format))
+            _RESPONSE_CACHE.put(cache_key, content)
+            return content
+
+        except Exception as e:
+            logger.error(f"Featherless.ai LLM call failed: {e}")
+            raise
+
+    async def _acall_llm(
+        self, prompt: str, max_tokens: int = 500, response_format: dict | None = None
+    ) -> str:
+        """Async counterpart of _call_llm.
+
+        Concurrent calls with an identical request share one in-flight API
+        call instead of racing each other before the cache is populated.
 
-            return response.choices[0].message.content
+        Raises:
+            Exception: If API call fails
+        """
+        cache_key = _ResponseCache.key(self.model_name, prompt, max_tokens, response_format)
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        inflight_key = (loop, cache_key)
+        pending = _INFLIGHT.get(inflight_key)
+        if pending is not None:
+            # Shield so a cancelled waiter does not cancel the shared call
+            return await asyncio.shield(pending)
+
+        future = loop.create_future()
+        _INFLIGHT[inflight_key] = future
+        try:
+            content = await self._acomplete(self._chat_body(prompt, max_tokens, response_format))
+            _RESPONSE_CACHE.put(cache_key, content)
+            future.set_result(content)
+            return content
 
         except Exception as e:
             logger.error(f"Featherless.ai LLM call failed: {e}")
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved in case there are none
+            future.exception()
             raise
+        finally:
+            _INFLIGHT.pop(inflight_key, None)
+            if not future.done():
+                future.cancel()
+
+    @_llm_retry
+    def _complete(self, body: dict[str, Any]) -> str:
+        """Send one chat completion request, retrying transient failures."""
+        request_bucket, token_bucket = _rate_limiters(self.model_name)
+        if request_bucket is not None:
+            request_bucket.acquire()
+        if token_bucket is not None:
+            token_bucket.acquire(_estimate_tokens(body))
+
+        response = self._client.chat.completions.create(**body)
+        return response.choices[0].message.content
+
+    @_llm_retry
+    async def _acomplete(self, body: dict[str, Any]) -> str:
+        """Async counterpart of _complete."""
+        request_bucket, token_bucket = _rate_limiters(self.model_name)
+        if request_bucket is not None:
+            await request_bucket.aacquire()
+        if token_bucket is not None:
+            await token_bucket.aacquire(_estimate_tokens(body))
+
+        content = None
+        if settings.LLM_DIRECT_HTTP:
+            content = await self._apost_chat_completion(body)
+
+        if content is None:
+            response = await self._get_aclient().chat.completions.create(**body)
+            content = response.choices[0].message.content
+        return content
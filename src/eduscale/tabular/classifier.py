@@ -9,7 +9,6 @@ from typing import Literal
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
 
 from eduscale.tabular.concepts import ConceptsCatalog, embed_texts
 
@@ -49,38 +48,25 @@ def classify_table(df: pd.DataFrame, catalog: ConceptsCatalog) -> tuple[str, flo
     logger.info(f"Generating embeddings for {len(features)} features")
     feature_embeddings = embed_texts(features)
 
-    # Compute similarity with each table type
-    table_type_scores = {}
-    for table_type in catalog.table_types:
-        # Compute cosine similarity between feature embeddings and table type embedding
-        similarities = cosine_similarity(
-            feature_embeddings, table_type.embedding.reshape(1, -1)
-        )
-
-        # Use mean similarity across all features
-        mean_similarity = float(np.mean(similarities))
-        table_type_scores[table_type.name] = mean_similarity
-
-        logger.debug(
-            f"Table type {table_type.name}: mean_similarity={mean_similarity:.3f}"
-        )
+    # Compute similarity with all table types in one matmul; embeddings are
+    # L2-normalized, so the dot product is the cosine similarity
+    similarities = feature_embeddings.astype(np.float32, copy=False) @ catalog.table_type_matrix.T
+    mean_similarities = similarities.mean(axis=0, dtype=np.float64)
 
-    # Apply softmax normalization for calibrated probabilities
-    scores_array = np.array(list(table_type_scores.values()))
-    exp_scores = np.exp(scores_array - np.max(scores_array))  # Numerical stability
-    softmax_scores = exp_scores / np.sum(exp_scores)
+    if logger.isEnabledFor(logging.DEBUG):
+        for name, mean_similarity in zip(catalog.table_type_names, mean_similarities.tolist()):
+            logger.debug(f"Table type {name}: mean_similarity={mean_similarity:.3f}")
 
-    # Map back to table types
-    normalized_scores = dict(zip(table_type_scores.keys(), softmax_scores))
+    # Apply softmax normalization for calibrated probabilities and get best match
+    best_index, best_score, softmax_scores = _softmax_best(mean_similarities)
+    best_type = catalog.table_type_names[best_index]
 
-    # Get best match
-    best_type = max(normalized_scores, key=normalized_scores.get)
-    best_score = normalized_scores[best_type]
-
-    logger.info(
-        f"Classification result: {best_type} (confidence={best_score:.3f}), "
-        f"all_scores={normalized_scores}"
-    )
+    if logger.isEnabledFor(logging.INFO):
+        normalized_scores = dict(zip(catalog.table_type_names, softmax_scores.tolist()))
+        logger.info(
+            f"Classification result: {best_type} (confidence={best_score:.3f}), "
+            f"all_scores={normalized_scores}"
+        )
 
     # Check confidence threshold
     if best_score < 0.4:
@@ -89,12 +75,28 @@ def classify_table(df: pd.DataFrame, catalog: ConceptsCatalog) -> tuple[str, flo
         )
         return "FREE_FORM", best_score
 
-    # Log contributing features
-    _log_contributing_features(df, best_type, features[:5])
+    # Log contributing features (skip building the messages when INFO is off)
+    if logger.isEnabledFor(logging.INFO):
+        _log_contributing_features(df, best_type, features[:5])
 
     return best_type, best_score
 
 
+def _softmax_best(scores: np.ndarray) -> tuple[int, float, np.ndarray]:
+    """Softmax-normalize scores and pick the best one.
+
+    Args:
+        scores: 1-D array of raw scores
+
+    Returns:
+        Tuple of (best_index, best_probability, probabilities)
+    """
+    probabilities = np.exp(scores - scores.max())  # Numerical stability
+    probabilities /= probabilities.sum()
+    best_index = int(probabilities.argmax())
+    return best_index, float(probabilities[best_index]), probabilities
+
+
 def _extract_features(df: pd.DataFrame, max_samples: int = 5) -> list[str]:
     """Extract text features from DataFrame for classification.
 
@@ -109,18 +111,26 @@ def _extract_features(df: pd.DataFrame, max_samples: int = 5) -> list[str]:
     Returns:
         List of feature strings
     """
+    # Slice the leading rows of the whole frame once; only columns with nulls in
+    # that window need their own dropna() to find max_samples non-null values
+    head = df.head(max_samples)
+    head_has_nulls = head.isna().any().to_numpy()
+
     features = []
 
-    for col in df.columns:
+    for i, col in enumerate(df.columns):
         # Add column header as feature
         col_feature = f"Column: {col}"
 
         # Get sample values (non-null)
-        sample_values = df[col].dropna().head(max_samples).tolist()
+        if head_has_nulls[i]:
+            sample_values = df.iloc[:, i].dropna().head(max_samples).tolist()
+        else:
+            sample_values = head.iloc[:, i].tolist()
 
         if sample_values:
             # Convert to strings and join
-            sample_str = "; ".join(str(v) for v in sample_values)
+            sample_str = "; ".join(map(str, sample_values))
             col_feature += f" | Values: {sample_str}"
 
         features.append(col_feature)
@@ -144,4 +154,5 @@ def _log_contributing_features(
     )
 
     # Log column headers for debugging
-    logger.debug(f"DataFrame columns: {df.columns.tolist()}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"DataFrame columns: {df.columns.tolist()}")
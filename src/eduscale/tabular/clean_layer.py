@@ -4,16 +4,30 @@ This module writes normalized DataFrames as Parquet files to the clean layer
 (intermediate storage before BigQuery loading).
 """
 
+import io
 import logging
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from eduscale.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Rows per Parquet row group; smaller groups let BigQuery scan a file in parallel
+PARQUET_ROW_GROUP_SIZE = 64_000
+
+# HTTP connections kept per host by the shared GCS client
+GCS_HTTP_POOL_SIZE = 32
+
+# Global GCS client (singleton so auth and TLS setup happen once per process)
+_gcs_client = None
+_gcs_client_lock = threading.Lock()
+
 
 @dataclass
 class CleanLocation:
@@ -107,8 +121,6 @@ def _write_to_gcs(df: pd.DataFrame, uri: str) -> int:
     Returns:
         File size in bytes
     """
-    from google.cloud import storage
-
     # Parse GCS URI
     if not uri.startswith("gs://"):
         raise ValueError(f"Invalid GCS URI: {uri}")
@@ -117,31 +129,46 @@ def _write_to_gcs(df: pd.DataFrame, uri: str) -> int:
     bucket_name = parts[0]
     blob_name = parts[1]
 
-    # Write to temporary file first
-    import tempfile
+    # Serialize into memory and upload from the buffer; no temp file round-trip
+    buffer = io.BytesIO()
+    _write_parquet(df, buffer)
+    size_bytes = buffer.tell()
 
-    with tempfile.NamedTemporaryFile(suffix=".parquet", delete=False) as tmp_file:
-        df.to_parquet(tmp_file.name, engine="pyarrow", compression="snappy")
-        tmp_path = tmp_file.name
+    client = _get_gcs_client()
+    bucket = client.bucket(bucket_name)
+    blob = bucket.blob(blob_name)
 
-    try:
-        # Upload to GCS
-        client = storage.Client(project=settings.GCP_PROJECT_ID)
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
+    # Known size lets the client pick a single-request upload and skips blob.reload()
+    blob.upload_from_file(buffer, rewind=True, size=size_bytes)
 
-        blob.upload_from_filename(tmp_path)
+    logger.debug(f"Uploaded to GCS: {uri}, size={size_bytes}")
+    return size_bytes
+
+
+def _get_gcs_client():
+    """Get or create the shared GCS client.
+
+    Returns:
+        google.cloud.storage.Client instance
+    """
+    global _gcs_client
 
-        # Get file size
-        blob.reload()
-        size_bytes = blob.size
+    if _gcs_client is None:
+        with _gcs_client_lock:
+            if _gcs_client is None:
+                from google.cloud import storage
+                from requests.adapters import HTTPAdapter
 
-        logger.debug(f"Uploaded to GCS: {uri}, size={size_bytes}")
-        return size_bytes
+                client = storage.Client(project=settings.GCP_PROJECT_ID)
+                # Allow concurrent uploads from pipeline workers to reuse connections
+                adapter = HTTPAdapter(
+                    pool_connections=GCS_HTTP_POOL_SIZE, pool_maxsize=GCS_HTTP_POOL_SIZE
+                )
+                client._http.mount("https://", adapter)
+                _gcs_client = client
+                logger.info("Initialized GCS client for clean layer writes")
 
-    finally:
-        # Clean up temp file
-        Path(tmp_path).unlink(missing_ok=True)
+    return _gcs_client
 
 
 def _write_to_local(df: pd.DataFrame, path: str) -> int:
@@ -159,10 +186,40 @@ def _write_to_local(df: pd.DataFrame, path: str) -> int:
     file_path.parent.mkdir(parents=True, exist_ok=True)
 
     # Write Parquet
-    df.to_parquet(file_path, engine="pyarrow", compression="snappy")
+    _write_parquet(df, file_path)
 
     # Get file size
     size_bytes = file_path.stat().st_size
 
     logger.debug(f"Wrote to local: {path}, size={size_bytes}")
     return size_bytes
+
+
+def _write_parquet(df: pd.DataFrame, where: str | Path | io.IOBase) -> None:
+    """Write DataFrame as Snappy Parquet with dictionary encoding and bounded row groups.
+
+    Columns listed in df.attrs["categorical_columns"] (set by normalize_dataframe)
+    are stored as dictionary-typed strings.
+
+    Args:
+        df: DataFrame to write
+        where: File path or writable binary buffer
+    """
+    table = pa.Table.from_pandas(df)
+
+    for name in df.attrs.get("categorical_columns", []):
+        index = table.schema.get_field_index(name)
+        field_type = table.schema.field(index).type if index >= 0 else None
+        if field_type is not None and (
+            pa.types.is_string(field_type) or pa.types.is_large_string(field_type)
+        ):
+            table = table.set_column(index, name, table.column(index).dictionary_encode())
+
+    pq.write_table(
+        table,
+        where,
+        compression="snappy",
+        use_dictionary=True,
+        row_group_size=PARQUET_ROW_GROUP_SIZE,
+        write_statistics=True,
+    )
@@ -4,12 +4,16 @@ This module loads the concepts catalog from YAML, manages the sentence-transform
 embedding model, and provides functions for generating embeddings.
 """
 
+import hashlib
 import logging
-from dataclasses import dataclass
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 import numpy as np
+import torch
 import yaml
 from sentence_transformers import SentenceTransformer
 
@@ -21,6 +25,55 @@ logger = logging.getLogger(__name__)
 _embedding_model = None
 
 
+class _EmbeddingCache:
+    """Thread-safe LRU map of (model, text) hash -> embedding vector.
+
+    Column headers, sample values and catalog texts recur across files and
+    re-runs, so repeated texts skip the model forward pass.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, text: str) -> bytes:
+        """Hash a model name and text into a compact cache key."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{model}\0".encode())
+        digest.update(text.encode())
+        return digest.digest()
+
+    def get(self, key: bytes) -> np.ndarray | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value: np.ndarray) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_EMBEDDING_CACHE = _EmbeddingCache(settings.EMBEDDING_CACHE_SIZE)
+
+# Small integer code for each concept/column type, used to index type lookup tables
+TYPE_CODES = {"number": 0, "date": 1, "string": 2, "categorical": 3}
+# Code for any other type name; it matches nothing, so it always takes the mismatch penalty
+UNKNOWN_TYPE_CODE = len(TYPE_CODES)
+
+
 @dataclass
 class Concept:
     """Canonical concept definition."""
@@ -47,6 +100,15 @@ class ConceptsCatalog:
 
     table_types: list[TableType]
     concepts: list[Concept]
+    # Contiguous float32 embedding matrices; each object's .embedding is a row view
+    # Table type embeddings stacked row-wise, aligned with table_type_names
+    table_type_matrix: np.ndarray | None = None
+    table_type_names: list[str] = field(default_factory=list)
+    # Concept embeddings stacked row-wise, aligned with concept_keys/concept_types
+    concept_matrix: np.ndarray | None = None
+    concept_keys: list[str] = field(default_factory=list)
+    concept_types: np.ndarray | None = None
+    concept_type_codes: np.ndarray | None = None
 
 
 def init_embeddings() -> None:
@@ -61,9 +123,17 @@ def init_embeddings() -> None:
         logger.debug("Embedding model already loaded")
         return
 
+    device = settings.EMBEDDING_DEVICE or ("cuda" if torch.cuda.is_available() else "cpu")
+
     try:
-        logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL_NAME}")
-        _embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+        logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL_NAME} on {device}")
+        model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME, device=device)
+        if device.startswith("cuda"):
+            # Half-precision weights use tensor cores and halve activation memory
+            model.half()
+        _embedding_model = model
+        # Rows cached under a previously loaded model must not be served for this one
+        _EMBEDDING_CACHE.clear()
         logger.info(
             f"Embedding model loaded successfully: {settings.EMBEDDING_MODEL_NAME}"
         )
@@ -79,7 +149,8 @@ def embed_texts(texts: list[str]) -> np.ndarray:
         texts: List of text strings to embed
 
     Returns:
-        numpy array of shape (len(texts), 768) with embeddings
+        numpy array of shape (len(texts), 768) with embeddings; texts seen
+        before are served from an in-memory cache
 
     Raises:
         RuntimeError: If embedding model is not initialized
@@ -90,15 +161,45 @@ def embed_texts(texts: list[str]) -> np.ndarray:
     if not texts:
         return np.array([])
 
-    try:
-        # Generate embeddings with normalization
-        embeddings = _embedding_model.encode(
-            texts, normalize_embeddings=True, show_progress_bar=False
-        )
-        return np.array(embeddings)
-    except Exception as e:
-        logger.error(f"Failed to generate embeddings: {e}")
-        raise
+    model_name = settings.EMBEDDING_MODEL_NAME
+    keys = [_EmbeddingCache.key(model_name, text) for text in texts]
+    rows = [_EMBEDDING_CACHE.get(key) for key in keys]
+
+    # Encode each distinct cache miss once
+    misses: dict[bytes, str] = {}
+    for key, text, row in zip(keys, texts, rows):
+        if row is None:
+            misses.setdefault(key, text)
+
+    if misses:
+        try:
+            # Generate embeddings with normalization, skipping autograd bookkeeping
+            with torch.inference_mode():
+                encoded = _embedding_model.encode(
+                    list(misses.values()),
+                    batch_size=settings.EMBEDDING_BATCH_SIZE,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False,
+                )
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings: {e}")
+            raise
+
+        # fp16 models return half-precision rows; keep float32 for downstream math
+        fresh = dict(zip(misses, np.asarray(encoded, dtype=np.float32)))
+        for key, embedding in fresh.items():
+            # Copy so cached rows don't keep the whole encoded batch alive
+            _EMBEDDING_CACHE.put(key, embedding.copy())
+        rows = [fresh[key] if row is None else row for key, row in zip(keys, rows)]
+
+    embeddings = np.vstack(rows)
+
+    if settings.EMBEDDING_CHECK_NORMS:
+        # Similarity code uses plain dot products and relies on unit-norm rows
+        np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, atol=1e-3)
+
+    return embeddings
 
 
 def load_concepts_catalog(path: str | None = None) -> ConceptsCatalog:
@@ -141,29 +242,58 @@ def load_concepts_catalog(path: str | None = None) -> ConceptsCatalog:
             expected_type=c_data["expected_type"],
             synonyms=c_data["synonyms"],
         )
+        if concept.expected_type not in TYPE_CODES:
+            logger.warning(
+                f"Concept '{concept.key}' has unknown expected_type "
+                f"'{concept.expected_type}'; it will never match a column type"
+            )
         concepts.append(concept)
 
     logger.info(
         f"Loaded {len(table_types)} table types and {len(concepts)} concepts from catalog"
     )
 
-    # Precompute embeddings for table type anchors
-    logger.info("Precomputing embeddings for table type anchors...")
-    for table_type in table_types:
-        # Combine all anchors into a single text for embedding
-        combined_text = " | ".join(table_type.anchors)
-        table_type.embedding = embed_texts([combined_text])[0]
-
-    # Precompute embeddings for concept synonyms
-    logger.info("Precomputing embeddings for concept synonyms...")
-    for concept in concepts:
-        # Combine description and all synonyms for richer semantic representation
-        combined_text = f"{concept.description}. Synonyms: {', '.join(concept.synonyms)}"
-        concept.embedding = embed_texts([combined_text])[0]
+    # Precompute embeddings for table type anchors and concept synonyms in one batch
+    logger.info("Precomputing embeddings for table type anchors and concept synonyms...")
+    # Combine all anchors into a single text per table type
+    anchor_texts = [" | ".join(table_type.anchors) for table_type in table_types]
+    # Combine description and all synonyms for richer semantic representation
+    concept_texts = [
+        f"{concept.description}. Synonyms: {', '.join(concept.synonyms)}"
+        for concept in concepts
+    ]
+    texts = anchor_texts + concept_texts
+    if texts:
+        # One contiguous float32 buffer; float64 would halve BLAS throughput
+        embeddings = np.ascontiguousarray(embed_texts(texts), dtype=np.float32)
+    else:
+        embeddings = np.empty((0, 0), dtype=np.float32)
+
+    # Row slices of a C-contiguous array stay contiguous views of the same buffer
+    table_type_matrix = embeddings[: len(anchor_texts)]
+    concept_matrix = embeddings[len(anchor_texts) :]
+
+    # Per-object embeddings are row views into the catalog matrices, not copies
+    for table_type, row in zip(table_types, table_type_matrix):
+        table_type.embedding = row
+    for concept, row in zip(concepts, concept_matrix):
+        concept.embedding = row
 
     logger.info("Embeddings precomputed successfully")
 
-    return ConceptsCatalog(table_types=table_types, concepts=concepts)
+    return ConceptsCatalog(
+        table_types=table_types,
+        concepts=concepts,
+        table_type_matrix=table_type_matrix,
+        table_type_names=[tt.name for tt in table_types],
+        concept_matrix=concept_matrix,
+        concept_keys=[c.key for c in concepts],
+        concept_types=np.array([c.expected_type for c in concepts]),
+        concept_type_codes=np.array(
+            [TYPE_CODES.get(c.expected_type, UNKNOWN_TYPE_CODE) for c in concepts],
+            dtype=np.int8,
+        ),
+    )
 
 
 def get_table_type_anchors(catalog: ConceptsCatalog) -> list[TableType]:
@@ -5,17 +5,45 @@ semantic embeddings and type matching.
 """
 
 import logging
+import re
 from dataclasses import dataclass
 from typing import Literal
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
 
-from eduscale.tabular.concepts import ConceptsCatalog, embed_texts
+from eduscale.tabular.concepts import (
+    TYPE_CODES,
+    UNKNOWN_TYPE_CODE,
+    ConceptsCatalog,
+    embed_texts,
+)
 
 logger = logging.getLogger(__name__)
 
+# Cheap pre-check for date-shaped values (ISO incl. year-month, d/m/y, Czech d.m.y,
+# compact yyyymmdd, time of day, month names either side of a number) so the
+# pandas date parser only runs on plausible date columns
+_MONTH_NAMES = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)"
+_DATE_RE = re.compile(
+    r"^\s*(?:\d{4}[-/.\s]\d{1,2}\b|\d{1,2}[-/.]\s*\d{1,2}[-/.]\s*\d{2,4}|\d{8}\b"
+    r"|\d{1,2}:\d{2}|\d{1,2}\s*[ap]\.?m\b)"
+    rf"|\b{_MONTH_NAMES}[a-z]*\.?[-\s]+\d|\d[-.\s]+{_MONTH_NAMES}",
+    re.IGNORECASE,
+)
+
+# Score adjustment indexed by [column type code, concept type code] (see TYPE_CODES)
+ADJUST_TABLE = np.array(
+    [
+        # number, date, string, categorical, unknown
+        [0.1, -0.15, -0.15, -0.15, -0.15],  # number
+        [-0.15, 0.1, -0.15, -0.15, -0.15],  # date
+        [-0.15, -0.15, 0.05, 0.05, -0.15],  # string
+        [-0.15, -0.15, 0.05, 0.05, -0.15],  # categorical
+    ],
+    dtype=np.float32,
+)
+
 
 @dataclass
 class ColumnMapping:
@@ -26,6 +54,7 @@ class ColumnMapping:
     score: float
     status: Literal["AUTO", "LOW_CONFIDENCE", "UNKNOWN"]
     candidates: list[tuple[str, float]]  # Top-3 candidates with scores
+    source_type: str | None = None  # Inferred column type: "number", "date", "string", "categorical"
 
 
 def map_columns(
@@ -42,8 +71,8 @@ def map_columns(
         List of ColumnMapping objects for each column
 
     Algorithm:
-        1. For each column: build description with samples, generate embedding, infer dtype
-        2. Compute cosine similarity with all concept embeddings
+        1. Build descriptions with samples for all columns, embed them in one batch, infer dtypes
+        2. Compute cosine similarity with all concept embeddings as a single matmul
         3. Apply type-based score adjustments
         4. Assign status: AUTO (>=0.75), LOW_CONFIDENCE (0.55-0.75), UNKNOWN (<0.55)
         5. Store top-3 candidates for explainability
@@ -52,10 +81,33 @@ def map_columns(
         logger.warning("Empty DataFrame, returning empty mappings")
         return []
 
+    columns = list(df.columns)
+
+    # Embed all column descriptions in one batch
+    descriptions = [_build_column_description(df, col) for col in columns]
+    col_embeddings = embed_texts(descriptions).astype(np.float32, copy=False)
+    col_types = [_infer_column_type(df[col]) for col in columns]
+    col_type_codes = np.array([TYPE_CODES[col_type] for col_type in col_types], dtype=np.int8)
+
+    # Similarity of every column with every concept in one matmul; embeddings
+    # are L2-normalized, so the dot product is the cosine similarity
+    similarities = col_embeddings @ catalog.concept_matrix.T
+
+    # Apply type-based score adjustments for all (column, concept) pairs at once
+    adjustments = ADJUST_TABLE[col_type_codes[:, None], catalog.concept_type_codes[None, :]]
+    adjusted = np.clip(similarities + adjustments, 0.0, 1.0)
+
+    # Top-3 concepts per column, best first (stable, so ties keep catalog order)
+    top_indices = np.argsort(-adjusted, axis=1, kind="stable")[:, :3]
+
     mappings = []
 
-    for col in df.columns:
-        mapping = _map_single_column(df, col, catalog)
+    for i, col in enumerate(columns):
+        top_candidates = [
+            (catalog.concept_keys[j], float(adjusted[i, j])) for j in top_indices[i]
+        ]
+        mapping = _build_mapping(col, top_candidates)
+        mapping.source_type = col_types[i]
         mappings.append(mapping)
 
         logger.info(
@@ -66,50 +118,16 @@ def map_columns(
     return mappings
 
 
-def _map_single_column(
-    df: pd.DataFrame, col: str, catalog: ConceptsCatalog
-) -> ColumnMapping:
-    """Map a single column to a concept.
+def _build_mapping(col: str, top_candidates: list[tuple[str, float]]) -> ColumnMapping:
+    """Build the mapping for a column from its ranked concept candidates.
 
     Args:
-        df: DataFrame
         col: Column name
-        catalog: Concepts catalog
+        top_candidates: Top-3 (concept_key, score) pairs, best first
 
     Returns:
         ColumnMapping for the column
     """
-    # Build column description with samples
-    description = _build_column_description(df, col)
-
-    # Generate embedding for column
-    col_embedding = embed_texts([description])[0]
-
-    # Infer column data type
-    col_dtype = _infer_column_type(df[col])
-
-    # Compute similarity with all concepts
-    concept_scores = []
-
-    for concept in catalog.concepts:
-        # Compute cosine similarity
-        similarity = float(
-            cosine_similarity(
-                col_embedding.reshape(1, -1), concept.embedding.reshape(1, -1)
-            )[0][0]
-        )
-
-        # Apply type-based score adjustments
-        adjusted_score = _adjust_score_by_type(similarity, col_dtype, concept.expected_type)
-
-        concept_scores.append((concept.key, adjusted_score))
-
-    # Sort by score (descending)
-    concept_scores.sort(key=lambda x: x[1], reverse=True)
-
-    # Get top-3 candidates
-    top_candidates = concept_scores[:3]
-
     # Get best match
     best_concept, best_score = top_candidates[0]
 
@@ -174,16 +192,19 @@ def _infer_column_type(series: pd.Series) -> str:
     if pd.api.types.is_datetime64_any_dtype(series):
         return "date"
 
-    # Try to parse as datetime
-    try:
-        pd.to_datetime(series.dropna().head(10), errors="raise")
-        return "date"
-    except (ValueError, TypeError):
-        pass
+    # Try to parse as datetime, but only if the samples look date-shaped
+    sample = series.dropna().head(10)
+    if sample.empty or sample.astype(str).str.contains(_DATE_RE).any():
+        try:
+            pd.to_datetime(sample, errors="raise")
+            return "date"
+        except (ValueError, TypeError):
+            pass
 
     # Check if categorical (low cardinality)
-    unique_ratio = series.nunique() / len(series) if len(series) > 0 else 0
-    if unique_ratio < 0.1 and series.nunique() < 50:
+    n_unique = series.nunique()
+    unique_ratio = n_unique / len(series) if len(series) > 0 else 0
+    if unique_ratio < 0.1 and n_unique < 50:
         return "categorical"
 
     # Default to string
@@ -209,23 +230,8 @@ def _adjust_score_by_type(
         - +0.05 if string column and concept type is "string" or "categorical"
         - -0.15 if types don't match
     """
-    adjusted = similarity
-
-    # Exact type matches get bonus
-    if col_type == "number" and concept_type == "number":
-        adjusted += 0.1
-    elif col_type == "date" and concept_type == "date":
-        adjusted += 0.1
-    elif col_type in ["string", "categorical"] and concept_type in [
-        "string",
-        "categorical",
-    ]:
-        adjusted += 0.05
-    # Type mismatch penalty
-    elif col_type != concept_type:
-        adjusted -= 0.15
+    concept_code = TYPE_CODES.get(concept_type, UNKNOWN_TYPE_CODE)
+    adjusted = similarity + float(ADJUST_TABLE[TYPE_CODES[col_type], concept_code])
 
     # Ensure score stays in valid range [0, 1]
-    adjusted = max(0.0, min(1.0, adjusted))
-
-    return adjusted
+    return max(0.0, min(1.0, adjusted))
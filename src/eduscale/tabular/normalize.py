@@ -9,6 +9,7 @@ import logging
 import re
 from datetime import datetime, timezone
 
+import numpy as np
 import pandas as pd
 
 from eduscale.core.config import settings
@@ -16,6 +17,14 @@ from eduscale.tabular.mapping import ColumnMapping
 
 logger = logging.getLogger(__name__)
 
+# Column names treated as dates in addition to any name containing "date"
+_DATE_COLUMN_NAMES = frozenset({"from_date", "to_date", "uploaded_at", "timestamp"})
+
+# Substrings that mark a column as numeric
+_NUMERIC_KEYWORDS_RE = re.compile(
+    "score|count|value|duration|size|length|weight|relevance|impact|sentiment"
+)
+
 
 def normalize_dataframe(
     df_raw: pd.DataFrame,
@@ -42,11 +51,13 @@ def normalize_dataframe(
         3. Cast types: dates, numbers, strings
         4. Add metadata columns
         5. Clean data: normalize school names, pseudonymize IDs if enabled
+        6. Record categorical columns in df.attrs["categorical_columns"]
     """
     if df_raw.empty:
         logger.warning("Empty DataFrame, returning as-is")
         return df_raw
 
+    # The only copy of the frame; later steps mutate it in place
     df = df_raw.copy()
 
     # Step 1: Store original column names in metadata
@@ -60,7 +71,7 @@ def normalize_dataframe(
             rename_map[mapping.source_column] = mapping.concept_key
 
     if rename_map:
-        df = df.rename(columns=rename_map)
+        df.rename(columns=rename_map, inplace=True)
         logger.info(f"Renamed columns: {rename_map}")
 
     # Step 3: Cast types
@@ -75,6 +86,15 @@ def normalize_dataframe(
     # Step 5: Clean data
     df = _clean_data(df)
 
+    # Step 6: Record low-cardinality columns so the Parquet writer can
+    # dictionary-encode them without re-inferring types
+    categorical_columns = []
+    for mapping in mappings:
+        col = rename_map.get(mapping.source_column, mapping.source_column)
+        if mapping.source_type == "categorical" and col in df.columns:
+            categorical_columns.append(col)
+    df.attrs["categorical_columns"] = categorical_columns
+
     logger.info(
         f"Normalized DataFrame: {len(df)} rows, {len(df.columns)} columns, "
         f"final columns: {df.columns.tolist()}"
@@ -86,62 +106,49 @@ def normalize_dataframe(
 def _cast_column_types(df: pd.DataFrame) -> pd.DataFrame:
     """Cast columns to appropriate types.
 
+    Mutates df in place; callers pass a frame they own.
+
     Args:
         df: DataFrame with renamed columns
 
     Returns:
-        DataFrame with properly typed columns
+        The same DataFrame with properly typed columns
     """
-    df = df.copy()
+    # Classify columns by name in a single pass
+    date_columns = []
+    numeric_columns = []
+    for col in df.columns:
+        lower = col.lower()
+        if "date" in lower or col in _DATE_COLUMN_NAMES:
+            date_columns.append(col)
+        if _NUMERIC_KEYWORDS_RE.search(lower):
+            numeric_columns.append(col)
 
     # Date columns
-    date_columns = [col for col in df.columns if "date" in col.lower() or col in ["from_date", "to_date", "uploaded_at", "timestamp"]]
     for col in date_columns:
-        if col in df.columns:
-            try:
-                df[col] = pd.to_datetime(df[col], errors="coerce")
-                logger.debug(f"Converted {col} to datetime")
-            except Exception as e:
-                logger.warning(f"Failed to convert {col} to datetime: {e}")
+        try:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+            logger.debug(f"Converted {col} to datetime")
+        except Exception as e:
+            logger.warning(f"Failed to convert {col} to datetime: {e}")
 
     # Numeric columns
-    numeric_columns = [
-        col
-        for col in df.columns
-        if any(
-            keyword in col.lower()
-            for keyword in [
-                "score",
-                "count",
-                "value",
-                "duration",
-                "size",
-                "length",
-                "weight",
-                "relevance",
-                "impact",
-                "sentiment",
-            ]
-        )
-    ]
     for col in numeric_columns:
-        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+        if not pd.api.types.is_numeric_dtype(df[col]):
             try:
                 df[col] = pd.to_numeric(df[col], errors="coerce")
                 logger.debug(f"Converted {col} to numeric")
             except Exception as e:
                 logger.warning(f"Failed to convert {col} to numeric: {e}")
 
-    # String columns (strip whitespace)
+    # String columns: strip whitespace and turn 'nan' strings back into NaN
     string_columns = df.select_dtypes(include=["object"]).columns
-    for col in string_columns:
-        if col in df.columns:
-            try:
-                df[col] = df[col].astype(str).str.strip()
-                # Replace 'nan' string with actual NaN
-                df[col] = df[col].replace("nan", pd.NA)
-            except Exception as e:
-                logger.warning(f"Failed to clean string column {col}: {e}")
+    if len(string_columns) > 0:
+        try:
+            strings = df[string_columns].astype(str)
+            df[string_columns] = strings.apply(lambda s: s.str.strip()).replace("nan", pd.NA)
+        except Exception as e:
+            logger.warning(f"Failed to clean string columns {list(string_columns)}: {e}")
 
     return df
 
@@ -149,17 +156,17 @@ def _cast_column_types(df: pd.DataFrame) -> pd.DataFrame:
 def _clean_data(df: pd.DataFrame) -> pd.DataFrame:
     """Clean and normalize data values.
 
+    Mutates df in place; callers pass a frame they own.
+
     Args:
         df: DataFrame with typed columns
 
     Returns:
-        DataFrame with cleaned data
+        The same DataFrame with cleaned data
     """
-    df = df.copy()
-
     # Normalize school names
     if "school_name" in df.columns:
-        df["school_name"] = df["school_name"].apply(_normalize_school_name)
+        df["school_name"] = _normalize_school_names(df["school_name"])
         logger.debug("Normalized school names")
 
     # Pseudonymize IDs if enabled
@@ -170,7 +177,7 @@ def _clean_data(df: pd.DataFrame) -> pd.DataFrame:
                 # Store original in metadata column
                 df[f"{col}_original"] = df[col]
                 # Hash the ID
-                df[col] = df[col].apply(_pseudonymize_id)
+                df[col] = _pseudonymize_series(df[col])
                 logger.debug(f"Pseudonymized {col}")
 
     return df
@@ -207,18 +214,74 @@ def _normalize_school_name(name: str) -> str:
     return name
 
 
+def _normalize_school_names(names: pd.Series) -> pd.Series:
+    """Normalize a column of school names with vectorized string ops.
+
+    Applies the same rules as _normalize_school_name using Arrow-backed
+    string kernels instead of a Python call per row.
+
+    Args:
+        names: Column of school names
+
+    Returns:
+        Series of normalized names with missing values left unchanged
+    """
+    if isinstance(names.dtype, pd.CategoricalDtype) or not pd.api.types.is_string_dtype(names):
+        # Normalized names are not existing categories, and non-string values
+        # would be cast back from strings, so use the per-row path here
+        return names.map(_normalize_school_name)
+
+    normalized = (
+        names.astype("string[pyarrow]")
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+        .str.title()
+        .str.replace("Zs", "ZŠ", regex=False)
+        .str.replace("Ss", "SŠ", regex=False)
+        .str.replace("Gym", "Gymnázium", regex=False)
+    )
+    return normalized.astype(names.dtype).where(names.notna(), names)
+
+
 def _pseudonymize_id(id_value: str) -> str:
-    """Pseudonymize ID using SHA256 hash.
+    """Pseudonymize ID using the configured hash (PSEUDONYMIZE_HASH_ALGO).
 
     Args:
         id_value: Original ID
 
     Returns:
-        Hashed ID (first 16 characters of SHA256)
+        Hashed ID (16 hex characters: truncated SHA256, or an 8-byte BLAKE2b digest)
     """
     if pd.isna(id_value) or id_value == "":
         return id_value
 
-    # Hash the ID
-    hashed = hashlib.sha256(str(id_value).encode()).hexdigest()[:16]
-    return hashed
+    data = str(id_value).encode()
+
+    # Hash the ID; BLAKE2b is faster than SHA256 on CPUs without SHA
+    # extensions, but changes every hash, so it is opt-in
+    if settings.PSEUDONYMIZE_HASH_ALGO == "sha256":
+        return hashlib.sha256(data).hexdigest()[:16]
+    elif settings.PSEUDONYMIZE_HASH_ALGO == "blake2b":
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+    else:
+        raise ValueError(f"Unknown pseudonymization hash: {settings.PSEUDONYMIZE_HASH_ALGO}")
+
+
+def _pseudonymize_series(series: pd.Series) -> pd.Series:
+    """Pseudonymize a column of IDs, hashing each distinct value only once.
+
+    Args:
+        series: Column of original IDs
+
+    Returns:
+        Series of hashed IDs with nulls and empty strings left unchanged
+    """
+    # IDs repeat across rows, so hash the distinct values and broadcast back
+    codes, uniques = pd.factorize(series)
+    hashed_uniques = np.array([_pseudonymize_id(value) for value in uniques], dtype=object)
+
+    values = series.to_numpy(dtype=object, copy=True)
+    present = codes >= 0  # factorize marks nulls with -1
+    values[present] = hashed_uniques[codes[present]]
+
+    return pd.Series(values, index=series.index, name=series.name)
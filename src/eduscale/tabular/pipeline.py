@@ -7,10 +7,21 @@ DataFrame loading, and orchestration of all pipeline stages.
 import json
 import logging
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Iterator
 
 import yaml
 
+try:
+    # LibYAML C parser; PyYAML wheels bundle it on all major platforms
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - pure-Python fallback
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -108,117 +119,16 @@ def parse_frontmatter(text_content: str) -> tuple[FrontmatterData | None, str]:
         ---
         <actual text content>
     """
-    # Check if text starts with frontmatter delimiter
-    if not text_content.startswith("---\n"):
-        logger.debug("No frontmatter found (doesn't start with '---')")
-        return None, text_content
-
-    # Find the second delimiter
     try:
-        # Split on first occurrence after the opening ---
-        parts = text_content[4:].split("\n---\n", 1)
-        if len(parts) != 2:
-            logger.warning("Frontmatter delimiter not properly closed")
+        parts = _split_frontmatter(text_content)
+        if parts is None:
             return None, text_content
 
         yaml_content, clean_text = parts
-
-        # Parse YAML
-        try:
-            data = yaml.safe_load(yaml_content)
-        except yaml.YAMLError as e:
-            logger.warning(f"Failed to parse YAML frontmatter: {e}")
-            return None, text_content
-
-        if not isinstance(data, dict):
-            logger.warning("Frontmatter is not a valid YAML dictionary")
+        frontmatter = _parse_yaml_block(yaml_content)
+        if frontmatter is None:
             return None, text_content
 
-        # Extract top-level fields
-        file_id = data.get("file_id", "")
-        region_id = data.get("region_id", "")
-        text_uri = data.get("text_uri", "")
-        event_id = data.get("event_id")
-        file_category = data.get("file_category")
-
-        # Extract nested 'original' section
-        original = data.get("original", {})
-        original_filename = original.get("filename")
-        original_content_type = original.get("content_type")
-        original_size_bytes = original.get("size_bytes")
-        bucket = original.get("bucket")
-        object_path = original.get("object_path")
-        uploaded_at = original.get("uploaded_at")
-
-        # Extract nested 'extraction' section
-        extraction = data.get("extraction", {})
-        extraction_method = extraction.get("method")
-        extraction_timestamp = extraction.get("timestamp")
-        extraction_success = extraction.get("success")
-        extraction_duration_ms = extraction.get("duration_ms")
-
-        # Extract nested 'content' section
-        content = data.get("content", {})
-        text_length = content.get("text_length")
-        word_count = content.get("word_count")
-        character_count = content.get("character_count")
-
-        # Extract nested 'document' section
-        document = data.get("document", {})
-        page_count = document.get("page_count")
-        sheet_count = document.get("sheet_count")
-        slide_count = document.get("slide_count")
-
-        # Extract nested 'audio' section
-        audio = data.get("audio", {})
-        audio_duration_seconds = audio.get("duration_seconds")
-        audio_sample_rate = audio.get("sample_rate")
-        audio_channels = audio.get("channels")
-        audio_confidence = audio.get("confidence")
-        audio_language = audio.get("language")
-
-        frontmatter = FrontmatterData(
-            file_id=file_id,
-            region_id=region_id,
-            text_uri=text_uri,
-            event_id=event_id,
-            file_category=file_category,
-            original_filename=original_filename,
-            original_content_type=original_content_type,
-            original_size_bytes=original_size_bytes,
-            bucket=bucket,
-            object_path=object_path,
-            uploaded_at=uploaded_at,
-            extraction_method=extraction_method,
-            extraction_timestamp=extraction_timestamp,
-            extraction_success=extraction_success,
-            extraction_duration_ms=extraction_duration_ms,
-            text_length=text_length,
-            word_count=word_count,
-            character_count=character_count,
-            page_count=page_count,
-            sheet_count=sheet_count,
-            slide_count=slide_count,
-            audio_duration_seconds=audio_duration_seconds,
-            audio_sample_rate=audio_sample_rate,
-            audio_channels=audio_channels,
-            audio_confidence=audio_confidence,
-            audio_language=audio_language,
-        )
-
-        # Log parsed metadata
-        log_msg = (
-            f"Parsed frontmatter for file_id={file_id}, "
-            f"category={file_category}, "
-            f"content_type={original_content_type}, "
-            f"text_length={text_length}"
-        )
-        if audio_duration_seconds is not None:
-            log_msg += f", audio_duration={audio_duration_seconds:.2f}s"
-        if page_count is not None:
-            log_msg += f", pages={page_count}"
-        logger.info(log_msg)
-
         return frontmatter, clean_text.strip()
 
     except Exception as e:
@@ -226,14 +136,171 @@ def parse_frontmatter(text_content: str) -> tuple[FrontmatterData | None, str]:
         return None, text_content
 
 
+def _split_frontmatter(text_content: str) -> tuple[str, str] | None:
+    """Split text into its YAML frontmatter block and body without parsing.
+
+    Args:
+        text_content: Full text content potentially containing YAML frontmatter
+
+    Returns:
+        Tuple of (yaml_block, body), or None if there is no closed frontmatter
+    """
+    # Check if text starts with frontmatter delimiter
+    if not text_content.startswith("---\n"):
+        logger.debug("No frontmatter found (doesn't start with '---')")
+        return None
+
+    # Find the closing delimiter after the opening ---
+    end = text_content.find("\n---\n", 4)
+    if end < 0:
+        logger.warning("Frontmatter delimiter not properly closed")
+        return None
+
+    return text_content[4:end], text_content[end + 5 :]
+
+
+def _parse_yaml_block(yaml_content: str) -> FrontmatterData | None:
+    """Parse a frontmatter YAML block into FrontmatterData.
+
+    Args:
+        yaml_content: YAML text between the frontmatter delimiters
+
+    Returns:
+        FrontmatterData, or None if the block is not a valid YAML dictionary
+    """
+    try:
+        data = yaml.load(yaml_content, Loader=_YamlLoader)
+    except yaml.YAMLError as e:
+        logger.warning(f"Failed to parse YAML frontmatter: {e}")
+        return None
+
+    if not isinstance(data, dict):
+        logger.warning("Frontmatter is not a valid YAML dictionary")
+        return None
+
+    # Extract top-level fields
+    file_id = data.get("file_id", "")
+    region_id = data.get("region_id", "")
+    text_uri = data.get("text_uri", "")
+    event_id = data.get("event_id")
+    file_category = data.get("file_category")
+
+    # Extract nested 'original' section
+    original = data.get("original", {})
+    original_filename = original.get("filename")
+    original_content_type = original.get("content_type")
+    original_size_bytes = original.get("size_bytes")
+    bucket = original.get("bucket")
+    object_path = original.get("object_path")
+    uploaded_at = original.get("uploaded_at")
+
+    # Extract nested 'extraction' section
+    extraction = data.get("extraction", {})
+    extraction_method = extraction.get("method")
+    extraction_timestamp = extraction.get("timestamp")
+    extraction_success = extraction.get("success")
+    extraction_duration_ms = extraction.get("duration_ms")
+
+    # Extract nested 'content' section
+    content = data.get("content", {})
+    text_length = content.get("text_length")
+    word_count = content.get("word_count")
+    character_count = content.get("character_count")
+
+    # Extract nested 'document' section
+    document = data.get("document", {})
+    page_count = document.get("page_count")
+    sheet_count = document.get("sheet_count")
+    slide_count = document.get("slide_count")
+
+    # Extract nested 'audio' section
+    audio = data.get("audio", {})
+    audio_duration_seconds = audio.get("duration_seconds")
+    audio_sample_rate = audio.get("sample_rate")
+    audio_channels = audio.get("channels")
+    audio_confidence = audio.get("confidence")
+    audio_language = audio.get("language")
+
+    frontmatter = FrontmatterData(
+        file_id=file_id,
+        region_id=region_id,
+        text_uri=text_uri,
+        event_id=event_id,
+        file_category=file_category,
+        original_filename=original_filename,
+        original_content_type=original_content_type,
+        original_size_bytes=original_size_bytes,
+        bucket=bucket,
+        object_path=object_path,
+        uploaded_at=uploaded_at,
+        extraction_method=extraction_method,
+        extraction_timestamp=extraction_timestamp,
+        extraction_success=extraction_success,
+        extraction_duration_ms=extraction_duration_ms,
+        text_length=text_length,
+        word_count=word_count,
+        character_count=character_count,
+        page_count=page_count,
+        sheet_count=sheet_count,
+        slide_count=slide_count,
+        audio_duration_seconds=audio_duration_seconds,
+        audio_sample_rate=audio_sample_rate,
+        audio_channels=audio_channels,
+        audio_confidence=audio_confidence,
+        audio_language=audio_language,
+    )
+
+    # Log parsed metadata
+    log_msg = (
+        f"Parsed frontmatter for file_id={file_id}, "
+        f"category={file_category}, "
+        f"content_type={original_content_type}, "
+        f"text_length={text_length}"
+    )
+    if audio_duration_seconds is not None:
+        log_msg += f", audio_duration={audio_duration_seconds:.2f}s"
+    if page_count is not None:
+        log_msg += f", pages={page_count}"
+    logger.info(log_msg)
+
+    return frontmatter
+
+
+import csv
 import io
 import re
 from typing import Literal
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 from eduscale.core.config import settings
 
+# pandas' default na_values, so the pyarrow CSV path yields the same NaNs
+_CSV_NULL_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
 
 @dataclass
 class TabularSource:
@@ -299,27 +366,26 @@ def load_dataframe_from_text(
     if df is None or df.empty:
         raise ValueError(f"Failed to load DataFrame from text, content_type={content_type}")
 
-    # Normalize column names
-    df.columns = df.columns.str.strip()
-    original_columns = df.columns.tolist()
+    # Check row limit before spending time on column normalization. The
+    # pandas CSV reader stops after INGEST_MAX_ROWS + 1 rows, so len(df)
+    # is not necessarily the full row count here
+    if len(df) > settings.INGEST_MAX_ROWS:
+        raise ValueError(f"DataFrame exceeds maximum rows: > {settings.INGEST_MAX_ROWS}")
 
-    # Convert to lower_snake_case
-    df.columns = [_to_snake_case(col) for col in df.columns]
+    # Normalize column names to lower_snake_case in a single Index rebuild;
+    # surrounding whitespace becomes separators that the conversion strips
+    original_columns = df.columns.tolist()
+    df.columns = _normalize_column_names(df.columns)
 
     logger.info(f"Normalized column names: {original_columns} -> {df.columns.tolist()}")
 
     # Drop completely empty columns
-    empty_cols = df.columns[df.isna().all()].tolist()
+    counts = df.count()
+    empty_cols = counts.index[counts == 0].tolist()
     if empty_cols:
         logger.info(f"Dropping empty columns: {empty_cols}")
         df = df.drop(columns=empty_cols)
 
-    # Check row limit
-    if len(df) > settings.INGEST_MAX_ROWS:
-        raise ValueError(
-            f"DataFrame exceeds maximum rows: {len(df)} > {settings.INGEST_MAX_ROWS}"
-        )
-
     logger.info(f"Loaded DataFrame: {len(df)} rows, {len(df.columns)} columns")
 
     return df
@@ -335,34 +401,185 @@ def _load_csv_text(text_content: str, sep: str = ",") -> pd.DataFrame:
     Returns:
         pandas DataFrame
     """
-    # Try UTF-8 first
+    if (
+        settings.INGEST_ARROW_CSV_MIN_CHARS > 0
+        and len(text_content) >= settings.INGEST_ARROW_CSV_MIN_CHARS
+        and len(sep) == 1
+    ):
+        try:
+            df = _load_csv_arrow(text_content, sep)
+            if df is not None:
+                return df
+        except pa.ArrowException as e:
+            logger.warning(f"pyarrow CSV reader failed, falling back to pandas: {e}")
+
+    # The text is already decoded, so a single parse is enough; try the fast
+    # C parser first and keep the python engine for inputs it rejects
     try:
-        df = pd.read_csv(
+        return pd.read_csv(
             io.StringIO(text_content),
             sep=sep,
-            engine="python",
-            encoding="utf-8",
+            engine="c",
             on_bad_lines="skip",
+            nrows=settings.INGEST_MAX_ROWS + 1,
         )
-        return df
-    except Exception as e:
-        logger.warning(f"Failed to load with UTF-8 encoding: {e}")
+    except pd.errors.ParserError as e:
+        logger.warning(f"C parser failed, retrying with python engine: {e}")
 
-    # Fallback to cp1250 (Central European)
     try:
-        df = pd.read_csv(
+        return pd.read_csv(
             io.StringIO(text_content),
             sep=sep,
             engine="python",
-            encoding="cp1250",
             on_bad_lines="skip",
+            nrows=settings.INGEST_MAX_ROWS + 1,
         )
-        return df
     except Exception as e:
-        logger.error(f"Failed to load CSV with cp1250 encoding: {e}")
+        logger.error(f"Failed to load CSV: {e}")
         raise
 
 
+def _skip_long_rows(row: pacsv.InvalidRow) -> str:
+    """Skip rows with extra fields like on_bad_lines="skip" does.
+
+    pandas pads short rows with NaN instead of dropping them, which pyarrow
+    cannot do, so those abort the pyarrow read and fall back to pandas.
+    """
+    return "skip" if row.actual_columns > row.expected_columns else "error"
+
+
+def _load_csv_arrow(text_content: str, sep: str) -> pd.DataFrame | None:
+    """Load large CSV text with pyarrow's multithreaded reader.
+
+    Options mirror pd.read_csv defaults so the result matches the pandas
+    path: the same null markers, True/False-only booleans, and date-like
+    columns kept as strings rather than parsed into timestamps.
+
+    Args:
+        text_content: CSV text content
+        sep: Single separator character
+
+    Returns:
+        pandas DataFrame, or None if the header needs pandas' handling
+        (empty or duplicate column names)
+
+    Raises:
+        pa.ArrowException: If pyarrow cannot parse the text
+    """
+    data = pa.py_buffer(text_content.encode("utf-8"))
+    parse_options = pacsv.ParseOptions(
+        delimiter=sep,
+        newlines_in_values=True,
+        invalid_row_handler=_skip_long_rows,
+    )
+
+    def read(column_types: dict[str, pa.DataType]) -> pa.Table:
+        convert_options = pacsv.ConvertOptions(
+            null_values=_CSV_NULL_VALUES,
+            strings_can_be_null=True,
+            true_values=["True", "TRUE", "true"],
+            false_values=["False", "FALSE", "false"],
+            column_types=column_types,
+        )
+        return pacsv.read_csv(
+            pa.BufferReader(data), parse_options=parse_options, convert_options=convert_options
+        )
+
+    table = read({})
+
+    names = table.column_names
+    if "" in names or len(set(names)) != len(names):
+        return None
+
+    # pd.read_csv leaves dates as strings; re-read those columns untyped
+    temporal = {
+        field.name: pa.string() for field in table.schema if pa.types.is_temporal(field.type)
+    }
+    if temporal:
+        table = read(temporal)
+
+    # All-empty columns are float NaN in pandas, not object None
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+
+    df = table.to_pandas()
+
+    # Nullable booleans convert to object with None; pandas uses NaN
+    for field in table.schema:
+        if pa.types.is_boolean(field.type) and table.column(field.name).null_count:
+            df[field.name] = df[field.name].where(df[field.name].notna(), np.nan)
+
+    return df
+
+
+def _json_loads(text: str) -> Any:
+    """Decode JSON with orjson when available, falling back to the stdlib.
+
+    orjson rejects the NaN/Infinity literals that json.loads accepts, so a
+    decode error is retried with the stdlib before being raised.
+
+    Args:
+        text: JSON document
+
+    Returns:
+        Decoded Python object
+
+    Raises:
+        json.JSONDecodeError: If the text is not valid JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Yield the newline-separated lines of text without building a list of them.
+
+    Args:
+        text: Text to split
+
+    Yields:
+        Each line, without its trailing newline
+    """
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _records_to_dataframe(data: Any) -> pd.DataFrame:
+    """Build a DataFrame from decoded JSON records.
+
+    Flat records are loaded directly; nested objects go through
+    pd.json_normalize so their fields are flattened into dotted columns.
+
+    Args:
+        data: A single JSON object or a list of objects
+
+    Returns:
+        pandas DataFrame
+    """
+    if (
+        isinstance(data, list)
+        and data
+        and all(
+            isinstance(record, dict)
+            and not any(isinstance(value, dict) for value in record.values())
+            for record in data
+        )
+    ):
+        return pd.DataFrame.from_records(data)
+    return pd.json_normalize(data)
+
+
 def _load_json_text(text_content: str) -> pd.DataFrame:
     """Load JSON text into DataFrame.
 
@@ -374,29 +591,24 @@ def _load_json_text(text_content: str) -> pd.DataFrame:
     Returns:
         pandas DataFrame
     """
-    import json
-
     # Try single JSON object first
     try:
-        data = json.loads(text_content)
-        if isinstance(data, dict):
-            # Single object - normalize
-            df = pd.json_normalize(data)
-        elif isinstance(data, list):
-            # Array of objects
-            df = pd.json_normalize(data)
+        data = _json_loads(text_content)
+        if isinstance(data, (dict, list)):
+            # Single object or array of objects
+            df = _records_to_dataframe(data)
         else:
             raise ValueError(f"Unexpected JSON type: {type(data)}")
         return df
     except json.JSONDecodeError:
         # Try JSONL (line-by-line)
         logger.info("Single JSON parse failed, trying JSONL")
-        lines = text_content.strip().split("\n")
+        # Iterate lazily so large payloads are not copied into a list of lines
         records = []
-        for line in lines:
+        for line in _iter_lines(text_content):
             if line.strip():
                 try:
-                    records.append(json.loads(line))
+                    records.append(_json_loads(line))
                 except json.JSONDecodeError:
                     logger.warning(f"Skipping invalid JSON line: {line[:50]}...")
                     continue
@@ -404,10 +616,14 @@ def _load_json_text(text_content: str) -> pd.DataFrame:
         if not records:
             raise ValueError("No valid JSON records found")
 
-        df = pd.json_normalize(records)
+        df = _records_to_dataframe(records)
         return df
 
 
+# Characters of input inspected when sniffing the CSV separator
+AUTO_DETECT_SAMPLE_CHARS = 8192
+
+
 def _auto_detect_and_load(text_content: str) -> pd.DataFrame:
     """Auto-detect format and load DataFrame.
 
@@ -420,12 +636,25 @@ def _auto_detect_and_load(text_content: str) -> pd.DataFrame:
     Raises:
         ValueError: If format cannot be detected
     """
-    # Try CSV with different separators
-    for sep in [",", "\t", "|", ";"]:
+    # Sniff the separator from a sample of whole lines, then parse once
+    sample = text_content[:AUTO_DETECT_SAMPLE_CHARS]
+    if len(text_content) > AUTO_DETECT_SAMPLE_CHARS and "\n" in sample:
+        sample = sample[: sample.rindex("\n")]
+
+    try:
+        sep = csv.Sniffer().sniff(sample, delimiters=",\t|;").delimiter
+    except csv.Error:
+        sep = None
+
+    # The sniffer gives up on ragged rows (e.g. exports that drop trailing
+    # empty fields), so fall back to trying each separator in turn
+    candidates = [sep] if sep is not None else []
+    candidates += [candidate for candidate in [",", "\t", "|", ";"] if candidate != sep]
+    for candidate in candidates:
         try:
-            df = _load_csv_text(text_content, sep=sep)
+            df = _load_csv_text(text_content, sep=candidate)
             if len(df.columns) > 1:  # At least 2 columns
-                logger.info(f"Auto-detected separator: '{sep}'")
+                logger.info(f"Auto-detected separator: '{candidate}'")
                 return df
         except Exception:
             continue
@@ -443,6 +672,35 @@ def _auto_detect_and_load(text_content: str) -> pd.DataFrame:
     return pd.DataFrame({"text_content": [text_content]})
 
 
+# Python's Unicode \s set spelled out literally, since pyarrow's RE2 engine
+# (used by the vectorized .str path) only matches ASCII whitespace for \s
+_WHITESPACE_CHARS = "\t-\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000"
+# Runs of whitespace, hyphens and underscores collapse to one underscore
+_SEPARATORS_PATTERN = f"[{_WHITESPACE_CHARS}\\-_]+"
+_CAMEL_BOUNDARY_PATTERN = r"([a-z])([A-Z])"
+_SEPARATORS_RE = re.compile(_SEPARATORS_PATTERN)
+_CAMEL_BOUNDARY_RE = re.compile(_CAMEL_BOUNDARY_PATTERN)
+
+
+def _normalize_column_names(columns: pd.Index) -> pd.Index:
+    """Convert all column names to lower_snake_case with vectorized string ops.
+
+    Equivalent to applying _to_snake_case to each name.
+
+    Args:
+        columns: Column index of string names
+
+    Returns:
+        Index of snake_case names
+    """
+    return (
+        columns.str.replace(_SEPARATORS_PATTERN, "_", regex=True)
+        .str.replace(_CAMEL_BOUNDARY_PATTERN, r"\1_\2", regex=True)
+        .str.lower()
+        .str.strip("_")
+    )
+
+
 def _to_snake_case(text: str) -> str:
     """Convert text to lower_snake_case.
 
@@ -452,29 +710,48 @@ def _to_snake_case(text: str) -> str:
     Returns:
         snake_case version of text
     """
-    # Replace spaces and hyphens with underscores
-    text = re.sub(r"[\s\-]+", "_", text)
+    # Replace spaces, hyphens and repeated underscores with a single underscore
+    text = _SEPARATORS_RE.sub("_", text)
     # Insert underscore before uppercase letters
-    text = re.sub(r"([a-z])([A-Z])", r"\1_\2", text)
-    # Convert to lowercase
-    text = text.lower()
-    # Remove multiple underscores
-    text = re.sub(r"_+", "_", text)
-    # Remove leading/trailing underscores
-    text = text.strip("_")
-    return text
+    text = _CAMEL_BOUNDARY_RE.sub(r"\1_\2", text)
+    # Convert to lowercase and remove leading/trailing underscores
+    return text.lower().strip("_")
 
 
 
+import threading
 from datetime import datetime, timezone
 from typing import Any
 
 from eduscale.tabular.analysis.entity_resolver import (
     EntityCache,
-    resolve_entity,
+    EntityMatch,
+    resolve_entities_batch,
+    resolve_entities_multi,
 )
 from eduscale.tabular.analysis.llm_client import LLMClient
 
+# One LLMClient per thread: instances keep per-event-loop async state that
+# is not safe to share, while the HTTP connection pool is process-wide
+_llm_clients = threading.local()
+
+
+def _get_llm_client() -> LLMClient:
+    """Return this thread's LLMClient, creating it on first use.
+
+    Returns:
+        LLMClient for the configured model
+    """
+    client = getattr(_llm_clients, "client", None)
+    if (
+        client is None
+        or client.model_name != settings.FEATHERLESS_LLM_MODEL
+        or client.enabled != settings.LLM_ENABLED
+    ):
+        client = LLMClient()
+        _llm_clients.client = client
+    return client
+
 
 @dataclass
 class ObservationRecord:
@@ -520,9 +797,9 @@ def process_free_form_text(
         Tuple of (observation_record, observation_targets)
 
     Algorithm:
-        1. Extract entity mentions using LLM
+        1. Extract entity mentions and sentiment score in one LLM call
         2. Apply entity resolution to each mention
-        3. Compute sentiment score using LLM
+        3. Record the sentiment score
         4. Create observation record with metadata
         5. Create observation_targets junction records
     """
@@ -532,50 +809,76 @@ def process_free_form_text(
         f"text_length={len(text_content)}"
     )
 
-    # Initialize LLM client
-    llm_client = LLMClient()
+    # Reuse this thread's LLM client
+    llm_client = _get_llm_client()
 
-    # Step 1: Extract entity mentions using LLM
+    # Step 1: Extract entity mentions (and the sentiment used in step 3) in
+    # one LLM call
     detected_entities = []
+    sentiment_score = 0.0
     if settings.LLM_ENABLED:
         try:
-            entities = llm_client.extract_entities(text_content)
-            detected_entities = entities
-            logger.info(f"Extracted {len(entities)} entity mentions")
+            analysis = llm_client.analyze(text_content)
+            detected_entities = analysis["entities"]
+            sentiment_score = analysis["sentiment"]
+            logger.info(f"Extracted {len(detected_entities)} entity mentions")
         except Exception as e:
-            logger.warning(f"Entity extraction failed: {e}")
+            logger.warning(f"LLM text analysis failed: {e}")
     else:
-        logger.info("LLM disabled, skipping entity extraction")
+        logger.info("LLM disabled, skipping entity extraction and sentiment analysis")
 
-    # Step 2: Apply entity resolution to each mention
-    observation_targets = []
-    for entity in detected_entities:
-        entity_text = entity.get("text", "")
-        entity_type_hint = entity.get("type", "")  # person, subject, location
+    # Step 2: Apply entity resolution to each distinct mention; repeats of
+    # the same (text, type) would resolve to the same targets again
+    mentions = dict.fromkeys(
+        (entity.get("text", ""), entity.get("type", "")) for entity in detected_entities
+    )
+    texts_by_hint: dict[str, list[str]] = {}
+    for entity_text, entity_type_hint in mentions:
+        if entity_text:
+            texts_by_hint.setdefault(entity_type_hint, []).append(entity_text)
+
+    def resolve_batch(texts: list[str], entity_type: str) -> dict[str, EntityMatch]:
+        """Resolve texts as one entity type in a single batched call."""
+        if not texts:
+            return {}
+        matches = resolve_entities_batch(
+            texts, entity_type, frontmatter.region_id, entity_cache, value_type="name"
+        )
+        return dict(zip(texts, matches))
+
+    # Resolve all mentions of a type together so the fuzzy step runs as one
+    # multi-threaded RapidFuzz call instead of a scan per mention
+    # People may be teachers, students or parents; keep the best match
+    person_texts = texts_by_hint.get("person", [])
+    person_matches = dict(
+        zip(
+            person_texts,
+            resolve_entities_multi(
+                person_texts,
+                ["teacher", "student", "parent"],
+                frontmatter.region_id,
+                entity_cache,
+                value_type="name",
+            ),
+        )
+    )
+    subject_matches = resolve_batch(texts_by_hint.get("subject", []), "subject")
+    location_texts = texts_by_hint.get("location", [])
+    region_matches = resolve_batch(location_texts, "region")
+    # Schools are only tried for locations that did not resolve to a region
+    school_matches = resolve_batch(
+        [text for text in location_texts if not region_matches[text].entity_id], "school"
+    )
 
+    observation_targets = []
+    for entity_text, entity_type_hint in mentions:
         if not entity_text:
             continue
 
         # Map LLM entity type to our entity types
-        # For "person", we need to determine if it's teacher/student/parent
-        # We'll try all three and take the best match
         if entity_type_hint == "person":
-            # Try teacher, student, parent
-            best_match = None
-            best_score = 0.0
-
-            for entity_type in ["teacher", "student", "parent"]:
-                match = resolve_entity(
-                    source_value=entity_text,
-                    entity_type=entity_type,
-                    region_id=frontmatter.region_id,
-                    cache=entity_cache,
-                    value_type="name",
-                )
-
-                if match.similarity_score > best_score:
-                    best_score = match.similarity_score
-                    best_match = match
+            # Best match across teacher, student, parent
+            best_match = person_matches[entity_text]
 
             if best_match and best_match.entity_id:
                 target = ObservationTarget(
@@ -592,13 +895,7 @@ def process_free_form_text(
                 )
 
         elif entity_type_hint == "subject":
-            match = resolve_entity(
-                source_value=entity_text,
-                entity_type="subject",
-                region_id=frontmatter.region_id,
-                cache=entity_cache,
-                value_type="name",
-            )
+            match = subject_matches[entity_text]
 
             if match.entity_id:
                 target = ObservationTarget(
@@ -616,16 +913,10 @@ def process_free_form_text(
 
         elif entity_type_hint == "location":
             # Try region or school
-            for entity_type in ["region", "school"]:
-                match = resolve_entity(
-                    source_value=entity_text,
-                    entity_type=entity_type,
-                    region_id=frontmatter.region_id,
-                    cache=entity_cache,
-                    value_type="name",
-                )
+            for entity_type, matches in [("region", region_matches), ("school", school_matches)]:
+                match = matches.get(entity_text)
 
-                if match.entity_id:
+                if match is not None and match.entity_id:
                     target = ObservationTarget(
                         observation_id=frontmatter.file_id,
                         target_type=entity_type,
@@ -642,16 +933,9 @@ def process_free_form_text(
 
     logger.info(f"Created {len(observation_targets)} observation targets")
 
-    # Step 3: Compute sentiment score using LLM
-    sentiment_score = 0.0
+    # Step 3: Sentiment score was computed with the entities in step 1
     if settings.LLM_ENABLED:
-        try:
-            sentiment_score = llm_client.analyze_sentiment(text_content)
-            logger.info(f"Sentiment score: {sentiment_score:.3f}")
-        except Exception as e:
-            logger.warning(f"Sentiment analysis failed: {e}")
-    else:
-        logger.info("LLM disabled, skipping sentiment analysis")
+        logger.info(f"Sentiment score: {sentiment_score:.3f}")
 
     # Step 4: Create observation record with metadata
     # Convert audio duration from seconds to milliseconds if available
@@ -690,11 +974,15 @@ def process_free_form_text(
 
 
 
+import functools
+import multiprocessing
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import Literal
 
 from eduscale.tabular.classifier import classify_table
-from eduscale.tabular.concepts import load_concepts_catalog
+from eduscale.tabular.concepts import ConceptsCatalog, init_embeddings, load_concepts_catalog
 from eduscale.tabular.mapping import map_columns
 from eduscale.tabular.normalize import normalize_dataframe
 
@@ -760,8 +1048,9 @@ def process_tabular_text(
             if frontmatter is None:
                 raise ValueError("No frontmatter found in text content")
         else:
-            # Frontmatter already parsed, extract clean text
-            _, clean_text = parse_frontmatter(text_content)
+            # Frontmatter already parsed; only strip the block, skip the YAML load
+            parts = _split_frontmatter(text_content)
+            clean_text = parts[1].strip() if parts is not None else text_content
 
         logger.info(
             f"Starting ingestion pipeline: file_id={frontmatter.file_id}, "
@@ -826,6 +1115,53 @@ def process_tabular_text(
         )
 
 
+def process_tabular_texts(
+    text_contents: list[str],
+    max_workers: int | None = None,
+) -> list[IngestResult]:
+    """Run the ingestion pipeline over several independent files.
+
+    Large batches are spread over a process pool; each worker loads its own
+    embedding model once. Small batches run serially in this process, since
+    spawning workers and loading the model would cost more than it saves.
+
+    Args:
+        text_contents: Full text content of each file (including frontmatter)
+        max_workers: Worker processes (defaults to INGEST_MAX_WORKERS, then CPU count)
+
+    Returns:
+        IngestResult for each file, in input order
+    """
+    workers = max_workers or settings.INGEST_MAX_WORKERS or os.cpu_count() or 1
+    workers = min(workers, len(text_contents))
+    total_chars = sum(len(text) for text in text_contents)
+
+    if workers <= 1 or total_chars < settings.INGEST_PARALLEL_MIN_CHARS:
+        return [process_tabular_text(text) for text in text_contents]
+
+    logger.info(
+        f"Processing {len(text_contents)} files in parallel: "
+        f"workers={workers}, total_chars={total_chars}"
+    )
+
+    # Spawn rather than fork: forking after torch has started threads can deadlock
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_ingest_worker,
+    ) as executor:
+        return list(executor.map(process_tabular_text, text_contents))
+
+
+def _init_ingest_worker() -> None:
+    """Load the embedding model once per worker process."""
+    try:
+        init_embeddings()
+    except Exception as e:
+        # Leave the failure to the per-file pipeline, which reports it as FAILED
+        logger.error(f"Worker failed to preload embedding model: {e}")
+
+
 def _is_tabular_content_type(content_type: str) -> bool:
     """Determine if content type is tabular.
 
@@ -855,6 +1191,23 @@ def _is_tabular_content_type(content_type: str) -> bool:
     return False
 
 
+@functools.lru_cache(maxsize=4)
+def _cached_catalog(path: str, mtime: float) -> ConceptsCatalog:
+    """Load the concepts catalog once per (path, mtime).
+
+    The file's modification time is part of the cache key, so editing the
+    catalog takes effect on the next ingestion without a restart.
+
+    Args:
+        path: Path to concepts YAML file
+        mtime: Modification time of the file at path
+
+    Returns:
+        ConceptsCatalog with precomputed embeddings
+    """
+    return load_concepts_catalog(path)
+
+
 def _process_tabular_path(
     clean_text: str,
     frontmatter: FrontmatterData,
@@ -887,7 +1240,8 @@ def _process_tabular_path(
         logger.info(f"Loaded DataFrame: {len(df)} rows, {len(df.columns)} columns")
 
         # Step 2: Classify table type
-        catalog = load_concepts_catalog(settings.CONCEPT_CATALOG_PATH)
+        catalog_path = settings.CONCEPT_CATALOG_PATH
+        catalog = _cached_catalog(catalog_path, os.path.getmtime(catalog_path))
         table_type, confidence = classify_table(df, catalog)
         logger.info(f"Classified as {table_type} with confidence {confidence:.3f}")
 
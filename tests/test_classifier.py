@@ -5,7 +5,7 @@ import pandas as pd
 import pytest
 from unittest.mock import patch, MagicMock
 
-from eduscale.tabular.classifier import classify_table, _extract_features
+from eduscale.tabular.classifier import classify_table, _extract_features, _softmax_best
 from eduscale.tabular.concepts import load_concepts_catalog, ConceptsCatalog, TableType
 
 
@@ -132,3 +132,43 @@ def test_low_confidence_returns_free_form(catalog):
     # But confidence should be relatively low
     assert confidence >= 0.0
     assert table_type in ["ASSESSMENT", "ATTENDANCE", "FREE_FORM"]
+
+
+def test_catalog_table_type_matrix(catalog):
+    """Test that table type embeddings are stacked for batched similarity."""
+    assert catalog.table_type_names == ["ASSESSMENT", "ATTENDANCE"]
+    assert catalog.table_type_matrix.shape == (2, 1024)
+    assert catalog.table_type_matrix.dtype == np.float32
+    assert catalog.table_type_matrix.flags.c_contiguous
+    assert catalog.concept_matrix.dtype == np.float32
+    assert catalog.concept_matrix.flags.c_contiguous
+    # Per-object embeddings are views into the catalog matrices
+    assert np.shares_memory(catalog.table_types[0].embedding, catalog.table_type_matrix)
+    assert np.shares_memory(catalog.concepts[0].embedding, catalog.concept_matrix)
+
+
+def test_softmax_best():
+    """Test fused softmax returns calibrated probabilities and the first best index."""
+    best_index, best_score, probabilities = _softmax_best(np.array([0.2, 0.9, 0.9, 0.1]))
+
+    assert best_index == 1
+    assert abs(probabilities.sum() - 1.0) < 1e-9
+    assert best_score == probabilities[1]
+    assert probabilities[1] == probabilities[2]
+
+
+def test_classify_skips_feature_logging_when_info_disabled(catalog, caplog):
+    """Test contributing-feature logging is skipped above INFO level."""
+    df = pd.DataFrame({
+        "student_id": ["S001", "S002"],
+        "test_score": [85, 92],
+        "grade": ["B", "A"],
+    })
+
+    with caplog.at_level("WARNING", logger="eduscale.tabular.classifier"), patch(
+        "eduscale.tabular.classifier._log_contributing_features"
+    ) as mock_log:
+        table_type, _ = classify_table(df, catalog)
+
+    assert table_type == "ASSESSMENT"
+    mock_log.assert_not_called()
@@ -0,0 +1,106 @@
+"""Tests for clean layer Parquet writing."""
+
+import io
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from eduscale.core.config import settings
+from eduscale.tabular import clean_layer
+from eduscale.tabular.clean_layer import write_clean_parquet
+
+
+@pytest.fixture(autouse=True)
+def reset_gcs_client(monkeypatch):
+    """Ensure each test builds its own shared GCS client."""
+    monkeypatch.setattr(clean_layer, "_gcs_client", None)
+
+
+@pytest.fixture
+def sample_df():
+    """Small normalized DataFrame."""
+    return pd.DataFrame({
+        "student_id": ["S001", "S002", "S003"],
+        "test_score": [85.0, 92.0, 78.0],
+        "region_id": ["region-01"] * 3,
+    })
+
+
+def test_write_clean_parquet_local(tmp_path, sample_df):
+    """Test local writes produce a readable Parquet file."""
+    with patch.object(settings, "STORAGE_BACKEND", "local"), patch.object(
+        settings, "CLEAN_LAYER_BASE_PATH", str(tmp_path)
+    ):
+        location = write_clean_parquet(sample_df, "ASSESSMENT", "region-01", "file-1")
+
+    assert location.uri.endswith("clean/ASSESSMENT/region=region-01/file-1.parquet")
+    assert location.size_bytes > 0
+    pd.testing.assert_frame_equal(pd.read_parquet(location.uri), sample_df)
+
+
+def test_write_clean_parquet_gcs_uploads_from_memory(sample_df):
+    """Test GCS writes upload the serialized buffer without a temp file."""
+    uploaded = {}
+
+    def _upload(file_obj, rewind, size):
+        file_obj.seek(0)
+        uploaded["data"] = file_obj.read()
+        uploaded["size"] = size
+
+    mock_blob = MagicMock()
+    mock_blob.upload_from_file.side_effect = _upload
+
+    with patch.object(settings, "STORAGE_BACKEND", "gcs"), patch.object(
+        settings, "GCS_BUCKET_NAME", "test-bucket"
+    ), patch("google.cloud.storage.Client") as mock_client_class:
+        mock_client_class.return_value.bucket.return_value.blob.return_value = mock_blob
+        location = write_clean_parquet(sample_df, "ASSESSMENT", "region-01", "file-1")
+
+    mock_client_class.return_value.bucket.assert_called_with("test-bucket")
+    mock_client_class.return_value.bucket.return_value.blob.assert_called_with(
+        "clean/ASSESSMENT/region=region-01/file_id=file-1.parquet"
+    )
+    mock_blob.reload.assert_not_called()
+    assert location.size_bytes == uploaded["size"] == len(uploaded["data"])
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(uploaded["data"])), sample_df)
+
+
+def test_write_clean_parquet_gcs_reuses_client(sample_df):
+    """Test the GCS client is created once and shared across writes."""
+    with patch.object(settings, "STORAGE_BACKEND", "gcs"), patch.object(
+        settings, "GCS_BUCKET_NAME", "test-bucket"
+    ), patch("google.cloud.storage.Client") as mock_client_class:
+        write_clean_parquet(sample_df, "ASSESSMENT", "region-01", "file-1")
+        write_clean_parquet(sample_df, "ASSESSMENT", "region-01", "file-2")
+
+    mock_client_class.assert_called_once()
+    mock_client_class.return_value._http.mount.assert_called_once()
+
+
+def test_write_clean_parquet_empty_dataframe():
+    """Test empty DataFrames are skipped."""
+    location = write_clean_parquet(pd.DataFrame(), "ASSESSMENT", "region-01", "file-1")
+
+    assert location.uri == ""
+    assert location.size_bytes == 0
+
+
+def test_write_clean_parquet_dictionary_encodes_categorical_columns(tmp_path, sample_df):
+    """Test columns flagged as categorical are stored dictionary-typed."""
+    sample_df["grade"] = ["A", "B", "A"]
+    sample_df.attrs["categorical_columns"] = ["grade"]
+
+    with patch.object(settings, "STORAGE_BACKEND", "local"), patch.object(
+        settings, "CLEAN_LAYER_BASE_PATH", str(tmp_path)
+    ):
+        location = write_clean_parquet(sample_df, "ASSESSMENT", "region-01", "file-1")
+
+    schema = pq.read_schema(location.uri)
+    assert pa.types.is_dictionary(schema.field("grade").type)
+    assert pa.types.is_string(schema.field("student_id").type) or pa.types.is_large_string(
+        schema.field("student_id").type
+    )
+    assert pd.read_parquet(location.uri)["grade"].astype(str).tolist() == ["A", "B", "A"]
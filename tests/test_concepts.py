@@ -2,8 +2,9 @@
 
 import numpy as np
 import pytest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+from eduscale.tabular import concepts
 from eduscale.tabular.concepts import (
     Concept,
     ConceptsCatalog,
@@ -16,6 +17,14 @@ from eduscale.tabular.concepts import (
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_embedding_cache():
+    """Keep embeddings from mock models leaking between tests."""
+    concepts._EMBEDDING_CACHE.clear()
+    yield
+    concepts._EMBEDDING_CACHE.clear()
+
+
 @pytest.fixture
 def mock_sentence_transformer():
     """Mock SentenceTransformer to avoid downloading model."""
@@ -127,3 +136,103 @@ def test_model_caching(mock_sentence_transformer):
     # Check that embeddings were generated
     assert embeddings1.shape == (1, 768)
     assert embeddings2.shape == (1, 768)
+
+
+def test_embed_texts_cache_encodes_each_text_once(monkeypatch):
+    """Test repeated texts are served from the cache instead of the model."""
+    calls = []
+
+    def _encode(texts, **kwargs):
+        calls.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+    mock_model = type("MockModel", (), {"encode": lambda self, texts, **kw: _encode(texts)})()
+    monkeypatch.setattr(concepts, "_embedding_model", mock_model)
+
+    first = embed_texts(["a", "bb", "a"])
+    second = embed_texts(["bb", "ccc"])
+
+    assert calls == [["a", "bb"], ["ccc"]]
+    assert first[:, 0].tolist() == [1.0, 2.0, 1.0]
+    assert second[:, 0].tolist() == [2.0, 3.0]
+
+
+def test_embed_texts_cache_keyed_by_model(monkeypatch):
+    """Test rows cached under one model name are not served for another."""
+    mock_model = type("MockModel", (), {
+        "encode": lambda self, texts, **kwargs: np.ones((len(texts), 2), dtype=np.float32)
+    })()
+    monkeypatch.setattr(concepts, "_embedding_model", mock_model)
+
+    embed_texts(["a"])
+    monkeypatch.setattr(concepts.settings, "EMBEDDING_MODEL_NAME", "other-model")
+    mock_model.encode = lambda texts, **kwargs: np.zeros((len(texts), 2), dtype=np.float32)
+
+    assert embed_texts(["a"]).tolist() == [[0.0, 0.0]]
+
+
+@pytest.mark.parametrize("cuda_available, device, halved", [(False, "cpu", False), (True, "cuda", True)])
+def test_init_embeddings_selects_device(monkeypatch, cuda_available, device, halved):
+    """Test the model is placed on CUDA in fp16 when available, else on CPU."""
+    mock_model = MagicMock()
+    mock_cls = MagicMock(return_value=mock_model)
+    monkeypatch.setattr(concepts, "_embedding_model", None)
+    monkeypatch.setattr(concepts, "SentenceTransformer", mock_cls)
+    monkeypatch.setattr(concepts.torch.cuda, "is_available", lambda: cuda_available)
+    concepts._EMBEDDING_CACHE.put(b"stale", np.zeros(2, dtype=np.float32))
+
+    init_embeddings()
+
+    assert mock_cls.call_args.kwargs["device"] == device
+    assert mock_model.half.called is halved
+    assert concepts._embedding_model is mock_model
+    # Rows from the previous model are dropped on (re)load
+    assert concepts._EMBEDDING_CACHE.get(b"stale") is None
+
+
+def test_load_catalog_embeds_all_texts_in_one_call():
+    """Test catalog anchors and concepts are embedded with a single call."""
+    def _fake_embed(texts):
+        return np.eye(len(texts), 1024)
+
+    with patch("eduscale.tabular.concepts.embed_texts", side_effect=_fake_embed) as mock_embed:
+        catalog = load_concepts_catalog("tests/fixtures/concepts_test.yaml")
+
+    mock_embed.assert_called_once()
+    texts = mock_embed.call_args[0][0]
+    assert len(texts) == len(catalog.table_types) + len(catalog.concepts)
+    assert np.argmax(catalog.table_types[1].embedding) == 1
+    assert np.argmax(catalog.concepts[0].embedding) == len(catalog.table_types)
+
+
+def test_load_catalog_unknown_expected_type(tmp_path):
+    """Test a concept with an unknown expected_type loads and never matches a column type."""
+    catalog_file = tmp_path / "concepts.yaml"
+    catalog_file.write_text(
+        "table_types: []\n"
+        "concepts:\n"
+        "  - key: score\n"
+        "    description: Test score\n"
+        "    expected_type: numbr\n"
+        "    synonyms: [score]\n",
+        encoding="utf-8",
+    )
+
+    with patch(
+        "eduscale.tabular.concepts.embed_texts", side_effect=lambda texts: np.eye(len(texts), 8)
+    ):
+        catalog = load_concepts_catalog(catalog_file)
+
+    assert catalog.concept_type_codes.tolist() == [concepts.UNKNOWN_TYPE_CODE]
+
+
+def test_embed_texts_norm_check(monkeypatch):
+    """Test the debug norm check rejects embeddings that are not unit-norm."""
+    mock_model = type("MockModel", (), {
+        "encode": lambda self, texts, **kwargs: np.full((len(texts), 4), 1.0, dtype=np.float32)
+    })()
+    monkeypatch.setattr(concepts, "_embedding_model", mock_model)
+
+    with patch.object(concepts.settings, "EMBEDDING_CHECK_NORMS", True):
+        with pytest.raises(AssertionError):
+            embed_texts(["not normalized"])
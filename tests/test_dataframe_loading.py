@@ -1,12 +1,20 @@
 """Tests for DataFrame loading from text."""
 
+from unittest.mock import patch
+
 import pytest
 import pandas as pd
 
+from eduscale.core.config import settings
+
 from eduscale.tabular.pipeline import (
     FrontmatterData,
     load_dataframe_from_text,
     parse_frontmatter,
+    _auto_detect_and_load,
+    _load_csv_text,
+    _load_json_text,
+    _normalize_column_names,
     _to_snake_case,
 )
 
@@ -203,6 +211,26 @@ def test_to_snake_case():
     assert _to_snake_case("  Student  ID  ") == "student_id"
 
 
+@pytest.mark.parametrize("dtype", ["str", object])
+def test_normalize_column_names_matches_to_snake_case(dtype):
+    """Test vectorized column normalization agrees with _to_snake_case."""
+    names = [
+        "Student ID",
+        "StudentID",
+        "student-id",
+        "testScore",
+        "TEST__SCORE",
+        "  Student  ID  ",
+        "Student\xa0Name",
+        "school\u3000name",
+        "_-_",
+    ]
+
+    result = _normalize_column_names(pd.Index(names, dtype=dtype))
+
+    assert result.tolist() == [_to_snake_case(name) for name in names]
+
+
 def test_jsonl_format():
     """Test loading JSONL (line-delimited JSON)."""
     text_content = """{"student_id": "S001", "test_score": 85}
@@ -243,3 +271,105 @@ def test_jsonl_format():
     assert len(df) == 3
     assert "student_id" in df.columns
     assert "test_score" in df.columns
+
+
+def test_load_json_text_flattens_nested_objects():
+    """Test nested JSON objects are flattened into dotted columns."""
+    text_content = '[{"student_id": "S001", "scores": {"math": 85}}, {"student_id": "S002"}]'
+
+    df = _load_json_text(text_content)
+
+    assert df.columns.tolist() == ["student_id", "scores.math"]
+    assert df["scores.math"].iloc[0] == 85
+
+
+def test_load_json_text_accepts_nan_literals():
+    """Test NaN literals (accepted by the stdlib json module) still parse."""
+    text_content = '[{"student_id": "S001", "test_score": NaN}]'
+
+    df = _load_json_text(text_content)
+
+    assert len(df) == 1
+    assert pd.isna(df["test_score"].iloc[0])
+
+
+def test_load_json_text_jsonl_skips_invalid_lines():
+    """Test JSONL loading skips blank and invalid lines."""
+    text_content = '{"student_id": "S001"}\n\nnot json\n{"student_id": "S002"}\n'
+
+    df = _load_json_text(text_content)
+
+    assert df["student_id"].tolist() == ["S001", "S002"]
+
+
+def test_load_csv_text_falls_back_to_python_engine():
+    """Test CSV the C parser rejects is retried with the python engine."""
+    # Unterminated quote: the C tokenizer raises, the python engine recovers
+    df = _load_csv_text('a,b\n1,"x\n2,3\n')
+
+    assert df.columns.tolist() == ["a", "b"]
+
+
+def test_load_csv_text_arrow_matches_pandas():
+    """Test the pyarrow CSV path returns the same frame as pandas."""
+    text_content = (
+        "student_id,name,score,passed,date,note\n"
+        'S001,"Novak, Jan",85,True,2025-01-10,NA\n'
+        'S002,Petra,,False,2025-01-11,"two\nlines"\n'
+        "S003,Eva,92.5,,2025-01-12,\n"
+    )
+
+    with patch.object(settings, "INGEST_ARROW_CSV_MIN_CHARS", 0):
+        expected = _load_csv_text(text_content)
+    with patch.object(settings, "INGEST_ARROW_CSV_MIN_CHARS", 1):
+        with patch("eduscale.tabular.pipeline.pd.read_csv") as mock_read_csv:
+            result = _load_csv_text(text_content)
+
+    mock_read_csv.assert_not_called()
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_load_csv_text_arrow_short_rows_fall_back_to_pandas():
+    """Test rows with missing fields are padded like pandas does."""
+    text_content = "a,b,c\n1,2,3\n4,5\n"
+
+    with patch.object(settings, "INGEST_ARROW_CSV_MIN_CHARS", 1):
+        df = _load_csv_text(text_content)
+
+    assert len(df) == 2
+    assert pd.isna(df["c"].iloc[1])
+
+
+def test_auto_detect_sniffs_separator_and_parses_once():
+    """Test auto-detection picks the separator without trial parses."""
+    text_content = "student_id;test_score\nS001;85\nS002;92\n"
+
+    with patch(
+        "eduscale.tabular.pipeline._load_csv_text", wraps=_load_csv_text
+    ) as mock_load_csv:
+        df = _auto_detect_and_load(text_content)
+
+    mock_load_csv.assert_called_once_with(text_content, sep=";")
+    assert df.columns.tolist() == ["student_id", "test_score"]
+    assert len(df) == 2
+
+
+def test_auto_detect_ragged_csv_falls_back_to_trial_separators():
+    """Test CSVs with short rows still load when the sniffer cannot decide."""
+    text_content = "name,score,comment\nAlice,90\nBob,85,good\nEva,70\n"
+
+    df = _auto_detect_and_load(text_content)
+
+    assert df.columns.tolist() == ["name", "score", "comment"]
+    assert df.shape == (3, 3)
+    assert df["comment"].iloc[1] == "good"
+
+
+def test_load_csv_text_stops_after_row_limit():
+    """Test the pandas CSV reader stops one row past INGEST_MAX_ROWS."""
+    text_content = "student_id\n" + "\n".join(f"S{i:03d}" for i in range(10))
+
+    with patch.object(settings, "INGEST_MAX_ROWS", 3):
+        df = _load_csv_text(text_content)
+
+    assert len(df) == 4
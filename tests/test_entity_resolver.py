@@ -1,5 +1,7 @@
 """Tests for entity resolution."""
 
+from unittest.mock import patch
+
 import numpy as np
 import pytest
 
@@ -8,8 +10,11 @@ from eduscale.tabular.analysis.entity_resolver import (
     EntityMatch,
     normalize_name,
     expand_initials,
+    resolve_entities_batch,
+    resolve_entities_multi,
     resolve_entity,
     create_new_entity,
+    cosine_scores,
 )
 
 
@@ -232,3 +237,203 @@ def test_entity_cache_structure():
     # Test adding data
     cache.teachers["test"] = "id-123"
     assert cache.teachers["test"] == "id-123"
+
+
+def test_resolve_entity_embedding_match():
+    """Test embedding matching picks the most similar cached entity."""
+    cache = EntityCache()
+    cache.teacher_embeddings = {
+        "teacher-a": np.array([1.0, 0.0, 0.0]),
+        "teacher-b": np.array([0.0, 2.0, 0.0]),
+    }
+    cache.entity_names = {"teacher-a": "Анна", "teacher-b": "Борис"}
+
+    with patch(
+        "eduscale.tabular.analysis.entity_resolver.embed_texts",
+        return_value=np.array([[0.1, 3.0, 0.0]]),
+    ):
+        match = resolve_entity(
+            source_value="Совсем другое",
+            entity_type="teacher",
+            region_id="region-01",
+            cache=cache,
+        )
+
+    assert match.match_method == "EMBEDDING"
+    assert match.entity_id == "teacher-b"
+    assert match.similarity_score == pytest.approx(3.0 / np.sqrt(9.01))
+
+    # Matrix is rebuilt when the embedding dict grows
+    cache.teacher_embeddings["teacher-c"] = np.array([0.0, 0.0, 1.0])
+    entity_ids, matrix = cache.embedding_matrix("teacher")
+    assert entity_ids == ["teacher-a", "teacher-b", "teacher-c"]
+    assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0)
+    assert matrix.dtype == np.float32  # float64 inputs are stored at half size
+
+
+def test_cosine_scores_keeps_matrix_dtype():
+    """Test cosine scores normalize the query and stay in the matrix dtype."""
+    matrix = np.array([[1.0, 0.0], [0.6, 0.8]], dtype=np.float32)
+
+    scores = cosine_scores(matrix, np.array([10.0, 0.0]))
+
+    assert scores.dtype == np.float32
+    assert np.allclose(scores, [1.0, 0.6])
+
+
+def test_all_embeddings_stacks_entity_types():
+    """Test embeddings of all types are stacked with parallel type/id lists."""
+    cache = EntityCache()
+    cache.teacher_embeddings = {"teacher-a": np.array([1.0, 0.0])}
+    cache.subject_embeddings = {
+        "subject-a": np.array([0.0, 2.0]),
+        "subject-b": np.array([1.0, 1.0]),
+    }
+
+    entity_types, entity_ids, matrix = cache.all_embeddings()
+
+    assert entity_types == ["teacher", "subject", "subject"]
+    assert entity_ids == ["teacher-a", "subject-a", "subject-b"]
+    assert matrix.shape == (3, 2)
+    assert cache.all_embeddings()[2] is matrix  # cached until a type changes
+
+    cache.school_embeddings = {"school-a": np.array([0.0, 1.0])}
+    assert cache.all_embeddings()[1][-1] == "school-a"
+
+
+def test_fuzzy_match_picks_closest_name():
+    """Test fuzzy matching returns the closest name and its Levenshtein similarity."""
+    cache = EntityCache()
+    cache.teachers = {
+        "анна петрова": "teacher-far",
+        "иван петрович": "teacher-close",
+        "иван петров": "teacher-closer",
+    }
+
+    match = resolve_entity(
+        source_value="Иван Петрову",
+        entity_type="teacher",
+        region_id="region-01",
+        cache=cache,
+    )
+
+    assert match.entity_id == "teacher-closer"
+    assert match.similarity_score == pytest.approx(1 - 1 / 12)
+
+
+def test_fuzzy_match_length_buckets_keep_reachable_names():
+    """Test length pruning keeps every name that can reach the threshold."""
+    cache = EntityCache()
+    cache.teachers = {"иван петров": "teacher-123", "ив": "teacher-short"}
+
+    buckets = cache.name_buckets("teacher")
+    assert buckets == {11: ["иван петров"], 2: ["ив"]}
+
+    # Deletion of one char from an 11-char name: 1 - 1/11 ~= 0.909
+    match = resolve_entity(
+        source_value="Иван Петрв",
+        entity_type="teacher",
+        region_id="region-01",
+        cache=cache,
+        threshold_fuzzy=0.9,
+    )
+    assert match.entity_id == "teacher-123"
+    assert match.similarity_score == pytest.approx(1 - 1 / 11)
+
+
+def test_name_helpers_are_memoized():
+    """Test repeated names are served from cache without sharing mutable results."""
+    normalize_name.cache_clear()
+    normalize_name("Мария Иванова")
+    normalize_name("Мария Иванова")
+    assert normalize_name.cache_info().hits == 1
+
+    first = expand_initials("М. Иванова", "region-01")
+    first.append("mutated")
+    assert "mutated" not in expand_initials("М. Иванова", "region-01")
+
+
+def test_cosine_scores_rejects_unnormalized_matrix():
+    """Test the unit-norm invariant is checked in debug runs."""
+    with pytest.raises(AssertionError):
+        cosine_scores(np.array([[3.0, 4.0]]), np.array([1.0, 0.0]))
+
+
+def test_entity_cache_invalidate_rebuilds_derived_structures():
+    """Test in-place edits are picked up after invalidate()."""
+    cache = EntityCache()
+    cache.teachers = {"иван петров": "teacher-123"}
+    cache.teacher_embeddings = {"teacher-123": np.array([1.0, 0.0])}
+    cache.build_indexes()
+
+    cache.teacher_embeddings["teacher-123"] = np.array([0.0, 5.0])
+    cache.teachers.pop("иван петров")
+    cache.teachers["анна смирнова"] = "teacher-123"
+    cache.invalidate()
+
+    _, matrix = cache.embedding_matrix("teacher")
+    assert np.allclose(matrix, [[0.0, 1.0]])
+    assert cache.name_buckets("teacher") == {13: ["анна смирнова"]}
+
+
+def test_resolve_entity_is_memoized_per_cache_state():
+    """Test repeated resolutions reuse the match until the cache changes."""
+    cache = EntityCache()
+    cache.teachers["иван петров"] = "teacher-123"
+
+    first = resolve_entity("Иван Петрв", "teacher", "region-01", cache, threshold_fuzzy=0.8)
+    second = resolve_entity("Иван Петрв", "teacher", "region-01", cache, threshold_fuzzy=0.8)
+    assert second is first
+
+    cache.teachers["иван петрв"] = "teacher-456"
+    third = resolve_entity("Иван Петрв", "teacher", "region-01", cache, threshold_fuzzy=0.8)
+    assert third.entity_id == "teacher-456"
+    assert third.match_method == "NAME_EXACT"
+
+
+def test_resolve_entities_batch_matches_single_resolution():
+    """Test batch resolution gives the same matches as resolve_entity."""
+    values = ["Иван Петрв", "Мария Сидорова", "Совсем Другое Имя", "", "Иван Петрв"]
+
+    def make_cache():
+        cache = EntityCache()
+        cache.teachers = {
+            "иван петров": "teacher-123",
+            "мария сидорова": "teacher-456",
+            "анна смирнова": "teacher-789",
+        }
+        return cache
+
+    batch_cache = make_cache()
+    batch = resolve_entities_batch(values, "teacher", "region-01", batch_cache, threshold_fuzzy=0.8)
+    single_cache = make_cache()
+    single = [
+        resolve_entity(v, "teacher", "region-01", single_cache, threshold_fuzzy=0.8) for v in values
+    ]
+
+    assert batch == single
+    assert [m.match_method for m in batch] == ["FUZZY", "NAME_EXACT", "NEW", "NEW", "FUZZY"]
+
+
+def test_resolve_entities_multi_picks_best_type():
+    """Test multi-type resolution keeps the best match and skips settled values."""
+    cache = EntityCache()
+    cache.teachers = {"иван петров": "teacher-123"}
+    cache.students = {"иван петрв": "student-456"}
+    values = ["Иван Петров", "Иван Петрв", "Совсем Другое Имя"]
+
+    with patch(
+        "eduscale.tabular.analysis.entity_resolver.resolve_entities_batch",
+        wraps=resolve_entities_batch,
+    ) as mock_batch:
+        matches = resolve_entities_multi(
+            values, ["teacher", "student", "parent"], "region-01", cache, threshold_fuzzy=0.8
+        )
+
+    assert [m.entity_id if m else None for m in matches] == ["teacher-123", "student-456", None]
+    # Exact matches are not re-resolved against later types
+    assert [call.args[0] for call in mock_batch.call_args_list] == [
+        values,
+        ["Иван Петрв", "Совсем Другое Имя"],
+        ["Совсем Другое Имя"],
+    ]
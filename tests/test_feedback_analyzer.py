@@ -6,9 +6,11 @@ import numpy as np
 import pandas as pd
 import pytest
 
+from eduscale.core.config import settings
 from eduscale.tabular.analysis.entity_resolver import EntityCache
 from eduscale.tabular.analysis.feedback_analyzer import (
     FeedbackTarget,
+    _select_top_targets,
     analyze_feedback_batch,
 )
 from eduscale.tabular.pipeline import FrontmatterData
@@ -115,7 +117,7 @@ def test_analyze_feedback_batch_basic(mock_embed_texts, sample_frontmatter, samp
     The batch function processes multiple feedback records at once for efficiency.
     """
     # Mock embedding function to return random embeddings (1024-dim for BGE-M3)
-    mock_embed_texts.return_value = np.random.rand(1, 1024)
+    mock_embed_texts.side_effect = lambda texts: np.random.rand(len(texts), 1024)
     
     df_feedback = pd.DataFrame(
         {
@@ -183,7 +185,7 @@ def test_analyze_feedback_batch_with_embeddings(mock_embed_texts, sample_frontma
     has precomputed embeddings for entities.
     """
     # Mock embedding function to return consistent embeddings
-    mock_embed_texts.return_value = np.random.rand(1, 1024)
+    mock_embed_texts.side_effect = lambda texts: np.random.rand(len(texts), 1024)
     
     # Create cache with embeddings
     cache = EntityCache()
@@ -213,6 +215,75 @@ def test_analyze_feedback_batch_with_embeddings(mock_embed_texts, sample_frontma
     assert isinstance(targets, list)
 
 
+@patch("eduscale.tabular.analysis.feedback_analyzer.embed_texts")
+def test_analyze_feedback_batch_embedding_targets(mock_embed_texts, sample_frontmatter):
+    """Test embedding matching emits targets above the similarity threshold."""
+    mock_embed_texts.return_value = np.array([[2.0, 0.0, 0.0]])
+
+    cache = EntityCache()
+    cache.teacher_embeddings = {
+        "teacher-uuid-123": np.array([3.0, 0.0, 0.0]),
+        "teacher-uuid-456": np.array([0.0, 1.0, 0.0]),
+    }
+    cache.subject_embeddings = {"subject-uuid-111": np.array([1.0, 1.0, 0.0])}
+
+    df_feedback = pd.DataFrame(
+        {"feedback_id": ["fb-001"], "feedback_text": ["Учитель Петрова молодец."]}
+    )
+
+    with patch.object(settings, "LLM_ENABLED", False), patch.object(
+        settings, "FEEDBACK_TARGET_THRESHOLD", 0.65
+    ):
+        targets = analyze_feedback_batch(
+            df_feedback=df_feedback,
+            region_id="region-cz-01",
+            frontmatter=sample_frontmatter,
+            entity_cache=cache,
+        )
+
+    by_id = {target.target_id: target for target in targets}
+    assert set(by_id) == {"teacher-uuid-123", "subject-uuid-111"}
+    assert by_id["teacher-uuid-123"].relevance_score == pytest.approx(1.0)
+    assert by_id["teacher-uuid-123"].confidence == "HIGH"
+    assert by_id["subject-uuid-111"].relevance_score == pytest.approx(np.sqrt(0.5))
+    assert by_id["subject-uuid-111"].target_type == "subject"
+
+
+@patch("eduscale.tabular.analysis.feedback_analyzer.embed_texts")
+def test_analyze_feedback_batch_embeds_texts_once(mock_embed_texts, sample_frontmatter):
+    """Test feedback texts are embedded in a single batch call."""
+    mock_embed_texts.side_effect = lambda texts: np.array(
+        [[1.0, 0.0] if "Петрова" in text else [0.0, 1.0] for text in texts]
+    )
+
+    cache = EntityCache()
+    cache.teacher_embeddings = {"teacher-uuid-123": np.array([1.0, 0.0])}
+    cache.student_embeddings = {"student-uuid-789": np.array([0.0, 1.0])}
+
+    df_feedback = pd.DataFrame(
+        {
+            "feedback_id": ["fb-001", "fb-002", "fb-003", "fb-004"],
+            "feedback_text": ["Петрова молодец.", None, "Новак старается.", "Петрова молодец."],
+        }
+    )
+
+    with patch.object(settings, "LLM_ENABLED", False):
+        targets = analyze_feedback_batch(
+            df_feedback=df_feedback,
+            region_id="region-cz-01",
+            frontmatter=sample_frontmatter,
+            entity_cache=cache,
+        )
+
+    # One call, with duplicate texts embedded once
+    mock_embed_texts.assert_called_once_with(["Петрова молодец.", "Новак старается."])
+    assert [(t.feedback_id, t.target_id) for t in targets] == [
+        ("fb-001", "teacher-uuid-123"),
+        ("fb-003", "student-uuid-789"),
+        ("fb-004", "teacher-uuid-123"),
+    ]
+
+
 def test_feedback_target_dataclass():
     """Test FeedbackTarget dataclass."""
     target = FeedbackTarget(
@@ -228,3 +299,94 @@ def test_feedback_target_dataclass():
     assert target.target_id == "teacher-uuid-123"
     assert target.relevance_score == 0.85
     assert target.confidence == "HIGH"
+
+
+@patch("eduscale.tabular.analysis.feedback_analyzer.embed_texts")
+def test_analyze_feedback_batch_caps_embedding_targets(mock_embed_texts, sample_frontmatter):
+    """Test only the top-N embedding matches above threshold are kept."""
+    mock_embed_texts.side_effect = lambda texts: np.tile([1.0, 0.0], (len(texts), 1))
+
+    cache = EntityCache()
+    cache.teacher_embeddings = {
+        "teacher-a": np.array([1.0, 0.1]),
+        "teacher-b": np.array([1.0, 0.5]),
+        "teacher-c": np.array([1.0, 0.0]),
+        "teacher-d": np.array([1.0, 0.3]),
+        "teacher-e": np.array([0.0, 1.0]),
+    }
+
+    df_feedback = pd.DataFrame({"feedback_id": ["fb-001"], "feedback_text": ["Текст"]})
+
+    with patch.object(settings, "LLM_ENABLED", False), patch.object(
+        settings, "MAX_TARGETS_PER_FEEDBACK", 3
+    ):
+        targets = analyze_feedback_batch(
+            df_feedback=df_feedback,
+            region_id="region-cz-01",
+            frontmatter=sample_frontmatter,
+            entity_cache=cache,
+        )
+
+    assert [t.target_id for t in targets] == ["teacher-c", "teacher-a", "teacher-d"]
+
+
+@patch("eduscale.tabular.analysis.feedback_analyzer._embedding_based_matching")
+@patch("eduscale.tabular.analysis.feedback_analyzer.LLMClient")
+def test_analyze_feedback_batch_skips_embeddings_when_llm_fills_quota(
+    mock_llm_client, mock_embedding_matching, sample_frontmatter, sample_entity_cache
+):
+    """Test embedding matching is skipped once LLM targets fill the quota."""
+    mock_llm_client.return_value.extract_entities_many.return_value = [
+        [{"text": "Петрова", "type": "person"}],
+    ]
+
+    df_feedback = pd.DataFrame(
+        {"feedback_id": ["fb-001"], "feedback_text": ["Учитель Петрова молодец."]}
+    )
+
+    with patch.object(settings, "LLM_ENABLED", True), patch.object(
+        settings, "MAX_TARGETS_PER_FEEDBACK", 1
+    ), patch(
+        "eduscale.tabular.analysis.feedback_analyzer.embed_texts",
+        side_effect=lambda texts: np.ones((len(texts), 2)),
+    ):
+        targets = analyze_feedback_batch(
+            df_feedback=df_feedback,
+            region_id="region-cz-01",
+            frontmatter=sample_frontmatter,
+            entity_cache=sample_entity_cache,
+        )
+
+    assert [(t.target_id, t.confidence) for t in targets] == [("teacher-uuid-123", "HIGH")]
+    mock_embedding_matching.assert_not_called()
+
+
+@patch("eduscale.tabular.analysis.feedback_analyzer.embed_texts")
+def test_analyze_feedback_batch_skips_embedding_without_entity_embeddings(
+    mock_embed_texts, sample_frontmatter, sample_entity_cache
+):
+    """Test the embedding model is not invoked when no entity embeddings are loaded."""
+    df_feedback = pd.DataFrame({"feedback_id": ["fb-001"], "feedback_text": ["Текст отзыва"]})
+
+    with patch.object(settings, "LLM_ENABLED", False):
+        targets = analyze_feedback_batch(
+            df_feedback=df_feedback,
+            region_id="region-cz-01",
+            frontmatter=sample_frontmatter,
+            entity_cache=sample_entity_cache,
+        )
+
+    assert targets == []
+    mock_embed_texts.assert_not_called()
+
+
+def test_select_top_targets_orders_by_score():
+    """Test top-N selection returns the highest scores, ties in input order."""
+    targets = [
+        FeedbackTarget("fb-001", "teacher", f"t-{i}", score, "HIGH")
+        for i, score in enumerate([0.7, 0.9, 0.8, 0.9, 0.6])
+    ]
+
+    top = _select_top_targets(targets, max_targets=3)
+
+    assert [t.target_id for t in top] == ["t-1", "t-3", "t-2"]
@@ -1,10 +1,18 @@
 """Tests for free-form text processing."""
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
 import pytest
 
+from eduscale.core.config import settings
 from eduscale.tabular.analysis.entity_resolver import EntityCache
+from eduscale.tabular import pipeline
+from eduscale.tabular.analysis import entity_resolver
 from eduscale.tabular.pipeline import (
     FrontmatterData,
+    _get_llm_client,
     process_free_form_text,
 )
 
@@ -98,6 +106,84 @@ def test_process_free_form_text_with_entities(sample_frontmatter):
     assert isinstance(targets, list)
 
 
+def test_process_free_form_text_resolves_repeated_mentions_once(sample_frontmatter):
+    """Test repeated mentions are resolved once and yield a single target."""
+    entity_cache = EntityCache()
+    entity_cache.subjects = {"математика": "subject-uuid-456"}
+    entity_cache.entity_names = {"subject-uuid-456": "Математика"}
+    mention = {"text": "математика", "type": "subject"}
+    llm_client = MagicMock()
+    llm_client.analyze.return_value = {"entities": [mention, dict(mention)], "sentiment": 0.5}
+
+    with (
+        patch.object(settings, "LLM_ENABLED", True),
+        patch("eduscale.tabular.pipeline._get_llm_client", return_value=llm_client),
+        patch(
+            "eduscale.tabular.pipeline.resolve_entities_batch",
+            wraps=pipeline.resolve_entities_batch,
+        ) as mock_resolve,
+    ):
+        observation, targets = process_free_form_text(
+            text_content="Математика, математика.",
+            frontmatter=sample_frontmatter,
+            entity_cache=entity_cache,
+        )
+
+    mock_resolve.assert_called_once()
+    assert mock_resolve.call_args.args[:2] == (["математика"], "subject")
+    assert [target.target_id for target in targets] == ["subject-uuid-456"]
+    assert len(observation.detected_entities) == 2
+
+
+def test_process_free_form_text_batches_mentions_by_type(sample_frontmatter):
+    """Test mentions are resolved with one batched call per entity type."""
+    entity_cache = EntityCache()
+    entity_cache.teachers = {"петрова": "teacher-uuid-123"}
+    entity_cache.subjects = {"математика": "subject-uuid-456"}
+    entity_cache.entity_names = {
+        "teacher-uuid-123": "Петрова",
+        "subject-uuid-456": "Математика",
+    }
+    llm_client = MagicMock()
+    llm_client.analyze.return_value = {
+        "entities": [
+            {"text": "Петрова", "type": "person"},
+            {"text": "математика", "type": "subject"},
+            {"text": "Новак", "type": "person"},
+        ],
+        "sentiment": 0.5,
+    }
+
+    mock_resolve = MagicMock(wraps=entity_resolver.resolve_entities_batch)
+
+    with (
+        patch.object(settings, "LLM_ENABLED", True),
+        patch("eduscale.tabular.pipeline._get_llm_client", return_value=llm_client),
+        patch("eduscale.tabular.pipeline.resolve_entities_batch", mock_resolve),
+        patch(
+            "eduscale.tabular.analysis.entity_resolver.resolve_entities_batch", mock_resolve
+        ),
+    ):
+        _, targets = process_free_form_text(
+            text_content="Петрова učí matematiku, Novak taky.",
+            frontmatter=sample_frontmatter,
+            entity_cache=entity_cache,
+        )
+
+    calls = [call.args[:2] for call in mock_resolve.call_args_list]
+    # The exact teacher match for Петрова is not retried as student/parent
+    assert calls == [
+        (["Петрова", "Новак"], "teacher"),
+        (["Новак"], "student"),
+        (["Новак"], "parent"),
+        (["математика"], "subject"),
+    ]
+    assert [(target.target_type, target.target_id) for target in targets] == [
+        ("teacher", "teacher-uuid-123"),
+        ("subject", "subject-uuid-456"),
+    ]
+
+
 def test_process_free_form_text_empty_text(sample_frontmatter, empty_entity_cache):
     """Test free-form text processing with empty text."""
     text_content = ""
@@ -160,3 +246,24 @@ def test_process_free_form_text_audio_metadata(empty_entity_cache):
     assert observation.audio_duration_ms == 123450  # 123.45s * 1000
     assert observation.audio_confidence == 0.95
     assert observation.audio_language == "en-US"
+
+
+def test_get_llm_client_reused_per_thread():
+    """Test the LLM client is reused within a thread but not shared across threads."""
+
+    def make_client():
+        return MagicMock(
+            model_name=settings.FEATHERLESS_LLM_MODEL, enabled=settings.LLM_ENABLED
+        )
+
+    with patch("eduscale.tabular.pipeline.LLMClient", side_effect=make_client) as mock_cls, patch(
+        "eduscale.tabular.pipeline._llm_clients", threading.local()
+    ):
+        client = _get_llm_client()
+
+        assert _get_llm_client() is client
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(_get_llm_client).result()
+
+    assert other is not client
+    assert mock_cls.call_count == 2
@@ -0,0 +1,695 @@
+"""Tests for the Featherless.ai LLM client."""
+
+import asyncio
+import gzip
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import numpy as np
+import openai
+import pandas as pd
+import pytest
+from tenacity import wait_none
+
+from eduscale.core.config import settings
+from eduscale.tabular.analysis import llm_client as llm_client_module
+from eduscale.tabular.analysis.llm_client import (
+    MAX_INPUT_CHARS,
+    LLMClient,
+    _ResponseCache,
+    _split_windows,
+    _TokenBucket,
+)
+
+
+@pytest.fixture
+def llm_client():
+    """LLM client with the API enabled (no network calls are made in tests)."""
+    llm_client_module._RESPONSE_CACHE.clear()
+    llm_client_module._get_openai_client.cache_clear()
+    with patch.object(settings, "LLM_ENABLED", True), patch.object(
+        settings, "FEATHERLESS_API_KEY", "test-key"
+    ):
+        yield LLMClient()
+    llm_client_module._RESPONSE_CACHE.clear()
+    llm_client_module._get_openai_client.cache_clear()
+
+
+def _completion(content: str) -> SimpleNamespace:
+    """Minimal chat completion response object."""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _json_completion(content: str) -> dict:
+    """Chat completion response body as returned by the Batch API."""
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+def _entity_response(prompt: str) -> str:
+    """Fake LLM response echoing the text embedded in an extraction prompt."""
+    text = prompt.split("Text: ", 1)[1].split("\n", 1)[0]
+    return f'[{{"text": "{text}", "type": "person"}}]'
+
+
+@pytest.mark.asyncio
+async def test_batch_extract_entities_preserves_order_and_limits_concurrency(llm_client):
+    """Test results come back in input order with at most `concurrency` calls in flight."""
+    in_flight = 0
+    peak = 0
+
+    async def fake_acall(prompt, max_tokens=500, response_format=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _entity_response(prompt)
+
+    texts = [f"Teacher {i}" for i in range(10)]
+    with patch.object(llm_client, "_acall_llm", side_effect=fake_acall):
+        results = await llm_client.batch_extract_entities(texts, concurrency=3)
+
+    assert [r[0]["text"] for r in results] == texts
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_extract_entities_isolates_failures(llm_client):
+    """Test a failed request yields an empty list without affecting the others."""
+
+    async def fake_acall(prompt, max_tokens=500, response_format=None):
+        if "bad" in prompt:
+            raise RuntimeError("boom")
+        return _entity_response(prompt)
+
+    with patch.object(llm_client, "_acall_llm", side_effect=fake_acall):
+        results = await llm_client.batch_extract_entities(["good", "bad", "fine"])
+
+    assert results == [
+        [{"text": "good", "type": "person"}],
+        [],
+        [{"text": "fine", "type": "person"}],
+    ]
+
+
+def test_extract_entities_many_sync(llm_client):
+    """Test the sync wrapper runs the async batch from plain code."""
+
+    async def fake_acall(prompt, max_tokens=500, response_format=None):
+        return _entity_response(prompt)
+
+    with patch.object(llm_client, "_acall_llm", side_effect=fake_acall):
+        results = llm_client.extract_entities_many(["Anna", "", "Petr"])
+
+    assert results == [
+        [{"text": "Anna", "type": "person"}],
+        [],
+        [{"text": "Petr", "type": "person"}],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_extract_entities_many_inside_running_loop(llm_client):
+    """Test the sync wrapper also works when called from within an event loop."""
+
+    async def fake_acall(prompt, max_tokens=500, response_format=None):
+        return _entity_response(prompt)
+
+    with patch.object(llm_client, "_acall_llm", side_effect=fake_acall):
+        results = llm_client.extract_entities_many(["Anna"])
+
+    assert results == [[{"text": "Anna", "type": "person"}]]
+
+
+def test_extract_entities_many_disabled():
+    """Test the sync wrapper returns empty lists when the LLM is disabled."""
+    with patch.object(settings, "LLM_ENABLED", False):
+        client = LLMClient()
+
+    assert client.extract_entities_many(["a", "b"]) == [[], []]
+
+
+@pytest.mark.asyncio
+async def test_aanalyze_sentiment_clamps_score(llm_client):
+    """Test async sentiment parses and clamps the score."""
+
+    async def fake_acall(prompt, max_tokens=500, response_format=None):
+        return " 1.7 "
+
+    with patch.object(llm_client, "_acall_llm", side_effect=fake_acall):
+        assert await llm_client.aanalyze_sentiment("Great teacher") == 1.0
+
+
+def test_clients_share_http_connection_pool(llm_client):
+    """Test separate LLMClient instances reuse one pooled HTTP client."""
+    with patch.object(settings, "LLM_ENABLED", True), patch.object(
+        settings, "FEATHERLESS_API_KEY", "test-key"
+    ):
+        other = LLMClient()
+
+    assert llm_client._client._client is other._client._client
+
+
+def test_clients_reuse_openai_client(llm_client):
+    """Test the OpenAI client is built once per endpoint and reused."""
+    with patch.object(settings, "LLM_ENABLED", True), patch.object(
+        settings, "FEATHERLESS_API_KEY", "test-key"
+    ):
+        other = LLMClient(model="other-model")
+
+    assert other._client is llm_client._client
+    assert other.model_name == "other-model"
+
+
+@pytest.mark.asyncio
+async def test_batch_extract_entities_packs_rows_per_call(llm_client):
+    """Test texts are packed into numbered prompts and re-aligned by index."""
+    prompts = []
+
+    async def fake_acall(prompt, max_tokens=500, response_format=None):
+        prompts.append((prompt, max_tokens))
+        # Answer out of order to check re-alignment by index
+        return (
+            '[{"index": 2, "entities": [{"text": "Petr", "type": "person"}]},'
+            ' {"index": 1, "entities": [{"text": "Anna", "type": "person"}]}]'
+        )
+
+    with patch.object(llm_client, "_acall_llm", side_effect=fake_acall):
+        results = await llm_client.batch_extract_entities(
+            ["Anna\nteaches", "Petr", "Anna", "Petr"], rows_per_call=2
+        )
+
+    assert len(prompts) == 2
+    assert "1. Anna teaches\n2. Petr" in prompts[0][0]
+    assert prompts[0][1] == 400
+    assert [r[0]["text"] for r in results] == ["Anna", "Petr", "Anna", "Petr"]
+
+
+@pytest.mark.asyncio
+async def test_batch_extract_entities_packed_falls_back_per_row(llm_client):
+    """Test rows missing from a packed response are retried individually."""
+
+    async def fake_acall(prompt, max_tokens=500, response_format=None):
+        if "Texts:" in prompt:
+            return '[{"index": 1, "entities": []}]'
+        return _entity_response(prompt)
+
+    with patch.object(llm_client, "_acall_llm", side_effect=fake_acall):
+        results = await llm_client.batch_extract_entities(["Anna", "Petr"], rows_per_call=2)
+
+    assert results == [[], [{"text": "Petr", "type": "person"}]]
+
+
+def test_parse_json_response_salvages_truncated_array(llm_client):
+    """Test complete objects are recovered from a truncated response."""
+    response = (
+        '[{"text": "Anna {Nováková}", "type": "person"}, '
+        '{"text": "Math \\"A\\"", "type": "subject"}, '
+        '{"broken": true}, '
+        '{"text": "Pra'
+    )
+
+    assert llm_client._parse_json_response(response) == [
+        {"text": "Anna {Nováková}", "type": "person"},
+        {"text": 'Math "A"', "type": "subject"},
+    ]
+
+
+def test_parse_json_response_unparseable(llm_client):
+    """Test responses without any complete entity yield an empty list."""
+    assert llm_client._parse_json_response("Sorry, I cannot help with that.") == []
+
+
+def test_call_llm_caches_identical_requests(llm_client):
+    """Test identical prompts are served from the response cache."""
+    create = MagicMock(return_value=_completion('[{"text": "Anna", "type": "person"}]'))
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    with patch.object(llm_client, "_client", fake_client):
+        first = llm_client.extract_entities("Anna teaches math")
+        second = llm_client.extract_entities("Anna teaches math")
+        llm_client.extract_entities("Petr teaches math")
+
+    assert first == second == [{"text": "Anna", "type": "person"}]
+    assert create.call_count == 2
+
+
+def test_response_cache_evicts_least_recently_used():
+    """Test the response cache keeps at most maxsize entries in LRU order."""
+    cache = _ResponseCache(maxsize=2)
+    keys = [_ResponseCache.key("model", prompt, 10) for prompt in ("a", "b", "c")]
+
+    cache.put(keys[0], "A")
+    cache.put(keys[1], "B")
+    assert cache.get(keys[0]) == "A"
+    cache.put(keys[2], "C")
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "A"
+    assert cache.get(keys[2]) == "C"
+    assert _ResponseCache.key("model", "a", 10) != _ResponseCache.key("model", "a", 20)
+
+
+@pytest.mark.asyncio
+async def test_acall_llm_direct_http(llm_client):
+    """Test the direct HTTP path posts the chat payload and falls back to the SDK on 5xx."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if b"fail" in request.content:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "0.5"}}]})
+
+    aclient = llm_client._get_aclient()
+    llm_client._ahttp = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    sdk_create = AsyncMock(return_value=_completion("-0.5"))
+
+    with patch.object(settings, "LLM_DIRECT_HTTP", True), patch.object(
+        aclient.chat.completions, "create", sdk_create
+    ):
+        assert await llm_client._acall_llm("ok", max_tokens=10) == "0.5"
+        assert await llm_client._acall_llm("fail", max_tokens=10) == "-0.5"
+
+    assert requests[0].url.path.endswith("/chat/completions")
+    assert requests[0].headers["Authorization"].startswith("Bearer ")
+    assert sdk_create.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_acall_llm_direct_http_rate_limited_skips_sdk(llm_client):
+    """Test a 429 on the direct path raises RateLimitError without re-sending via the SDK."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(429, json={"error": {"message": "slow down"}})
+
+    aclient = llm_client._get_aclient()
+    llm_client._ahttp = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    sdk_create = AsyncMock(return_value=_completion("0.5"))
+
+    with patch.object(settings, "LLM_DIRECT_HTTP", True), patch.object(
+        aclient.chat.completions, "create", sdk_create
+    ), patch.object(LLMClient._acomplete.retry, "wait", wait_none()):
+        with pytest.raises(openai.RateLimitError):
+            await llm_client._acomplete({"model": "m", "messages": [], "max_tokens": 10})
+
+    # Each retry attempt sends exactly one request, all of them direct
+    assert len(requests) == 4
+    sdk_create.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_acall_llm_direct_http_client_error_fails_once(llm_client):
+    """Test a non-retryable 4xx on the direct path fails after a single request."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(401, json={"error": {"message": "bad key"}})
+
+    aclient = llm_client._get_aclient()
+    llm_client._ahttp = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    sdk_create = AsyncMock(return_value=_completion("0.5"))
+
+    with patch.object(settings, "LLM_DIRECT_HTTP", True), patch.object(
+        aclient.chat.completions, "create", sdk_create
+    ):
+        with pytest.raises(openai.AuthenticationError):
+            await llm_client._acomplete({"model": "m", "messages": [], "max_tokens": 10})
+
+    assert len(requests) == 1
+    sdk_create.assert_not_awaited()
+
+
+def test_submit_and_poll_batch(llm_client):
+    """Test batch submission serializes one request per text and results are re-aligned."""
+    fake_client = MagicMock()
+    fake_client.files.create.return_value = SimpleNamespace(id="file-in")
+    fake_client.batches.create.return_value = SimpleNamespace(id="batch-1")
+    fake_client.batches.retrieve.side_effect = [
+        SimpleNamespace(status="in_progress"),
+        SimpleNamespace(
+            status="completed",
+            metadata={"task": "sentiment", "rows": "3"},
+            request_counts=SimpleNamespace(total=2),
+            output_file_id="file-out",
+        ),
+    ]
+    output_lines = [
+        {"custom_id": "row-2", "response": {"status_code": 200, "body": _json_completion("-0.4")}},
+        {"custom_id": "row-0", "response": {"status_code": 200, "body": _json_completion("0.9")}},
+    ]
+    fake_client.files.content.return_value = SimpleNamespace(
+        text="\n".join(json.dumps(line) for line in output_lines)
+    )
+
+    with patch.object(llm_client, "_client", fake_client):
+        batch_id = llm_client.submit_batch(["good", "", "bad"], task="sentiment")
+        results = llm_client.poll_batch(batch_id, task="sentiment", poll_interval=0)
+
+    _, upload = fake_client.files.create.call_args.kwargs["file"]
+    requests = [json.loads(line) for line in upload.getvalue().decode().splitlines()]
+    assert [r["custom_id"] for r in requests] == ["row-0", "row-2"]
+    assert requests[0]["body"]["max_tokens"] == 10
+    assert batch_id == "batch-1"
+    assert results == [0.9, 0.0, -0.4]
+
+
+def test_poll_batch_failed(llm_client):
+    """Test a failed batch raises instead of returning partial results."""
+    fake_client = MagicMock()
+    fake_client.batches.retrieve.return_value = SimpleNamespace(status="expired")
+
+    with patch.object(llm_client, "_client", fake_client):
+        with pytest.raises(RuntimeError, match="expired"):
+            llm_client.poll_batch("batch-1", poll_interval=0)
+
+
+def test_extract_entities_structured_output(llm_client):
+    """Test structured output sends the JSON schema and unwraps the entities object."""
+    create = MagicMock(
+        return_value=_completion('{"entities": [{"text": "Praha", "type": "location"}]}')
+    )
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    with patch.object(settings, "LLM_STRUCTURED_OUTPUT", True), patch.object(
+        llm_client, "_client", fake_client
+    ):
+        entities = llm_client.extract_entities("Škola v Praze")
+
+    assert entities == [{"text": "Praha", "type": "location"}]
+    kwargs = create.call_args.kwargs
+    assert kwargs["response_format"]["json_schema"]["schema"]["type"] == "object"
+    assert kwargs["max_tokens"] == 120
+
+
+def test_analyze_combines_entities_and_sentiment(llm_client):
+    """Test analyze returns entities and a clamped sentiment from one call."""
+    create = MagicMock(
+        return_value=_completion(
+            '{"entities": [{"text": "Anna", "type": "person"}, {"bad": 1}], "sentiment": 1.4}'
+        )
+    )
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    with patch.object(llm_client, "_client", fake_client):
+        result = llm_client.analyze("Anna is a great teacher")
+
+    assert result == {"entities": [{"text": "Anna", "type": "person"}], "sentiment": 1.0}
+    assert create.call_count == 1
+
+
+def test_analyze_salvages_truncated_response(llm_client):
+    """Test analyze recovers entities and sentiment from malformed output."""
+    response = '{"sentiment": -0.3, "entities": [{"text": "Anna", "type": "person"}, {"text": "Ma'
+
+    assert llm_client._analysis_from_response(response) == {
+        "entities": [{"text": "Anna", "type": "person"}],
+        "sentiment": -0.3,
+    }
+
+
+def test_enrich_dataframe_analyzes_each_distinct_text_once(llm_client):
+    """Test enrich_dataframe deduplicates texts and maps results back to rows."""
+    calls = []
+
+    async def fake_aanalyze(text):
+        calls.append(text)
+        return {"entities": [{"text": text, "type": "person"}], "sentiment": 0.5}
+
+    df = pd.DataFrame({"id": [1, 2, 3, 4], "text": ["Anna", "Petr", "Anna", None]})
+    with patch.object(llm_client, "aanalyze", side_effect=fake_aanalyze):
+        enriched = llm_client.enrich_dataframe(df, "text")
+
+    assert sorted(calls) == ["Anna", "Petr"]
+    assert enriched["entities"].tolist() == [
+        [{"text": "Anna", "type": "person"}],
+        [{"text": "Petr", "type": "person"}],
+        [{"text": "Anna", "type": "person"}],
+        [],
+    ]
+    assert enriched["sentiment"].tolist() == [0.5, 0.5, 0.5, 0.0]
+    assert "entities" not in df.columns
+
+
+def test_token_bucket_paces_after_burst():
+    """Test the bucket allows a burst of `capacity` then waits for refill."""
+    bucket = _TokenBucket(capacity=2, refill_per_sec=10)
+
+    assert bucket._reserve(1) == 0.0
+    assert bucket._reserve(1) == 0.0
+    assert bucket._reserve(1) == pytest.approx(0.1, abs=0.01)
+    # Queued reservations wait behind earlier ones
+    assert bucket._reserve(1) == pytest.approx(0.2, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_acall_llm_respects_rate_limit(llm_client):
+    """Test async calls acquire from the per-model request bucket."""
+    create = AsyncMock(return_value=_completion("0.1"))
+    aclient = llm_client._get_aclient()
+
+    with patch.object(settings, "FEATHERLESS_RPM", 60), patch.object(
+        aclient.chat.completions, "create", create
+    ), patch.object(_TokenBucket, "aacquire", autospec=True) as aacquire:
+        await llm_client._acall_llm("prompt", max_tokens=10)
+
+    assert aacquire.await_count == 1
+    assert aacquire.call_args.args[0].capacity == 60
+
+
+def test_split_windows_breaks_on_whitespace():
+    """Test windows stay within the size limit and do not cut words."""
+    text = " ".join(f"word{i}" for i in range(2000))
+
+    windows = _split_windows(text, size=1000)
+
+    assert all(len(w) <= 1000 for w in windows)
+    assert " ".join(windows).split() == text.split()
+
+
+def test_extract_entities_long_text_uses_windows(llm_client):
+    """Test over-length texts are split into windows and entities are merged."""
+    prompts = []
+
+    async def fake_acall(prompt, max_tokens=500, response_format=None):
+        prompts.append(prompt)
+        return '[{"text": "Anna", "type": "person"}]'
+
+    text = "Anna učí matematiku. " * (MAX_INPUT_CHARS // 10)
+    with patch.object(llm_client, "_acall_llm", side_effect=fake_acall):
+        entities = llm_client.extract_entities(text)
+
+    assert len(prompts) > 1
+    assert all(len(p) < MAX_INPUT_CHARS + 500 for p in prompts)
+    assert entities == [{"text": "Anna", "type": "person"}]
+
+
+def test_analyze_sentiment_truncates_long_text(llm_client):
+    """Test sentiment prompts are capped at MAX_INPUT_CHARS of input."""
+    with patch.object(llm_client, "_call_llm", return_value="0.2") as call_llm:
+        assert llm_client.analyze_sentiment("#" * (3 * MAX_INPUT_CHARS)) == 0.2
+
+    prompt = call_llm.call_args.args[0]
+    assert prompt.count("#") == MAX_INPUT_CHARS
+
+
+@pytest.mark.asyncio
+async def test_batch_analyze_long_text_weights_sentiment(llm_client):
+    """Test windowed analysis merges entities and length-weights sentiment."""
+
+    async def fake_aanalyze(text):
+        score = 1.0 if text.startswith("good") else -1.0
+        return {"entities": [{"text": "Anna", "type": "person"}], "sentiment": score}
+
+    long_text = "good " * (MAX_INPUT_CHARS // 5) + "bad " * (MAX_INPUT_CHARS // 4)
+    with patch.object(llm_client, "aanalyze", side_effect=fake_aanalyze):
+        results = await llm_client.batch_analyze([long_text, "good"])
+
+    assert results[0]["entities"] == [{"text": "Anna", "type": "person"}]
+    assert -1.0 < results[0]["sentiment"] < 1.0
+    assert results[1]["sentiment"] == 1.0
+
+
+def _fake_sentiment_embeddings(texts):
+    """Embed anchors and inputs on two axes: positive (x) and negative (y)."""
+    rows = []
+    for text in texts:
+        negative = any(w in text for w in ("terrible", "awful", "Hrozné", "příšerný", "bad"))
+        rows.append([0.0, 1.0] if negative else [1.0, 0.0])
+    return np.array(rows)
+
+
+def test_analyze_sentiment_local_fast_path(llm_client):
+    """Test confident local scores skip the LLM and unconfident ones fall back to it."""
+    llm_client_module._sentiment_anchor_embeddings.cache_clear()
+    with patch.object(settings, "LLM_LOCAL_SENTIMENT", True), patch.object(
+        llm_client_module, "embed_texts", side_effect=_fake_sentiment_embeddings
+    ), patch.object(llm_client, "_call_llm", return_value="0.3") as call_llm:
+        assert llm_client.analyze_sentiment("bad lesson") < -0.9
+        call_llm.assert_not_called()
+
+        with patch.object(settings, "LLM_LOCAL_SENTIMENT_CONFIDENCE", 1.1):
+            assert llm_client.analyze_sentiment("bad lesson") == 0.3
+    llm_client_module._sentiment_anchor_embeddings.cache_clear()
+
+
+def test_call_llm_retries_transient_errors(llm_client):
+    """Test connection errors are retried and non-transient errors are not."""
+    request = httpx.Request("POST", "https://llm.test/chat/completions")
+    create = MagicMock(
+        side_effect=[openai.APIConnectionError(request=request), _completion("0.4")]
+    )
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    with patch.object(LLMClient._complete.retry, "wait", wait_none()), patch.object(
+        llm_client, "_client", fake_client
+    ):
+        assert llm_client._call_llm("prompt", max_tokens=10) == "0.4"
+        assert create.call_count == 2
+
+        create.side_effect = ValueError("bad request")
+        with pytest.raises(ValueError):
+            llm_client._call_llm("other prompt", max_tokens=10)
+        assert create.call_count == 3
+
+
+def _stream_chunks(*pieces):
+    """Streaming chat completion chunks carrying the given content deltas."""
+    return [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+        for piece in pieces
+    ]
+
+
+def test_stream_entities_yields_objects_as_they_close(llm_client):
+    """Test streamed entities are emitted as soon as each object is complete."""
+    pieces = ['[{"text": "An', 'na", "type": "person"}, {"text": "Ma', 'th", "type": "subject"}]']
+    received = []
+
+    def chunks():
+        for chunk in _stream_chunks(*pieces):
+            received.append(chunk)
+            yield chunk
+
+    create = MagicMock(return_value=chunks())
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    with patch.object(llm_client, "_client", fake_client):
+        stream = llm_client.stream_entities("Anna teaches math")
+        first = next(stream)
+        chunks_before_first = len(received)
+        rest = list(stream)
+        # Second call is served from the response cache
+        cached = list(llm_client.stream_entities("Anna teaches math"))
+
+    assert first == {"text": "Anna", "type": "person"}
+    assert chunks_before_first == 2
+    assert rest == [{"text": "Math", "type": "subject"}]
+    assert cached == [first] + rest
+    assert create.call_args.kwargs["stream"] is True
+    assert create.call_count == 1
+
+
+def test_drain_complete_objects_skips_invalid_on_final():
+    """Test the final drain skips invalid objects and drops a truncated tail."""
+    buffer = '[{"text": "A", "type": "person"}, {bad}, {"text": "B", "type": "person"}, {"te'
+
+    assert llm_client_module._drain_complete_objects(buffer, 0)[0] == [
+        {"text": "A", "type": "person"}
+    ]
+    assert llm_client_module._drain_complete_objects(buffer, 0, final=True)[0] == [
+        {"text": "A", "type": "person"},
+        {"text": "B", "type": "person"},
+    ]
+
+
+def test_gzip_transport_compresses_large_bodies():
+    """Test large request bodies are gzipped and small ones are sent as-is."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={})
+
+    client = httpx.Client(
+        transport=llm_client_module._GzipTransport(httpx.MockTransport(handler))
+    )
+    large = {"prompt": "Anna učí matematiku. " * 200}
+    client.post("https://llm.test/chat/completions", json=large)
+    client.post("https://llm.test/chat/completions", json={"prompt": "short"})
+
+    assert seen[0].headers["Content-Encoding"] == "gzip"
+    assert int(seen[0].headers["Content-Length"]) == len(seen[0].content)
+    assert json.loads(gzip.decompress(seen[0].content)) == large
+    assert "Content-Encoding" not in seen[1].headers
+
+
+@pytest.mark.asyncio
+async def test_acall_llm_coalesces_identical_inflight_requests(llm_client):
+    """Test concurrent identical requests share one API call, including failures."""
+    calls = []
+
+    async def fake_acomplete(body):
+        calls.append(body["messages"][0]["content"])
+        await asyncio.sleep(0.01)
+        if body["messages"][0]["content"] == "fail":
+            raise RuntimeError("boom")
+        return "0.1"
+
+    with patch.object(llm_client, "_acomplete", side_effect=fake_acomplete):
+        results = await asyncio.gather(
+            *(llm_client._acall_llm("same", max_tokens=10) for _ in range(5)),
+            llm_client._acall_llm("other", max_tokens=10),
+        )
+        failures = await asyncio.gather(
+            *(llm_client._acall_llm("fail", max_tokens=10) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    assert results == ["0.1"] * 6
+    assert sorted(calls) == ["fail", "other", "same"]
+    assert all(isinstance(f, RuntimeError) for f in failures)
+    assert not llm_client_module._INFLIGHT
+
+
+def test_parse_json_response_closes_truncated_array_in_one_decode(llm_client):
+    """Test a truncated array prefix is decoded with a single json.loads call."""
+    response = (
+        '[{"text": "Anna", "type": "person", "meta": {"role": "teacher"}}, '
+        '{"text": "Math", "type": "subject"}, {"text": "Pra'
+    )
+
+    with patch.object(
+        llm_client_module.json, "loads", wraps=llm_client_module.json.loads
+    ) as loads, patch.object(llm_client_module._JSON_DECODER, "raw_decode") as raw_decode:
+        entities = llm_client._parse_json_response(response)
+
+    assert entities == [
+        {"text": "Anna", "type": "person", "meta": {"role": "teacher"}},
+        {"text": "Math", "type": "subject"},
+    ]
+    # One failed full parse, then one decode of the closed prefix
+    assert loads.call_count == 2
+    raw_decode.assert_not_called()
+
+
+def test_sync_wrapper_closes_async_http_client(llm_client):
+    """Test the per-call event loop's async HTTP client is closed when the call ends."""
+    opened = []
+
+    async def fake_acall(prompt, max_tokens=500, response_format=None):
+        llm_client._get_aclient()
+        opened.append(llm_client._ahttp)
+        return _entity_response(prompt)
+
+    with patch.object(llm_client, "_acall_llm", side_effect=fake_acall):
+        llm_client.extract_entities_many(["Anna"])
+
+    assert opened and all(client.is_closed for client in opened)
+    assert llm_client._ahttp is None
+    assert llm_client._aclient is None
@@ -1,5 +1,7 @@
 """Tests for AI column mapping."""
 
+import warnings
+
 import numpy as np
 import pandas as pd
 import pytest
@@ -67,6 +69,7 @@ def test_map_columns_basic(catalog):
         assert mapping.status in ["AUTO", "LOW_CONFIDENCE", "UNKNOWN"]
         assert 0.0 <= mapping.score <= 1.0
         assert len(mapping.candidates) <= 3
+        assert mapping.source_type in ["number", "date", "string", "categorical"]
 
 
 def test_map_columns_empty_dataframe(catalog):
@@ -96,6 +99,17 @@ def test_infer_column_type_date():
     assert _infer_column_type(series) == "date"
 
 
+@pytest.mark.parametrize(
+    "value", ["2024-01", "15-Jan-2024", "10:30", "15.1.2024", "20240115", "Jan 2024"]
+)
+def test_infer_column_type_date_shapes(value):
+    """Test the date pre-check lets common local date and time shapes reach the parser."""
+    series = pd.Series([value] * 20, dtype=object)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("error", message=".*match groups")
+        assert _infer_column_type(series) == "date"
+
+
 def test_infer_column_type_categorical():
     """Test type inference for categorical columns."""
     # Low cardinality -> categorical
@@ -124,6 +138,10 @@ def test_adjust_score_by_type_match():
     score = _adjust_score_by_type(0.7, "string", "string")
     assert abs(score - 0.75) < 0.001  # 0.7 + 0.05
 
+    # Categorical and string are compatible
+    score = _adjust_score_by_type(0.7, "categorical", "string")
+    assert abs(score - 0.75) < 0.001  # 0.7 + 0.05
+
 
 def test_adjust_score_by_type_mismatch():
     """Test score adjustment for type mismatches."""
@@ -146,6 +164,12 @@ def test_adjust_score_bounds():
     assert score >= 0.0
 
 
+def test_adjust_score_unknown_concept_type():
+    """Test an unknown concept type gets the mismatch penalty for every column type."""
+    for col_type in ("number", "date", "string", "categorical"):
+        assert abs(_adjust_score_by_type(0.7, col_type, "numbr") - 0.55) < 0.001
+
+
 def test_build_column_description():
     """Test column description building."""
     df = pd.DataFrame({
@@ -192,3 +216,34 @@ def test_mapping_status_thresholds(catalog):
     # random_xyz might be UNKNOWN or LOW_CONFIDENCE
     random_mapping = next(m for m in mappings if m.source_column == "random_xyz")
     assert random_mapping.status in ["LOW_CONFIDENCE", "UNKNOWN"]
+
+
+def test_map_columns_embeds_all_columns_in_one_batch(catalog):
+    """Test that all column descriptions are embedded with a single call."""
+    df = pd.DataFrame({
+        "student_id": ["S001", "S002", "S003"],
+        "test_score": [85, 92, 78],
+        "date": ["2025-01-10", "2025-01-11", "2025-01-12"],
+    })
+
+    with patch("eduscale.tabular.mapping.embed_texts", wraps=lambda texts: np.array(
+        [[0.9, 0.1, 0.0] + [0.0] * 1021] * len(texts)
+    )) as mock_embed:
+        mappings = map_columns(df, "ASSESSMENT", catalog)
+
+    mock_embed.assert_called_once()
+    assert len(mock_embed.call_args[0][0]) == 3
+    for mapping in mappings:
+        scores = [score for _, score in mapping.candidates]
+        assert scores == sorted(scores, reverse=True)
+        assert mapping.score == scores[0]
+
+
+def test_infer_column_type_date_formats_and_non_dates():
+    """Test date sniffing accepts common formats and skips non-date strings."""
+    assert _infer_column_type(pd.Series(["10.01.2025", "11.01.2025"])) == "date"
+    assert _infer_column_type(pd.Series(["Jan 10 2025", "Feb 2 2025"])) == "date"
+
+    with patch("eduscale.tabular.mapping.pd.to_datetime") as mock_to_datetime:
+        assert _infer_column_type(pd.Series([f"S{i:03d}" for i in range(20)])) == "string"
+    mock_to_datetime.assert_not_called()
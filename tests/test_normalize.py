@@ -6,7 +6,9 @@ import pytest
 from eduscale.tabular.normalize import (
     normalize_dataframe,
     _normalize_school_name,
+    _normalize_school_names,
     _pseudonymize_id,
+    _pseudonymize_series,
     _cast_column_types,
 )
 from eduscale.tabular.mapping import ColumnMapping
@@ -126,6 +128,31 @@ def test_normalize_school_name():
     assert _normalize_school_name("") == ""
 
 
+def test_normalize_school_names_matches_scalar():
+    """Test vectorized school name normalization matches the per-value rules."""
+    names = pd.Series(["  základní  škola  ", "ZS Masarykova", "Gym Praha", "", None])
+
+    normalized = _normalize_school_names(names)
+
+    assert normalized.tolist()[:4] == [_normalize_school_name(n) for n in names[:4]]
+    assert pd.isna(normalized.iloc[4])
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        pd.Series(["ZS Masarykova", "gym praha", "ZS Masarykova"], dtype="category"),
+        pd.Series([101, 202]),
+        pd.Series([101, "zs masarykova"], dtype=object),
+    ],
+)
+def test_normalize_school_names_non_string_columns(names):
+    """Test category and non-string columns give the same strings as the per-value rules."""
+    normalized = _normalize_school_names(names)
+
+    assert list(normalized) == [_normalize_school_name(n) for n in names]
+
+
 def test_pseudonymize_id():
     """Test ID pseudonymization."""
     original_id = "S12345"
@@ -143,6 +170,18 @@ def test_pseudonymize_id():
     assert _pseudonymize_id("") == ""
 
 
+def test_pseudonymize_id_blake2b(monkeypatch):
+    """Test the opt-in BLAKE2b hash keeps the 16-character format."""
+    sha_hashed = _pseudonymize_id("S12345")
+    monkeypatch.setattr("eduscale.tabular.normalize.settings.PSEUDONYMIZE_HASH_ALGO", "blake2b")
+
+    hashed = _pseudonymize_id("S12345")
+
+    assert len(hashed) == 16
+    assert hashed != sha_hashed
+    assert hashed == _pseudonymize_id("S12345")
+
+
 def test_normalize_dataframe_with_pseudonymization(monkeypatch):
     """Test normalization with pseudonymization enabled."""
     # Enable pseudonymization
@@ -228,3 +267,86 @@ def test_normalize_dataframe_low_confidence_mappings():
 
     # LOW_CONFIDENCE should still be renamed
     assert "student_id" in df_norm.columns
+
+
+def test_pseudonymize_series_matches_scalar():
+    """Test batch pseudonymization matches the per-value hash and keeps nulls."""
+    series = pd.Series(["S001", None, "S002", "S001", ""], index=[10, 11, 12, 13, 14])
+
+    hashed = _pseudonymize_series(series)
+
+    assert hashed.index.tolist() == [10, 11, 12, 13, 14]
+    assert hashed[10] == _pseudonymize_id("S001")
+    assert hashed[12] == _pseudonymize_id("S002")
+    assert hashed[13] == hashed[10]
+    assert pd.isna(hashed[11])
+    assert hashed[14] == ""
+
+
+def test_normalize_dataframe_records_categorical_columns():
+    """Test categorical source columns are recorded under their canonical names."""
+    df = pd.DataFrame({
+        "Grade": ["A", "B", "A"],
+        "Test Score": [85, 92, 78],
+    })
+
+    mappings = [
+        ColumnMapping(
+            source_column="Grade",
+            concept_key="grade",
+            score=0.9,
+            status="AUTO",
+            candidates=[],
+            source_type="categorical",
+        ),
+        ColumnMapping(
+            source_column="Test Score",
+            concept_key="test_score",
+            score=0.85,
+            status="AUTO",
+            candidates=[],
+            source_type="number",
+        ),
+    ]
+
+    df_norm = normalize_dataframe(
+        df_raw=df,
+        table_type="ASSESSMENT",
+        mappings=mappings,
+        region_id="region-01",
+        file_id="file-123",
+    )
+
+    assert df_norm.attrs["categorical_columns"] == ["grade"]
+
+
+def test_normalize_dataframe_does_not_mutate_input(monkeypatch):
+    """Test normalization leaves the raw DataFrame untouched."""
+    monkeypatch.setattr("eduscale.tabular.normalize.settings.PSEUDONYMIZE_IDS", True)
+
+    df = pd.DataFrame({
+        "student_id": ["S001", "S002"],
+        "school_name": ["  zs praha ", "gym brno"],
+        "test_score": ["85", "92"],
+    })
+    original = df.copy()
+
+    mappings = [
+        ColumnMapping(
+            source_column="test_score",
+            concept_key="score",
+            score=0.9,
+            status="AUTO",
+            candidates=[],
+        ),
+    ]
+
+    normalize_dataframe(
+        df_raw=df,
+        table_type="ASSESSMENT",
+        mappings=mappings,
+        region_id="region-01",
+        file_id="file-123",
+    )
+
+    pd.testing.assert_frame_equal(df, original)
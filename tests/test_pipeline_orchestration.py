@@ -8,8 +8,20 @@ import pytest
 from eduscale.tabular.pipeline import (
     FrontmatterData,
     IngestResult,
+    _cached_catalog,
+    parse_frontmatter,
     process_tabular_text,
+    process_tabular_texts,
 )
+from eduscale.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def clear_catalog_cache():
+    """Keep mocked catalogs from leaking between tests."""
+    _cached_catalog.cache_clear()
+    yield
+    _cached_catalog.cache_clear()
 
 
 @pytest.fixture
@@ -122,6 +134,48 @@ def test_process_tabular_text_csv(
     assert result.processing_time_ms > 0
 
 
+@patch("eduscale.tabular.pipeline.load_concepts_catalog")
+@patch("eduscale.tabular.pipeline.classify_table")
+@patch("eduscale.tabular.pipeline.map_columns")
+def test_process_tabular_text_preparsed_frontmatter_skips_yaml(
+    mock_map_columns,
+    mock_classify_table,
+    mock_load_concepts,
+    sample_csv_with_frontmatter,
+):
+    """Test that pre-parsed frontmatter is not parsed again."""
+    mock_classify_table.return_value = ("ASSESSMENT", 0.85)
+    mock_map_columns.return_value = []
+
+    frontmatter, _ = parse_frontmatter(sample_csv_with_frontmatter)
+
+    with patch("eduscale.tabular.pipeline._parse_yaml_block") as mock_parse:
+        result = process_tabular_text(sample_csv_with_frontmatter, frontmatter=frontmatter)
+
+    mock_parse.assert_not_called()
+    assert result.status == "INGESTED"
+    assert result.rows_loaded == 3
+
+
+@patch("eduscale.tabular.pipeline.load_concepts_catalog")
+@patch("eduscale.tabular.pipeline.classify_table")
+@patch("eduscale.tabular.pipeline.map_columns")
+def test_process_tabular_text_reuses_catalog(
+    mock_map_columns,
+    mock_classify_table,
+    mock_load_concepts,
+    sample_csv_with_frontmatter,
+):
+    """Test the concepts catalog is loaded once across ingestions."""
+    mock_classify_table.return_value = ("ASSESSMENT", 0.85)
+    mock_map_columns.return_value = []
+
+    process_tabular_text(sample_csv_with_frontmatter)
+    process_tabular_text(sample_csv_with_frontmatter)
+
+    mock_load_concepts.assert_called_once_with(settings.CONCEPT_CATALOG_PATH)
+
+
 @patch("eduscale.tabular.analysis.entity_resolver.load_entity_cache")
 @patch("eduscale.tabular.pipeline.process_free_form_text")
 def test_process_tabular_text_pdf(
@@ -212,3 +266,31 @@ def test_process_tabular_text_error_handling(
     assert result.status == "FAILED"
     assert "ValueError: Invalid CSV format" in result.error_message
     assert result.processing_time_ms >= 0  # May be 0 for very fast failures
+
+
+def test_process_tabular_texts_small_batch_runs_serially():
+    """Test small batches are processed in-process, in order."""
+    with patch(
+        "eduscale.tabular.pipeline.process_tabular_text", side_effect=lambda text: f"result:{text}"
+    ) as mock_process, patch("eduscale.tabular.pipeline.ProcessPoolExecutor") as mock_pool:
+        results = process_tabular_texts(["a", "b", "c"], max_workers=4)
+
+    assert results == ["result:a", "result:b", "result:c"]
+    assert mock_process.call_count == 3
+    mock_pool.assert_not_called()
+
+
+def test_process_tabular_texts_large_batch_uses_process_pool():
+    """Test large batches are mapped over a process pool with a model-loading initializer."""
+    with patch.object(settings, "INGEST_PARALLEL_MIN_CHARS", 1), patch(
+        "eduscale.tabular.pipeline.ProcessPoolExecutor"
+    ) as mock_pool:
+        executor = mock_pool.return_value.__enter__.return_value
+        executor.map.return_value = iter(["r1", "r2"])
+
+        results = process_tabular_texts(["a", "b"], max_workers=8)
+
+    assert results == ["r1", "r2"]
+    assert mock_pool.call_args.kwargs["max_workers"] == 2
+    assert mock_pool.call_args.kwargs["initializer"] is not None
+    executor.map.assert_called_once_with(process_tabular_text, ["a", "b"])
@@ -1,13 +1,16 @@
 """Tests for storage backends."""
 
 import io
+import json
 import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import storage
 
-from eduscale.storage.gcs import GCSStorageBackend
+from eduscale.storage.gcs import GCSStorageBackend, SignedUrlRequest
 from eduscale.storage.local import LocalStorageBackend
 
 
@@ -76,6 +79,44 @@ class TestLocalStorageBackend:
             with open(storage_path, "rb") as f:
                 assert f.read() == content
 
+    @pytest.mark.asyncio
+    async def test_store_file_from_real_file(self):
+        """Test storing from an fd-backed stream (sendfile path)."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = LocalStorageBackend()
+            backend.base_path = Path(tmpdir)
+
+            content = b"x" * (3 * 1024 * 1024 + 17)
+            with tempfile.TemporaryFile() as file_data:
+                file_data.write(content)
+                file_data.seek(0)
+
+                storage_path = await backend.store_file(
+                    "test-uuid-457", "big.bin", "application/octet-stream", file_data, "region-test-02"
+                )
+
+            with open(storage_path, "rb") as f:
+                assert f.read() == content
+
+    @pytest.mark.asyncio
+    async def test_store_file_recreates_removed_region_dir(self):
+        """Test that a cached region directory is recreated if removed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = LocalStorageBackend()
+            backend.base_path = Path(tmpdir)
+
+            first = await backend.store_file(
+                "id-1", "a.csv", "text/csv", io.BytesIO(b"a"), "region-test-05"
+            )
+            Path(first).unlink()
+            Path(first).parent.rmdir()
+
+            second = await backend.store_file(
+                "id-2", "b.csv", "text/csv", io.BytesIO(b"b"), "region-test-05"
+            )
+
+            assert Path(second).read_bytes() == b"b"
+
     def test_get_backend_name(self):
         """Test backend name."""
         backend = LocalStorageBackend()
@@ -153,6 +194,83 @@ class TestGCSStorageBackend:
                 assert "gs://test-bucket" in storage_path
                 assert file_id in storage_path
 
+    @pytest.mark.asyncio
+    async def test_generate_signed_upload_urls_preserves_order(self):
+        """Test batch signed URL generation returns results in request order."""
+        backend = GCSStorageBackend()
+        batch = [
+            SignedUrlRequest(
+                file_id=f"id-{i}",
+                file_name=f"file{i}.csv",
+                content_type="text/csv",
+                size_bytes=100,
+                region_id="region-test-05",
+            )
+            for i in range(5)
+        ]
+
+        def fake_sign(file_id, file_name, content_type, size_bytes, region_id, expiration_minutes):
+            return f"https://signed/{file_id}", f"uploads/{region_id}/{file_id}_{file_name}"
+
+        with patch.object(backend, "generate_signed_upload_url", side_effect=fake_sign):
+            results = await backend.generate_signed_upload_urls(batch)
+
+        assert [url for url, _ in results] == [f"https://signed/id-{i}" for i in range(5)]
+        assert results[0][1] == "uploads/region-test-05/id-0_file0.csv"
+
+    def test_generate_signed_upload_url_with_key_file(self, tmp_path):
+        """Test signed URLs are signed locally and credentials are cached."""
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        key_path = tmp_path / "sa.json"
+        key_path.write_text(
+            json.dumps(
+                {
+                    "type": "service_account",
+                    "project_id": "test-project",
+                    "private_key_id": "test-key",
+                    "private_key": pem,
+                    "client_email": "signer@test-project.iam.gserviceaccount.com",
+                    "token_uri": "https://oauth2.googleapis.com/token",
+                }
+            )
+        )
+
+        client = storage.Client(project="test-project", credentials=AnonymousCredentials())
+        with patch("eduscale.storage.gcs.storage.Client", return_value=client):
+            with patch("eduscale.storage.gcs.settings") as mock_settings:
+                mock_settings.GCS_BUCKET_NAME = "test-bucket"
+                mock_settings.GCP_PROJECT_ID = "test-project"
+                mock_settings.GCS_SA_KEY_PATH = str(key_path)
+
+                backend = GCSStorageBackend()
+                with patch.object(
+                    backend,
+                    "_create_iam_signing_credentials",
+                    side_effect=AssertionError("IAM signer must not be used"),
+                ):
+                    signed_url, blob_path = backend.generate_signed_upload_url(
+                        "id-1", "report.csv", "text/csv", 100, "region-test-06"
+                    )
+                    backend.generate_signed_upload_url(
+                        "id-2", "report.csv", "text/csv", 100, "region-test-06"
+                    )
+
+        assert blob_path == "uploads/region-test-06/id-1_report.csv"
+        assert "X-Goog-Signature=" in signed_url
+        # Size bound and no-overwrite precondition are part of the signature
+        assert "x-goog-content-length-range" in signed_url
+        assert "x-goog-if-generation-match" in signed_url
+        assert "signer%40test-project.iam.gserviceaccount.com" in signed_url
+        assert backend._signing_credentials is not None
+
     def test_get_backend_name(self):
         """Test backend name."""
         backend = GCSStorageBackend()
@@ -112,3 +112,82 @@ def test_upload_creates_record(
     assert record.file_id == file_id
     assert record.region_id == "city-london"
     assert record.file_name == "test.csv"
+
+
+def test_upload_duplicate_content_reuses_stored_file(
+    client, mock_local_backend, local_storage_settings, monkeypatch
+):
+    """Test that re-uploading identical content to a region skips the write."""
+    from eduscale.core.config import settings
+
+    monkeypatch.setattr(settings, "UPLOAD_DEDUP_ENABLED", True)
+    file_content = b"name,age\nDup,42\n"
+    data = {"region_id": "school-dedup"}
+
+    first = client.post(
+        "/api/v1/upload",
+        files={"file": ("a.csv", io.BytesIO(file_content), "text/csv")},
+        data=data,
+    )
+    second = client.post(
+        "/api/v1/upload",
+        files={"file": ("b.csv", io.BytesIO(file_content), "text/csv")},
+        data=data,
+    )
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert mock_local_backend.store_file.await_count == 1
+    assert second.json()["file_id"] != first.json()["file_id"]
+    assert second.json()["storage_path"] == first.json()["storage_path"]
+    assert first.json()["duplicate_of"] is None
+    assert second.json()["duplicate_of"] == first.json()["file_id"]
+
+    # A different region gets its own copy
+    third = client.post(
+        "/api/v1/upload",
+        files={"file": ("a.csv", io.BytesIO(file_content), "text/csv")},
+        data={"region_id": "school-dedup-2"},
+    )
+    assert third.status_code == 201
+    assert mock_local_backend.store_file.await_count == 2
+
+
+def test_upload_duplicate_content_stored_when_dedup_disabled(
+    client, mock_local_backend, local_storage_settings
+):
+    """Test identical uploads are each stored under their own file_id by default."""
+    for name in ("a.csv", "b.csv"):
+        response = client.post(
+            "/api/v1/upload",
+            files={"file": (name, io.BytesIO(b"name,age\nTwice,3\n"), "text/csv")},
+            data={"region_id": "school-no-dedup"},
+        )
+        assert response.status_code == 201
+        assert response.json()["duplicate_of"] is None
+
+    assert mock_local_backend.store_file.await_count == 2
+
+
+def test_upload_content_hash(client, mock_local_backend, local_storage_settings):
+    """Test the upload response carries the content hash and verifies a client hash."""
+    import hashlib
+
+    file_content = b"name,age\nHash,7\n"
+    expected = hashlib.sha256(file_content).hexdigest()
+
+    response = client.post(
+        "/api/v1/upload",
+        files={"file": ("h.csv", io.BytesIO(file_content), "text/csv")},
+        data={"region_id": "school-hash", "content_sha256": expected},
+    )
+    assert response.status_code == 201
+    assert response.json()["content_sha256"] == expected
+
+    mismatch = client.post(
+        "/api/v1/upload",
+        files={"file": ("h.csv", io.BytesIO(file_content), "text/csv")},
+        data={"region_id": "school-hash", "content_sha256": "0" * 64},
+    )
+    assert mismatch.status_code == 400
+    assert "hash" in mismatch.json()["detail"].lower()
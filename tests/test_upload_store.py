@@ -4,12 +4,19 @@ from datetime import datetime, timezone
 
 import pytest
 
-from eduscale.storage.upload_store import UploadRecord, UploadStatus, UploadStore
-
-
-@pytest.fixture
-def upload_store():
-    """Create a fresh upload store for each test."""
+from eduscale.storage.upload_store import (
+    SqliteUploadStore,
+    UploadRecord,
+    UploadStatus,
+    UploadStore,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def upload_store(request, tmp_path):
+    """Create a fresh upload store of each backend type for each test."""
+    if request.param == "sqlite":
+        return SqliteUploadStore(str(tmp_path / "uploads.db"))
     return UploadStore()
 
 
@@ -112,3 +119,93 @@ def test_overwrite_record(upload_store, sample_record):
 
     # Should only have one record
     assert len(upload_store.list_all()) == 1
+
+
+def test_update_status(upload_store, sample_record):
+    """Test updating record status and completion time."""
+    sample_record.status = UploadStatus.PENDING
+    upload_store.create(sample_record)
+
+    completed_at = datetime.now(timezone.utc)
+    upload_store.update_status(
+        sample_record.file_id, UploadStatus.COMPLETED, completed_at=completed_at
+    )
+
+    retrieved = upload_store.get(sample_record.file_id)
+    assert retrieved.status == UploadStatus.COMPLETED
+    assert retrieved.completed_at == completed_at
+
+
+def test_update_status_nonexistent_record(upload_store):
+    """Test updating a record that doesn't exist is a no-op."""
+    upload_store.update_status("nonexistent-id", UploadStatus.COMPLETED)
+    assert upload_store.get("nonexistent-id") is None
+
+
+def test_list_by_status_and_region(upload_store, sample_record):
+    """Test secondary index lookups follow creates, overwrites and status changes."""
+    sample_record.status = UploadStatus.PENDING
+    upload_store.create(sample_record)
+    other = UploadRecord(
+        file_id="id-2",
+        region_id="school-berlin",
+        file_name="file2.csv",
+        content_type="text/csv",
+        size_bytes=200,
+        storage_backend="local",
+        storage_path="path2",
+        status=UploadStatus.COMPLETED,
+        created_at=datetime.now(timezone.utc),
+    )
+    upload_store.create(other)
+
+    assert [r.file_id for r in upload_store.list_by_status(UploadStatus.PENDING)] == [
+        sample_record.file_id
+    ]
+    assert [r.file_id for r in upload_store.list_by_region("school-berlin")] == ["id-2"]
+
+    upload_store.update_status(sample_record.file_id, UploadStatus.COMPLETED)
+    assert list(upload_store.list_by_status(UploadStatus.PENDING)) == []
+    assert {r.file_id for r in upload_store.list_by_status(UploadStatus.COMPLETED)} == {
+        sample_record.file_id,
+        "id-2",
+    }
+
+    # Overwriting a record moves it between region indexes
+    moved = UploadRecord(
+        file_id="id-2",
+        region_id="school-paris",
+        file_name="file2.csv",
+        content_type="text/csv",
+        size_bytes=200,
+        storage_backend="local",
+        storage_path="path2",
+        status=UploadStatus.COMPLETED,
+        created_at=datetime.now(timezone.utc),
+    )
+    upload_store.create(moved)
+    assert list(upload_store.list_by_region("school-berlin")) == []
+    assert [r.file_id for r in upload_store.list_by_region("school-paris")] == ["id-2"]
+
+
+def test_upload_status_json_round_trip():
+    """Test UploadStatus keeps its external string form."""
+    assert UploadStatus.PENDING.to_json() == "pending"
+    assert UploadStatus.COMPLETED.to_json() == "completed"
+    for status in UploadStatus:
+        assert UploadStatus.from_json(status.to_json()) is status
+
+
+def test_find_by_hash(upload_store, sample_record):
+    """Test content-hash lookup is scoped to region and completed uploads."""
+    sample_record.content_sha256 = "abc123"
+    upload_store.create(sample_record)
+
+    found = upload_store.find_by_hash("abc123", sample_record.region_id)
+    assert found is not None
+    assert found.file_id == sample_record.file_id
+    assert upload_store.find_by_hash("abc123", "other-region") is None
+    assert upload_store.find_by_hash("def456", sample_record.region_id) is None
+
+    upload_store.update_status(sample_record.file_id, UploadStatus.PENDING)
+    assert upload_store.find_by_hash("abc123", sample_record.region_id) is None